@@ -1,26 +1,44 @@
 import random
 import sys
 import time
-from dataclasses import dataclass # Import dataclass
-
-import wcwidth
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass
 
 from config import (
-    CHARS_KATAKANA,
     CHARS_LATIN,
-    CHARS_SYMBOLS,
     DEFAULT_CHAR_SETS,
     AnsiColors,
 )
+from frame_encoders import create_frame_encoder
+from frame_scheduler import FrameScheduler
+from glyph_tables import (
+    allows_wide_glyphs,
+    compile_glyph_table,
+    compile_glyph_tables,
+    narrow_table_count,
+)
+from numpy_engine import NumpyColumnEngine
+from palette import Palette, compile_palette
+from parallel_render import ParallelBandRenderer
+from random_pool import RandomPool
 
 
-@dataclass
+@dataclass(slots=True)
 class ColumnState:
-    """Represents the state of a single column in the animation."""
+    """Represents the state of a single column in the animation.
+
+    The character set is stored as an index into the shared table of available
+    character sets, and slots leave out the per-instance __dict__, so a column
+    costs a few machine words. older_drops is only allocated once the column
+    holds more than one drop.
+    """
 
     head_y: int
-    current_char_set: list[str]
-    trail: list
+    char_set_index: int = 0
+    # Earlier drops still falling below the newest one, as [head_y, char_set_index]
+    # pairs ordered from the lowest (oldest) to the highest.
+    older_drops: deque | None = None
 
 
 def initialize_animation_parameters(args, width, height):
@@ -28,29 +46,34 @@ def initialize_animation_parameters(args, width, height):
 
     available_char_sets = []
     # Check if args.char_set was provided by the user
+    # Character sets are compiled into GlyphTables once here, so that width
+    # validation never has to happen in the render loop.
     if (
         args.char_set
     ):  # Not None and not empty string (already validated in parse_arguments)
-        chars = list(args.char_set)
-        available_char_sets = [chars]
+        available_char_sets = compile_glyph_tables(args.char_set)
     else:
         # Keep the existing logic for DEFAULT_CHAR_SETS
-        # Ensure DEFAULT_CHAR_SETS are lists of characters if they aren't already
-        available_char_sets = [list(cs) for cs in DEFAULT_CHAR_SETS if cs]
+        available_char_sets = [
+            table for cs in DEFAULT_CHAR_SETS if cs for table in compile_glyph_tables(cs)
+        ]
+
+    if not available_char_sets:
+        # Columns index into this table, so it must never be empty.
+        available_char_sets = [compile_glyph_table(CHARS_LATIN)]
+    # Single-width tables first: columns without room for a double-width glyph
+    # only draw from the leading narrow_table_count() entries.
+    available_char_sets.sort(key=lambda table: table.width)
 
     # Initialize columns
     # Each column will use the ColumnState dataclass to store its state
-    columns = []
-    for _ in range(width):
-        columns.append(
-            ColumnState(
-                head_y=0,  # Current y position of the head of the drop
-                current_char_set=random.choice(available_char_sets)
-                if available_char_sets
-                else list(CHARS_LATIN),  # Fallback if empty
-                trail=[],  # Stores characters and their specific attributes for the trail
-            )
+    columns = [
+        ColumnState(
+            head_y=0,  # Current y position of the head of the drop
+            char_set_index=random.randrange(len(available_char_sets)),
         )
+        for _ in range(width)
+    ]
 
     final_theme_colors = {}
 
@@ -144,40 +167,215 @@ def initialize_animation_parameters(args, width, height):
 
 
 def update_column_states(
-    columns, width, height, density, trail_length, available_char_sets
+    columns,
+    width,
+    height,
+    density,
+    trail_length,
+    available_char_sets,
+    rng=random,
+    drops_per_column=1,
+    spawn_cooldown=None,
+    narrow_char_set_count=None,
 ):
-    """Updates the state of each column for the next frame."""
+    """Updates the state of each column for the next frame.
+
+    `rng` provides random() and choice(); it is the random module unless a
+    RandomPool is passed in. With drops_per_column above 1, a column whose newest
+    drop has fallen more than `spawn_cooldown` rows (the trail length by default,
+    so trails never overlap) can start another drop above it with probability
+    `density`; the earlier drops keep falling in the column's older_drops.
+    New drops pick the index of one of available_char_sets. Only columns that
+    allow_wide_glyphs() may pick past the first `narrow_char_set_count` sets
+    (all of them by default), the double-width ones.
+    """
+    if spawn_cooldown is None:
+        spawn_cooldown = trail_length
+    char_set_count = len(available_char_sets)
+    if narrow_char_set_count is None:
+        narrow_char_set_count = char_set_count
     for i in range(width):
         col_state = columns[i]
+        older_drops = col_state.older_drops
+        if older_drops:
+            for drop in older_drops:
+                drop[0] += 1
+            # Drops are ordered lowest first, so only the front can have left.
+            while older_drops and older_drops[0][0] - trail_length > height:
+                older_drops.popleft()
         if col_state.head_y == 0:  # No active drop in this column
-            if random.random() < density:  # Chance to start a new drop
-                col_state.head_y = 1
-                col_state.current_char_set = (
-                    random.choice(available_char_sets) if available_char_sets else [" "]
+            if rng.random() < density:  # Chance to start a new drop
+                set_count = (
+                    char_set_count
+                    if allows_wide_glyphs(i, width)
+                    else narrow_char_set_count
                 )
-                # Trail initialization could be done here or in render
+                if set_count:  # Only wide sets, and no room for them here
+                    col_state.head_y = 1
+                    col_state.char_set_index = int(rng.random() * set_count)
         else:
             col_state.head_y += 1
             # Reset column if trail is off screen
             # The trail length is visual, head_y is the leading char's position
             if col_state.head_y - trail_length > height:
                 col_state.head_y = 0  # Reset the drop
-                # No need to change current_char_set, it will be picked when new drop starts
+                # No need to change char_set_index, it will be picked when new drop starts
+            elif (
+                drops_per_column > 1
+                and col_state.head_y > spawn_cooldown
+                and len(older_drops or ()) + 1 < drops_per_column
+                and rng.random() < density
+            ):
+                # Start another drop at the top; the current one keeps falling.
+                if older_drops is None:
+                    older_drops = col_state.older_drops = deque()
+                older_drops.append([col_state.head_y, col_state.char_set_index])
+                col_state.head_y = 1
+                col_state.char_set_index = int(
+                    rng.random()
+                    * (
+                        char_set_count
+                        if allows_wide_glyphs(i, width)
+                        else narrow_char_set_count
+                    )
+                )
     # columns list is modified in place, but returning it is fine.
     return columns
 
 
+def resize_columns(columns, width, char_set_count, rng=random):
+    """Trims or extends the list of column states in place to `width` columns.
+
+    Surviving columns keep their drops; added columns start idle with a random
+    index into the character set table. Only the added or removed columns are
+    touched, and a list that already has `width` entries is left as it is.
+    """
+    if width < len(columns):
+        del columns[width:]
+    else:
+        columns.extend(
+            ColumnState(head_y=0, char_set_index=int(rng.random() * char_set_count))
+            for _ in range(width - len(columns))
+        )
+    return columns
+
+
+class PythonColumnEngine:
+    """Default simulation engine: advances each ColumnState in a Python loop."""
+
+    def __init__(self, columns, available_char_sets, rng=random, drops_per_column=1):
+        self.columns = columns
+        # Shared table the columns' char_set_index values point into.
+        self.available_char_sets = list(available_char_sets) or [[" "]]
+        self.narrow_char_set_count = narrow_table_count(self.available_char_sets)
+        self.rng = rng
+        self.drops_per_column = drops_per_column
+
+    def update(self, height, density, trail_length):
+        """Advances all columns by one frame."""
+        update_column_states(
+            self.columns,
+            len(self.columns),
+            height,
+            density,
+            trail_length,
+            self.available_char_sets,
+            self.rng,
+            self.drops_per_column,
+            narrow_char_set_count=self.narrow_char_set_count,
+        )
+
+    def resize(self, width):
+        """Changes the number of columns, keeping the drops of the columns that remain.
+
+        Drops whose trail ends above a smaller screen height are culled by the
+        next update(), so a height change needs no work here.
+        """
+        resize_columns(self.columns, width, len(self.available_char_sets), self.rng)
+
+    def active_drop_count(self):
+        """Returns the number of active drops in all columns."""
+        return sum(
+            (col_state.head_y > 0) + len(col_state.older_drops or ())
+            for col_state in self.columns
+        )
+
+    def active_drops(self):
+        """Returns the (x, head_y, char_set) of every active drop."""
+        return iter_active_drops(self.columns, self.available_char_sets)
+
+    def memory_report(self):
+        """Returns a one-line report of the memory held by the column states."""
+        return column_memory_report(self.columns)
+
+
+def create_column_engine(
+    engine_name, columns, available_char_sets, rng=random, drops_per_column=1
+):
+    """Returns the simulation engine selected with --engine for the given columns.
+
+    The Python engine draws from `rng`; the NumPy engine draws in batches from its
+    own generator, seeded from the RandomPool's seed when one is passed.
+    """
+    if engine_name == "numpy":
+        # Rendering reads active_drops(), so the ColumnState objects need no mirroring.
+        return NumpyColumnEngine.from_columns(
+            columns,
+            available_char_sets,
+            mirror_columns=False,
+            seed=rng.seed if isinstance(rng, RandomPool) else None,
+            drops_per_column=drops_per_column,
+        )
+    return PythonColumnEngine(columns, available_char_sets, rng, drops_per_column)
+
+
 def render_frame_buffer(
     columns, width, height, active_colors, args, available_char_sets, glitch_rate
 ):  # Added available_char_sets and glitch_rate
-    """Renders the current frame into a buffer."""
-    frame_buffer = []
+    """Renders the current frame into a buffer of row strings."""
+    return [
+        "".join(char_list)
+        for char_list in render_frame_cells(
+            columns, width, height, active_colors, args, available_char_sets, glitch_rate
+        )
+    ]
+
+
+def render_frame_cells(
+    columns, width, height, active_colors, args, available_char_sets, glitch_rate
+):
+    """Renders the current frame into rows of cells.
+
+    Each cell is the text emitted for one screen position: a color escape followed
+    by a glyph for lit cells, or a single space for empty ones. Keeping the cells
+    separate lets output encoders compare frames cell by cell. active_colors may be
+    the theme's color dictionary or an already compiled Palette.
+    """
+    palette = active_colors
+    if not isinstance(palette, Palette):
+        palette = compile_palette(
+            active_colors,
+            args.theme,
+            args.color_intensity,
+            args.trail_length,
+            args.bright_length,
+            args.color_depth,
+        )
+    single_prefixes = palette.trail_prefixes[0]
+    pick_base_color = len(palette.trail_prefixes) > 1
+
+    frame_cells = []
     for y in range(1, height + 1):  # Iterate through each row of the terminal
         char_list = []
+        covered = False  # The previous cell holds a double-width glyph
         for x in range(width):  # Iterate through each column
+            if covered:
+                char_list.append("")  # Second half of the glyph to the left
+                covered = False
+                continue
             col_state = columns[x]
             trail_head_y = col_state.head_y
-            char_set_for_column = col_state.current_char_set
+            char_set_for_column = available_char_sets[col_state.char_set_index]
 
             # Determine if a character should be rendered at this (x,y)
             # A character is rendered if it's part of an active trail
@@ -189,84 +387,520 @@ def render_frame_buffer(
             ):
                 distance_from_head = trail_head_y - y
 
-                # Choose a character from the column's specific character set
-                original_char = random.choice(char_set_for_column)
-                if not original_char:  # handle empty char set
-                    original_char = " "
-
-                if wcwidth.wcwidth(original_char) != 1:
-                    original_char = " "  # Ensure single width
-
-                char_to_render = original_char
+                # Choose a character from the column's specific character set.
+                # All glyphs of a table share its width, so no per-glyph check is needed.
+                char_to_render = random.choice(char_set_for_column)
+                covered = getattr(char_set_for_column, "width", 1) == 2 and x + 1 < width
 
                 # Apply glitch effect if applicable
                 if glitch_rate > 0 and random.random() < glitch_rate:
-                    glitched_char = random.choice(char_set_for_column)
-                    if not glitched_char:
-                        glitched_char = " "
-                    if wcwidth.wcwidth(glitched_char) == 1:
-                        char_to_render = glitched_char
-
-                base_color_name = "GREEN"  # Default for classic theme or fallback
-                if args.theme == "colorful":
-                    # Filter for base colors (not BRIGHT, not WHITE, not RESET)
-                    # that are actually defined in AnsiColors enum and present in active_colors
-                    available_base_colors_in_palette = [
-                        name
-                        for name, color_val in active_colors.items()
-                        if "BRIGHT_" not in name
-                        and name not in ["WHITE", "RESET"]
-                        and name
-                        in AnsiColors.__members__  # Ensure it's a valid AnsiColor name
-                    ]
-                    if not available_base_colors_in_palette:
-                        # Fallback if no suitable base colors are found
-                        # (e.g., user specified only WHITE, or theme has no base colors)
-                        # Default to GREEN if it's in active_colors, otherwise keep "GREEN" and hope for the best
-                        if "GREEN" in active_colors:
-                            base_color_name = "GREEN"
-                        # else: base_color_name remains "GREEN", implies classic-like behavior or error if GREEN not in active_colors
-                    else:
-                        base_color_name = random.choice(
-                            available_base_colors_in_palette
-                        )
-
-                # Fetch colors from active_colors, with fallbacks to direct AnsiColor enum values
-                # This ensures that even if a color is missing from active_colors (e.g. due to user filtering),
-                # we try to get a sensible default.
-                actual_base_color = active_colors.get(
-                    base_color_name, AnsiColors.GREEN.value
+                    char_to_render = random.choice(char_set_for_column)
+
+                # The palette holds the escape for every trail position, so
+                # only the base color is picked per cell (colorful theme).
+                base_prefixes = (
+                    random.choice(palette.trail_prefixes)
+                    if pick_base_color
+                    else single_prefixes
                 )
-                bright_variant_key = f"BRIGHT_{base_color_name}"
-                actual_bright_color = active_colors.get(
-                    bright_variant_key, actual_base_color
-                )
-                color_white = active_colors.get("WHITE", AnsiColors.WHITE.value)
-
-                if args.color_intensity == "dim":
-                    c_head = actual_bright_color
-                    c_seg1 = actual_base_color
-                    c_seg2 = actual_base_color
-                elif args.color_intensity == "bright":
-                    c_head = color_white
-                    c_seg1 = color_white
-                    c_seg2 = actual_bright_color
-                else:  # normal (default)
-                    c_head = color_white
-                    c_seg1 = actual_bright_color
-                    c_seg2 = actual_base_color
-
-                # Apply color based on distance from head
-                if distance_from_head == 0:  # Head of the trail
-                    char_list.append(f"{c_head}{char_to_render}")
-                elif distance_from_head <= args.bright_length:  # Bright segment
-                    char_list.append(f"{c_seg1}{char_to_render}")
-                else:  # Dim part of the trail
-                    char_list.append(f"{c_seg2}{char_to_render}")
+                char_list.append(base_prefixes[distance_from_head] + char_to_render)
             else:
                 char_list.append(" ")  # Empty space if no character here
-        frame_buffer.append("".join(char_list))
-    return frame_buffer
+        frame_cells.append(char_list)
+    return frame_cells
+
+
+def iter_active_drops(columns, char_sets):
+    """Yields (x, head_y, char_set) for every active drop, newest drop of a column first.
+
+    char_set is looked up in `char_sets`, the table the columns' indices point into.
+    """
+    for x, col_state in enumerate(columns):
+        if col_state.head_y > 0:
+            yield x, col_state.head_y, char_sets[col_state.char_set_index]
+            if col_state.older_drops:
+                for head_y, char_set_index in col_state.older_drops:
+                    yield x, head_y, char_sets[char_set_index]
+
+
+def column_state_bytes(columns):
+    """Returns the bytes held by the column states, including their earlier drops."""
+    total = 0
+    for col_state in columns:
+        total += sys.getsizeof(col_state)
+        if col_state.older_drops is not None:
+            total += sys.getsizeof(col_state.older_drops)
+            total += sum(sys.getsizeof(drop) for drop in col_state.older_drops)
+    return total
+
+
+def column_memory_report(columns):
+    """Returns a one-line report of the memory held by the column states."""
+    total = column_state_bytes(columns)
+    per_column = total / len(columns) if columns else 0
+    return (
+        f"Columns: {len(columns)} column states using {total} bytes "
+        f"({per_column:.0f} bytes per column)."
+    )
+
+
+class CellTable(dict):
+    """Maps glyphs to the cell text of one trail position: its escape followed by the glyph.
+
+    Each cell string is built the first time its glyph is drawn there and
+    reused afterwards, so a steady-state frame looks its cells up instead of
+    allocating one new string per lit cell. Unchanged cells are then the same
+    objects as on the previous frame, which the diff encoder compares first.
+    """
+
+    __slots__ = ("prefix",)
+
+    def __init__(self, prefix):
+        super().__init__()
+        self.prefix = prefix
+
+    def __missing__(self, glyph):
+        cell = self[glyph] = self.prefix + glyph
+        return cell
+
+
+class SpanRenderer:
+    """Renders only the cells inside active trails into a reusable row buffer.
+
+    Instead of testing every (y, x) position it writes each drop's visible trail
+    span directly and blanks the spans written on the previous frame, so frame
+    cost scales with the number of lit cells rather than with the screen area.
+
+    Glyphs persist: a drop's head writes a glyph into a screen-sized glyph grid
+    as it enters a row, and the trail behind it shows those same glyphs until the
+    glitch effect mutates a sampled few of them. On the colorful theme the base
+    color is drawn and kept alongside the glyph. Only the head cells and the
+    color steps along the trail change between frames, which keeps random draws
+    near one per drop and the diff encoder's output small.
+
+    A drop whose glyph table is double-width lights its own column and turns
+    the column to its right into "" continuation cells, so each row still adds
+    up to the screen width. The width comes from the table, once per drop.
+
+    Cell strings come from per-palette CellTables, so after warm-up a frame
+    allocates per drop (span tuples, draw slices) but not per lit cell.
+    """
+
+    def __init__(self, width, height, rng=None):
+        self.width = width
+        self.height = height
+        # Glyph, glitch and color draws are taken a whole span at a time.
+        self.rng = rng if rng is not None else RandomPool()
+        self.frame_cells = [[" "] * width for _ in range(height)]
+        self.glyph_grid = [[" "] * width for _ in range(height)]
+        self.base_color_grid = [[0] * width for _ in range(height)]
+        self._spans = []  # (x, top_row, bottom_row) written on the previous frame
+        # Rows from here down hold no glyphs yet: all of them before the first
+        # render, and those added by a resize. They are filled on the next render.
+        self._fresh_row = 0
+        self._cell_tables = None  # See _cell_tables_for()
+        self._cell_tables_prefixes = None
+
+    def resize(self, width, height):
+        """Trims or extends the grids in place, keeping the glyphs of the cells that remain.
+
+        The cost follows the number of cells added or removed. Rows that become
+        visible get glyphs on the next render, so drops whose trails reached
+        below the old height show complete trails.
+        """
+        grids = (
+            (self.frame_cells, " "),
+            (self.glyph_grid, " "),
+            (self.base_color_grid, 0),
+        )
+        if width != self.width:
+            kept_height = min(height, self.height)
+            for grid, blank in grids:
+                for row in grid[:kept_height]:
+                    if width < self.width:
+                        del row[width:]
+                    else:
+                        row.extend([blank] * (width - self.width))
+        for grid, blank in grids:
+            if height < self.height:
+                del grid[height:]
+            else:
+                grid.extend([blank] * width for _ in range(height - self.height))
+        self._fresh_row = min(self._fresh_row, self.height)
+        self._spans = [
+            (x, top, min(bottom, height))
+            for x, top, bottom in self._spans
+            if x < width and top < height
+        ]
+        self.width = width
+        self.height = height
+
+    def render(self, drops, palette, glitch_rate, steps=1):
+        """Renders (x, head_y, char_set) drops and returns the row buffer.
+
+        `steps` is the number of simulation frames since the previous render;
+        every row a head entered during them gets a fresh glyph, so skipped
+        renders never leave stale glyphs in a trail. The first render fills
+        every visible trail cell, as does the first render after a resize in
+        the rows it added.
+        """
+        frame_cells = self.frame_cells
+        spans = self._spans
+        for x, top, bottom in spans:
+            for row_index in range(top, bottom):
+                frame_cells[row_index][x] = " "
+        spans.clear()
+
+        lit, covered, _ = self.update_grids(drops, palette, glitch_rate, steps)
+        cell_tables = self._cell_tables_for(palette)
+        colorful = len(cell_tables) > 1
+        glyph_grid = self.glyph_grid
+        base_color_grid = self.base_color_grid
+        single_cells = cell_tables[0]
+        for x, top, bottom, head_y, _ in lit:
+            spans.append((x, top, bottom))
+            head_row = head_y - 1
+            if colorful:
+                for row_index in range(top, bottom):
+                    frame_cells[row_index][x] = cell_tables[
+                        base_color_grid[row_index][x]
+                    ][head_row - row_index][glyph_grid[row_index][x]]
+            else:
+                for row_index in range(top, bottom):
+                    frame_cells[row_index][x] = single_cells[head_row - row_index][
+                        glyph_grid[row_index][x]
+                    ]
+        # A double-width glyph also fills the cell to its right, which becomes an
+        # empty continuation cell, written last so it wins over any trail there.
+        for x, top, bottom in covered:
+            spans.append((x, top, bottom))
+            for row_index in range(top, bottom):
+                frame_cells[row_index][x] = ""
+        return frame_cells
+
+    def _cell_tables_for(self, palette):
+        """Returns the CellTables of palette, [base_index][distance_from_head]."""
+        if self._cell_tables_prefixes is not palette.trail_prefixes:
+            self._cell_tables_prefixes = palette.trail_prefixes
+            self._cell_tables = [
+                [CellTable(prefix) for prefix in prefixes]
+                for prefixes in palette.trail_prefixes
+            ]
+        return self._cell_tables
+
+    def update_grids(self, drops, palette, glitch_rate, steps=1):
+        """Draws the glyphs and base colors of the frame into the grids.
+
+        This is the part of render() that takes random draws. Returns the
+        visible spans as (x, top, bottom, head_y, glyphs), the double-width
+        continuation spans as (x, top, bottom), and the (x, top, bottom) spans
+        of grid cells that were written, so callers that keep a copy of the
+        grids (see parallel_render) only update those.
+        """
+        glyph_grid = self.glyph_grid
+        base_color_grid = self.base_color_grid
+        rng = self.rng
+        trail_length = palette.trail_length
+        trail_prefixes = palette.trail_prefixes
+        base_color_count = len(trail_prefixes)
+        colorful = base_color_count > 1
+        fresh_row = self._fresh_row
+        self._fresh_row = self.height
+
+        lit = []  # (x, top, bottom, head_y, glyphs) of every visible span
+        covered = []  # (x, top, bottom) of the right halves of double-width spans
+        written = []  # (x, top, bottom) of the grid cells drawn below
+        for x, head_y, char_set in drops:
+            # Trail rows are 1-based y in (head_y - trail_length, head_y]; row_index = y - 1.
+            top = max(head_y - trail_length, 0)
+            bottom = min(head_y, self.height)
+            if top >= bottom:
+                continue
+            if getattr(char_set, "width", 1) == 2:
+                if x + 1 >= self.width:
+                    continue  # Left without room by a resize; it would wrap the row
+                covered.append((x + 1, top, bottom))
+            glyphs = getattr(char_set, "glyphs", char_set)  # Index the tuple directly
+            lit.append((x, top, bottom, head_y, glyphs))
+
+            # Rows the head entered since the last render (normally just the head
+            # row), and any rows that have not been filled yet.
+            fresh_top = max(top, min(head_y - steps, fresh_row))
+            if fresh_top >= bottom:
+                continue
+            written.append((x, fresh_top, bottom))
+            glyph_count = len(glyphs)
+            for row_index, u in zip(
+                range(fresh_top, bottom), rng.floats(bottom - fresh_top)
+            ):
+                glyph_grid[row_index][x] = glyphs[int(u * glyph_count)]
+            if colorful:
+                for row_index, u in zip(
+                    range(fresh_top, bottom), rng.floats(bottom - fresh_top)
+                ):
+                    base_color_grid[row_index][x] = int(u * base_color_count)
+
+        if glitch_rate > 0 and lit:
+            self._glitch(lit, glitch_rate, written)
+        return lit, covered, written
+
+    def _glitch(self, lit, glitch_rate, written):
+        """Replaces the glyphs of a random sample of the lit cells, adding them to `written`.
+
+        Rather than drawing once per lit cell, the number of glitched cells is
+        drawn from its expected value (lit cells * glitch_rate, rounded up or down
+        at random) and only those cells are picked.
+        """
+        rng = self.rng
+        span_ends = []
+        lit_cells = 0
+        for _, top, bottom, _, _ in lit:
+            lit_cells += bottom - top
+            span_ends.append(lit_cells)
+
+        expected = lit_cells * glitch_rate
+        count = int(expected)
+        if rng.random() < expected - count:
+            count += 1
+        if not count:
+            return
+
+        glyph_grid = self.glyph_grid
+        draws = rng.floats(2 * count)
+        for i in range(count):
+            cell = int(draws[2 * i] * lit_cells)
+            span_index = bisect_right(span_ends, cell)
+            x, top, _, _, glyphs = lit[span_index]
+            span_start = span_ends[span_index - 1] if span_index else 0
+            row_index = top + cell - span_start
+            glyph_grid[row_index][x] = glyphs[int(draws[2 * i + 1] * len(glyphs))]
+            written.append((x, row_index, row_index + 1))
+
+
+class FrameProducer:
+    """Advances the simulation and renders frames, independent of any terminal.
+
+    Bundles the simulation engine, the compiled palette and the span renderer
+    configured from args, so the interactive loop and headless tools produce
+    frames the same way. density, glitch_rate and palette start out from args
+    and may be changed between frames (e.g. by the quality governor). With
+    args.render_workers, render() returns a parallel_render.BandFrame for
+    FullFrameEncoder instead of rows of cells.
+    """
+
+    def __init__(self, args, width, height, colors, columns, available_char_sets):
+        self.args = args
+        self.width = width
+        self.height = height
+        self.density = args.density
+        self.glitch_rate = args.glitch_rate
+        self.columns = columns
+        self.available_char_sets = available_char_sets
+        # One seeded pool feeds both the simulation and the renderer.
+        self.rng = RandomPool(args.seed)
+        self.engine = create_column_engine(
+            args.engine, columns, available_char_sets, self.rng, args.drops_per_column
+        )
+        self.palette = compile_palette(
+            colors,
+            args.theme,
+            args.color_intensity,
+            args.trail_length,
+            args.bright_length,
+            args.color_depth,
+        )
+        self.renderer = SpanRenderer(width, height, self.rng)
+        if args.render_workers:
+            # Same draws and output, with the rows built in worker processes.
+            self.renderer = ParallelBandRenderer(self.renderer, args.render_workers)
+        self._steps_since_render = 0
+
+    def resize(self, width, height):
+        """Resizes the simulation and renderer in place for a new screen size.
+
+        Drops in the remaining columns keep falling with their glyphs, and the
+        glyph tables and palette are reused, so the rain carries on instead of
+        restarting. The cost follows the number of columns and cells added or
+        removed rather than the new screen size.
+        """
+        if width != self.width:
+            # Only the engine holds the live column state; for the Python engine
+            # that is self.columns, which it resizes in place.
+            self.engine.resize(width)
+        self.renderer.resize(width, height)
+        self.width = width
+        self.height = height
+
+    def advance(self):
+        """Advances the simulation by one frame."""
+        self.engine.update(self.height, self.density, self.args.trail_length)
+        self._steps_since_render += 1
+
+    def render(self):
+        """Renders the current simulation state and returns the rows of cells."""
+        steps = max(self._steps_since_render, 1)
+        self._steps_since_render = 0
+        return self.renderer.render(
+            self.engine.active_drops(), self.palette, self.glitch_rate, steps
+        )
+
+
+MIN_FRAME_PERIOD = 0.005
+MIN_DENSITY = 0.001
+
+
+def frame_period(args):
+    """Returns the target time between frames in seconds, from --fps or --speed."""
+    period = 1 / args.fps if args.fps else args.speed
+    return max(period, MIN_FRAME_PERIOD)
+
+
+class AnimationRunner:
+    """Produces, encodes and writes one frame at a time.
+
+    Holds everything a frame needs (producer, encoder, scheduler and the
+    optional statistics, pipeline and governor), so the blocking loop in
+    run_animation_loop and the asyncio loop share the same per-frame work.
+    `encoder` and `scheduler` are created from args when omitted. Frame timings
+    are only taken when a FrameStats object is passed as `stats`; with args.hud
+    it is also drawn as an overlay line. With a FramePipeline as `pipeline`,
+    frames are encoded into its buffers and written by its writer thread, and
+    the "write" timing becomes the time spent waiting for a free buffer. A
+    QualityGovernor passed as `governor` is fed the time spent waiting on
+    output each frame and adjusts the producer and scheduler when the terminal
+    falls behind.
+    """
+
+    def __init__(
+        self,
+        args,
+        width,
+        height,
+        colors,
+        columns,
+        available_char_sets,
+        encoder=None,
+        scheduler=None,
+        stats=None,
+        pipeline=None,
+        governor=None,
+    ):
+        self.args = args
+        self.width = width
+        self.height = height
+        self.colors = colors
+        self.producer = FrameProducer(
+            args, width, height, colors, columns, available_char_sets
+        )
+        self.encoder = encoder if encoder is not None else create_frame_encoder(args.render_mode)
+        self.scheduler = (
+            scheduler if scheduler is not None else FrameScheduler(frame_period(args))
+        )
+        self.stats = stats
+        self.pipeline = pipeline
+        self.governor = governor
+        self._show_hud = stats is not None and args.hud
+        # Frames go straight to the file descriptor, so anything already written
+        # through sys.stdout (e.g. the hide-cursor escape) must be sent first.
+        sys.stdout.flush()
+        self.fd = sys.stdout.fileno()
+        if governor is not None:
+            governor.attach(self.producer, self.scheduler)
+
+    def resize(self, width, height):
+        """Resizes the animation in place for a new screen size, keeping the falling drops."""
+        self.producer.resize(width, height)
+        self.width = width
+        self.height = height
+        # The terminal may have reflowed or cleared what was on screen.
+        self.encoder.invalidate()
+
+    def adjust_density(self, factor):
+        """Scales the spawn density by factor, within (0, 1]."""
+        density = (
+            self.governor.base_settings()[0]
+            if self.governor is not None
+            else self.producer.density
+        )
+        density = min(max(density * factor, MIN_DENSITY), 1.0)
+        if self.governor is not None:
+            self.governor.set_base(density=density)
+        else:
+            self.producer.density = density
+        return density
+
+    def adjust_frame_period(self, factor):
+        """Scales the time between frames by factor; below 1 the rain speeds up."""
+        period = (
+            self.governor.base_settings()[1]
+            if self.governor is not None
+            else self.scheduler.frame_period
+        )
+        period = max(period * factor, MIN_FRAME_PERIOD)
+        if self.governor is not None:
+            self.governor.set_base(frame_period=period)
+        else:
+            self.scheduler.frame_period = period
+        return period
+
+    def run_frame(self):
+        """Advances the simulation and, unless the scheduler drops it, draws a frame."""
+        producer = self.producer
+        encoder = self.encoder
+        scheduler = self.scheduler
+        stats = self.stats
+        pipeline = self.pipeline
+        timed = stats is not None
+        clock = time.perf_counter_ns
+
+        if timed:
+            t_start = clock()
+        # Advance the simulation every frame, so the rain keeps its speed even
+        # when the scheduler drops the rendering of frames that are running late
+        producer.advance()
+        if not scheduler.should_render():
+            if timed:
+                stats.record_dropped_frame(clock() - t_start)
+            return
+
+        if timed:
+            t_updated = clock()
+        frame_cells = producer.render()
+        if timed:
+            t_rendered = clock()
+        stall_ns = 0
+        dropped = 0
+        if pipeline is None:
+            output = encoder.encode_frame(frame_cells, producer.palette.reset)
+        else:
+            t_wait = clock()
+            output, dropped = pipeline.acquire()
+            stall_ns = clock() - t_wait
+            if dropped:
+                # The frames the diff was based on were never written.
+                encoder.invalidate()
+            encoder.encode_frame(frame_cells, producer.palette.reset, output)
+        if timed:
+            t_encoded = clock()
+        if self._show_hud:
+            output.append_text(stats.hud_output(self.width, self.height, scheduler))
+        if pipeline is not None:
+            pipeline.submit(output)
+        elif output:
+            t_write = clock()
+            output.write_to(self.fd)
+            stall_ns = clock() - t_write
+        if self.governor is not None:
+            self.governor.record_frame(stall_ns, len(output), dropped)
+        if timed:
+            stats.record_frame(
+                t_updated - t_start,
+                t_rendered - t_updated,
+                t_encoded - t_rendered,
+                clock() - t_encoded,
+                len(output),
+                producer.engine.active_drop_count(),
+            )
 
 
 def run_animation_loop(
@@ -276,36 +910,38 @@ def run_animation_loop(
     colors,
     columns,
     available_char_sets,  # Added available_char_sets
+    encoder=None,
+    scheduler=None,
+    stats=None,
+    pipeline=None,
+    governor=None,
 ):
-    """Runs the main animation loop."""
-    # colors is active_theme_colors_param
-    # columns is columns_param
-
-    MIN_EFFECTIVE_SLEEP = 0.005
-
-    while True:
-        columns = update_column_states(  # columns is updated in place and also returned
-            columns,
+    """Runs the main animation loop until interrupted.
+
+    The arguments are those of AnimationRunner; passing the encoder, scheduler
+    and the other helpers in lets the caller read their statistics after the
+    loop ends.
+    """
+    run_runner_loop(
+        AnimationRunner(
+            args,
             width,
             height,
-            args.density,
-            args.trail_length,
-            available_char_sets,  # Pass available_char_sets
-        )
-        frame_buffer = render_frame_buffer(
+            colors,
             columns,
-            width,
-            height,
-            colors,  # This is active_theme_colors
-            args,
-            available_char_sets,  # Pass available_char_sets
-            args.glitch_rate,  # Pass glitch_rate
+            available_char_sets,
+            encoder,
+            scheduler,
+            stats,
+            pipeline,
+            governor,
         )
-        # columns_param = current_columns # columns is already updated
+    )
 
-        reset_code = colors.get("RESET", AnsiColors.RESET.value)
-        sys.stdout.write("\033[H" + "\n".join(frame_buffer) + reset_code)
-        sys.stdout.flush()
 
-        actual_sleep_time = max(args.speed, MIN_EFFECTIVE_SLEEP)
-        time.sleep(actual_sleep_time)
+def run_runner_loop(runner):
+    """Runs an AnimationRunner's frames on their schedule until interrupted."""
+    runner.scheduler.start()
+    while True:
+        runner.run_frame()
+        runner.scheduler.wait_for_next_frame()
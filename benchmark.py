@@ -0,0 +1,363 @@
+"""Headless benchmark for the update, render, encode and write phases.
+
+Runs the animation without a terminal over a grid of screen sizes, themes,
+intensities, densities and glitch rates, and reports frames per second,
+microseconds per phase and bytes per frame. Results can be saved as JSON and
+compared against a saved baseline to catch regressions:
+
+    python benchmark.py --output baseline.json
+    python benchmark.py --compare baseline.json
+
+With --allocations it instead measures the memory allocated by steady-state
+frames (with tracemalloc) and the garbage collections they cause, and exits
+with status 1 when a configuration goes over the allocation budget.
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from animation_core import FrameProducer, initialize_animation_parameters
+from config import build_argument_parser
+from frame_encoders import create_frame_encoder
+
+SIZES = [(80, 24), (160, 48), (300, 80), (500, 150)]
+THEMES = ["classic", "colorful"]
+COLOR_INTENSITIES = ["dim", "normal", "bright"]
+DENSITIES = [0.025, 0.075, 0.2]
+GLITCH_RATES = [0.0, 0.01]
+
+# Smaller grid for a quick check: the corner cases of each dimension.
+QUICK_SIZES = [(80, 24), (500, 150)]
+QUICK_COLOR_INTENSITIES = ["normal"]
+QUICK_DENSITIES = [0.075]
+
+PHASES = ("update", "render", "encode", "write")
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+# Allocation budget of a steady-state frame: memory still held after it, and
+# the most it allocates at once. Frames are encoded into a reused buffer one
+# row at a time, so neither grows with the screen size.
+MAX_RETAINED_BYTES_PER_FRAME = 256
+MAX_PEAK_BYTES_PER_FRAME = 64 * 1024
+TRACED_WARMUP_FRAMES = 5
+
+
+def benchmark_configs(quick=False):
+    """Returns the grid of configurations to benchmark as a list of dicts."""
+    sizes = QUICK_SIZES if quick else SIZES
+    intensities = QUICK_COLOR_INTENSITIES if quick else COLOR_INTENSITIES
+    densities = QUICK_DENSITIES if quick else DENSITIES
+    return [
+        {
+            "width": width,
+            "height": height,
+            "theme": theme,
+            "color_intensity": intensity,
+            "density": density,
+            "glitch_rate": glitch_rate,
+        }
+        for (width, height), theme, intensity, density, glitch_rate in itertools.product(
+            sizes, THEMES, intensities, densities, GLITCH_RATES
+        )
+    ]
+
+
+def config_key(config):
+    """Returns a stable, readable identifier for a configuration."""
+    return (
+        f"{config['width']}x{config['height']}/{config['theme']}/"
+        f"{config['color_intensity']}/d{config['density']}/g{config['glitch_rate']}"
+    )
+
+
+def warmed_up_producer(config, engine="python", render_mode="full", seed=0):
+    """Returns a FrameProducer and encoder for config, run until the rain fills the screen."""
+    args = build_argument_parser().parse_args([])
+    args.theme = config["theme"]
+    args.color_intensity = config["color_intensity"]
+    args.density = config["density"]
+    args.glitch_rate = config["glitch_rate"]
+    args.engine = engine
+    args.render_mode = render_mode
+    args.seed = seed
+    width, height = config["width"], config["height"]
+
+    random.seed(seed)
+    columns, available_char_sets, colors = initialize_animation_parameters(
+        args, width, height
+    )
+    producer = FrameProducer(args, width, height, colors, columns, available_char_sets)
+    encoder = create_frame_encoder(render_mode)
+    reset_code = producer.palette.reset
+
+    # Let the rain fill the screen before measuring the steady state.
+    for _ in range(height + args.trail_length):
+        producer.advance()
+        encoder.encode_frame(producer.render(), reset_code)
+    return producer, encoder
+
+
+def run_benchmark(config, frames, engine="python", render_mode="full", seed=0):
+    """Runs one configuration headless and returns its measurements."""
+    producer, encoder = warmed_up_producer(config, engine, render_mode, seed)
+    reset_code = producer.palette.reset
+
+    totals = dict.fromkeys(PHASES, 0)
+    bytes_written = 0
+    clock = time.perf_counter_ns
+    sink = os.open(os.devnull, os.O_WRONLY)
+    try:
+        for _ in range(frames):
+            t0 = clock()
+            producer.advance()
+            t1 = clock()
+            frame_cells = producer.render()
+            t2 = clock()
+            output = encoder.encode_frame(frame_cells, reset_code)
+            t3 = clock()
+            output.write_to(sink)
+            t4 = clock()
+            totals["update"] += t1 - t0
+            totals["render"] += t2 - t1
+            totals["encode"] += t3 - t2
+            totals["write"] += t4 - t3
+            bytes_written += len(output)
+    finally:
+        os.close(sink)
+
+    us_per_phase = {phase: totals[phase] / frames / 1000 for phase in PHASES}
+    us_per_frame = sum(us_per_phase.values())
+    return {
+        "key": config_key(config),
+        "config": config,
+        "frames": frames,
+        "fps": 1_000_000 / us_per_frame if us_per_frame else float("inf"),
+        "us_per_frame": us_per_frame,
+        "us_per_phase": us_per_phase,
+        "bytes_per_frame": bytes_written / frames,
+    }
+
+
+def measure_allocations(
+    config, frames, engine="python", render_mode="full", seed=0, warmup_frames=500
+):
+    """Measures what steady-state frames allocate, with tracemalloc and the GC statistics.
+
+    Reports the growth of traced memory per frame, the most any frame had
+    allocated at once, and the number of garbage collections of each
+    generation during the measured frames.
+    """
+    producer, encoder = warmed_up_producer(config, engine, render_mode, seed)
+    reset_code = producer.palette.reset
+    # The renderer's cell tables fill up as glyphs get drawn at every trail
+    # position; this is growth towards the steady state, not per-frame cost.
+    for _ in range(warmup_frames):
+        producer.advance()
+        encoder.encode_frame(producer.render(), reset_code)
+    gc.collect()  # Start from a clean heap, so earlier garbage is not counted
+    collections_before = [stats["collections"] for stats in gc.get_stats()]
+    peak_bytes = 0
+    tracemalloc.start()
+    try:
+        # Freeing memory allocated before tracing started does not lower the
+        # traced total, so trace a few frames until the state carried from frame
+        # to frame was all allocated while tracing.
+        for _ in range(TRACED_WARMUP_FRAMES):
+            producer.advance()
+            encoder.encode_frame(producer.render(), reset_code)
+        start, _ = tracemalloc.get_traced_memory()
+        for _ in range(frames):
+            frame_start, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            producer.advance()
+            encoder.encode_frame(producer.render(), reset_code)
+            _, peak = tracemalloc.get_traced_memory()
+            peak_bytes = max(peak_bytes, peak - frame_start)
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "key": config_key(config),
+        "frames": frames,
+        "retained_bytes_per_frame": (end - start) / frames,
+        "peak_bytes_per_frame": peak_bytes,
+        "gc_collections": [
+            stats["collections"] - before
+            for stats, before in zip(gc.get_stats(), collections_before)
+        ],
+    }
+
+
+def over_allocation_budget(entry):
+    """Returns whether an entry from measure_allocations() exceeds the allocation budget."""
+    return (
+        entry["retained_bytes_per_frame"] > MAX_RETAINED_BYTES_PER_FRAME
+        or entry["peak_bytes_per_frame"] > MAX_PEAK_BYTES_PER_FRAME
+        or entry["gc_collections"][-1] > 0  # A full collection walks the whole heap
+    )
+
+
+def format_allocations(entry):
+    """Returns one table row for an allocation measurement."""
+    collections = "/".join(str(count) for count in entry["gc_collections"])
+    flag = "  OVER BUDGET" if over_allocation_budget(entry) else ""
+    return (
+        f"{entry['key']:<42} {entry['retained_bytes_per_frame']:12.1f} "
+        f"{entry['peak_bytes_per_frame']:11.0f} {collections:>9}{flag}"
+    )
+
+
+def compare_results(results, baseline, threshold=DEFAULT_REGRESSION_THRESHOLD):
+    """Returns (key, baseline_us, current_us, ratio) for every regression over threshold.
+
+    Only configurations present in both runs are compared.
+    """
+    baseline_by_key = {entry["key"]: entry for entry in baseline["results"]}
+    regressions = []
+    for entry in results:
+        previous = baseline_by_key.get(entry["key"])
+        if previous is None or not previous["us_per_frame"]:
+            continue
+        ratio = entry["us_per_frame"] / previous["us_per_frame"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                (entry["key"], previous["us_per_frame"], entry["us_per_frame"], ratio)
+            )
+    return regressions
+
+
+def format_result(entry):
+    """Returns one table row for a benchmark result."""
+    phases = " ".join(f"{entry['us_per_phase'][phase]:9.1f}" for phase in PHASES)
+    return (
+        f"{entry['key']:<42} {entry['fps']:9.1f} {phases} "
+        f"{entry['bytes_per_frame']:11.0f}"
+    )
+
+
+def parse_benchmark_arguments(argv=None):
+    """Parses the benchmark's command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the digital rain headless over a grid of configurations."
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=100,
+        help="Measured frames per configuration. Default: 100",
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Run a reduced grid (smallest and largest size, normal intensity, default density).",
+    )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default="python",
+        choices=["python", "numpy"],
+        help="Simulation engine to benchmark. Default: python",
+    )
+    parser.add_argument(
+        "--render-mode",
+        type=str,
+        default="full",
+        choices=["full", "diff"],
+        help="Frame encoder to benchmark. Default: full",
+    )
+    parser.add_argument(
+        "--allocations",
+        action="store_true",
+        help="Measure allocations and garbage collections per frame instead of timings, and exit with status 1 if any configuration is over budget.",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Write the results as JSON to this file.",
+    )
+    parser.add_argument(
+        "--compare",
+        type=str,
+        default=None,
+        help="Compare against a baseline JSON file and exit with status 1 on regressions.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_REGRESSION_THRESHOLD,
+        help="Relative slowdown of us/frame that counts as a regression. Default: 0.10",
+    )
+    args = parser.parse_args(argv)
+    if args.frames <= 0:
+        parser.error("--frames must be a positive integer.")
+    if args.threshold < 0:
+        parser.error("--threshold cannot be negative.")
+    return args
+
+
+def main(argv=None):
+    args = parse_benchmark_arguments(argv)
+    if args.allocations:
+        return allocation_main(args)
+
+    header = " ".join(f"{phase + ' us':>9}" for phase in PHASES)
+    print(f"{'configuration':<42} {'fps':>9} {header} {'bytes/frame':>11}")
+    results = []
+    for config in benchmark_configs(args.quick):
+        entry = run_benchmark(config, args.frames, args.engine, args.render_mode)
+        results.append(entry)
+        print(format_result(entry), flush=True)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "engine": args.engine,
+            "render_mode": args.render_mode,
+            "frames": args.frames,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for key, before, after, ratio in regressions:
+                print(f"  {key}: {before:.1f} us -> {after:.1f} us ({ratio:.2f}x)")
+            return 1
+        print(f"\nNo regressions over {args.threshold:.0%} against {args.compare}.")
+    return 0
+
+
+def allocation_main(args):
+    print(f"{'configuration':<42} {'retained B/f':>12} {'peak B/f':>11} {'GC 0/1/2':>9}")
+    over_budget = 0
+    for config in benchmark_configs(args.quick):
+        entry = measure_allocations(config, args.frames, args.engine, args.render_mode)
+        over_budget += over_allocation_budget(entry)
+        print(format_allocations(entry), flush=True)
+    if over_budget:
+        print(f"\n{over_budget} configuration(s) over the allocation budget.")
+        return 1
+    print("\nAll configurations within the allocation budget.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import argparse
+import importlib.util
 import sys
 from enum import Enum
 
@@ -34,8 +35,29 @@ CHARS_SYMBOLS = "←↑→↓↔↕↖↗↘↙↚↛↜↝↞↟↠↡↢↣↤
 DEFAULT_CHAR_SETS = [CHARS_LATIN, CHARS_KATAKANA, CHARS_SYMBOLS]
 
 
-def parse_arguments():
-    """Parses command-line arguments and validates them."""
+# Host a --serve address without one listens on, so only this machine can connect.
+DEFAULT_HOST = "127.0.0.1"
+
+
+def parse_address(text):
+    """Parses 'unix:PATH', 'HOST:PORT' or ':PORT' into ('unix', path) or ('tcp', (host, port)).
+
+    An empty host means DEFAULT_HOST, so a server only listens on this machine
+    unless a host is named. Raises ValueError for anything else.
+    """
+    if text.startswith("unix:"):
+        path = text[len("unix:") :]
+        if not path:
+            raise ValueError("a Unix socket address needs a path, e.g. unix:/tmp/rain.sock")
+        return "unix", path
+    host, separator, port = text.rpartition(":")
+    if not separator or not port.isdigit() or not 0 < int(port) < 65536:
+        raise ValueError(f"expected unix:PATH or [HOST]:PORT, got {text!r}")
+    return "tcp", (host.strip("[]") or DEFAULT_HOST, int(port))
+
+
+def build_argument_parser():
+    """Builds the parser for the animation's command-line options."""
     parser = argparse.ArgumentParser(
         description="Creates a Matrix-like digital rain animation in the console."
     )
@@ -45,12 +67,24 @@ def parse_arguments():
         default=0.1,
         help="Animation speed (delay between frames in seconds). Default: 0.1",
     )
+    parser.add_argument(
+        "--fps",
+        type=float,
+        default=None,
+        help="Target frames per second. Overrides --speed (which is then 1/FPS). Default: derived from --speed",
+    )
     parser.add_argument(
         "--density",
         type=float,
         default=0.075,
         help="Column density (probability of a column starting a new drop). Default: 0.075",
     )
+    parser.add_argument(
+        "--drops-per-column",
+        type=int,
+        default=1,
+        help="Maximum number of drops falling in one column at once. A column can start another drop once its newest trail has fully entered the screen. Default: 1",
+    )
     parser.add_argument(
         "--trail-length",
         type=int,
@@ -71,6 +105,13 @@ def parse_arguments():
         choices=["classic", "colorful"],
         help="Color theme for the animation. Choices: classic, colorful. Default: classic",
     )
+    parser.add_argument(
+        "--color-depth",
+        type=str,
+        default="16",
+        choices=["16", "256", "truecolor", "auto"],
+        help="Colors the terminal can show. '256' and 'truecolor' fade every trail position smoothly instead of in three steps; 'auto' picks the deepest one the COLORTERM and TERM environment variables announce. Default: 16",
+    )
     parser.add_argument(
         "--bright-length",
         type=int,
@@ -107,6 +148,109 @@ def parse_arguments():
         default="",  # Empty string by default, to distinguish from no input vs. explicit empty string
         help="String of characters to use for the rain. Overrides default character cycling. Example: --char-set '01'",
     )
+    parser.add_argument(
+        "--render-mode",
+        type=str,
+        default="full",
+        choices=["full", "diff"],
+        help="How frames are sent to the terminal. 'full' repaints the whole screen every frame, 'diff' sends only the cells that changed. Default: full",
+    )
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Build the rows of each frame in N worker processes, one band of rows each, for very large --width/--height canvases. Requires --render-mode full. Default: 0 (render in the main process)",
+    )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default="python",
+        choices=["python", "numpy"],
+        help="Simulation engine. 'python' updates one column object at a time, 'numpy' advances all columns in one vectorized step (requires numpy). Default: python",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed for all random draws, making the animation reproducible. Default: random",
+    )
+    parser.add_argument(
+        "--hud",
+        action="store_true",
+        help="Show a live performance line (phase times, FPS, frame time percentiles, bytes, drops) on the last row.",
+    )
+    parser.add_argument(
+        "--stats",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="On exit, write frame timing statistics as JSON to FILE ('-' for stdout).",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Reduce quality (glitches, density, colors, then FPS) while the terminal cannot keep up with the output, and restore it once it can.",
+    )
+    parser.add_argument(
+        "--min-density",
+        type=float,
+        default=None,
+        help="Lowest density --adaptive may reduce to. Default: a quarter of --density",
+    )
+    parser.add_argument(
+        "--min-fps",
+        type=float,
+        default=None,
+        help="Lowest frame rate --adaptive may reduce to. Default: half of the target frame rate",
+    )
+    parser.add_argument(
+        "--pipeline",
+        type=str,
+        default=None,
+        choices=["latest", "block"],
+        help="Write frames from a separate thread through a small ring of buffers. When the terminal falls behind, 'latest' discards unsent frames in favor of the newest one and 'block' waits for the writer. Default: off",
+    )
+    parser.add_argument(
+        "--serve",
+        type=str,
+        default=None,
+        metavar="ADDRESS",
+        help="Run one animation and stream it to every client connected to ADDRESS (unix:PATH or [HOST]:PORT, host defaults to 127.0.0.1) instead of drawing it locally.",
+    )
+    parser.add_argument(
+        "--connect",
+        type=str,
+        default=None,
+        metavar="ADDRESS",
+        help="Show the animation streamed by a --serve server at ADDRESS.",
+    )
+    parser.add_argument(
+        "--record",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Render --frames frames as fast as possible into FILE instead of the terminal. A name ending in .cast (or .cast.gz) gives an asciicast v2 file, any other a raw ANSI stream; a .gz suffix compresses it.",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=None,
+        help="Number of frames to render with --record.",
+    )
+    parser.add_argument(
+        "--record-format",
+        type=str,
+        default=None,
+        choices=["asciicast", "ansi"],
+        help="Format of the --record file. Default: from the file name",
+    )
+    return parser
+
+
+def parse_arguments():
+    """Parses command-line arguments and validates them."""
+    parser = build_argument_parser()
     args = parser.parse_args()
 
     if args.char_set == "":  # Check if it's an explicitly provided empty string
@@ -216,9 +360,33 @@ def parse_arguments():
     if not (0 < args.speed):
         print("Error: Animation speed must be a positive number.")
         return None
+    if args.fps is not None and not (0 < args.fps):
+        print("Error: --fps must be a positive number.")
+        return None
     if not (0 < args.density <= 1):
         print("Error: Column density must be between 0 and 1.")
         return None
+    if args.min_density is not None and not (0 < args.min_density <= args.density):
+        print("Error: Minimum density must be greater than 0 and at most --density.")
+        return None
+
+    if args.min_fps is not None and args.min_fps <= 0:
+        print("Error: Minimum FPS must be a positive number.")
+        return None
+
+    if args.render_workers < 0:
+        print("Error: --render-workers cannot be negative.")
+        return None
+    if args.render_workers and (args.render_mode != "full" or args.serve):
+        print(
+            "Error: --render-workers only works with --render-mode full and cannot be used with --serve."
+        )
+        return None
+
+    if args.drops_per_column < 1:
+        print("Error: Drops per column must be at least 1.")
+        return None
+
     if not (2 < args.trail_length):
         print("Error: Trail length must be greater than 2.")
         return None
@@ -241,6 +409,44 @@ def parse_arguments():
         print("Error: Glitch rate must be between 0.0 and 1.0 inclusive.")
         return None  # Indicates validation failure
 
+    for option, address in (("--serve", args.serve), ("--connect", args.connect)):
+        if address is not None:
+            try:
+                parse_address(address)
+            except ValueError as error:
+                print(f"Error: Invalid {option} address: {error}.")
+                return None
+    if args.serve is not None and args.connect is not None:
+        print("Error: --serve and --connect cannot be used together.")
+        return None
+    if args.serve is not None and (
+        args.pipeline or args.adaptive or args.hud or args.stats
+    ):
+        print(
+            "Error: --pipeline, --adaptive, --hud and --stats apply to local output and cannot be used with --serve."
+        )
+        return None
+
+    if args.record is not None:
+        if args.frames is None or args.frames <= 0:
+            print("Error: --record requires --frames with a positive number of frames.")
+            return None
+        if args.serve is not None or args.connect is not None:
+            print("Error: --record cannot be used with --serve or --connect.")
+            return None
+        if args.pipeline or args.adaptive or args.hud or args.stats:
+            print(
+                "Error: --pipeline, --adaptive, --hud and --stats apply to terminal output and cannot be used with --record."
+            )
+            return None
+    elif args.frames is not None or args.record_format is not None:
+        print("Error: --frames and --record-format are only used with --record.")
+        return None
+
+    if args.engine == "numpy" and importlib.util.find_spec("numpy") is None:
+        print("Error: --engine numpy requires the numpy package to be installed.")
+        return None
+
     if args.width is not None and args.width <= 0:
         print("Error: --width must be a positive integer.")
         sys.exit(1)
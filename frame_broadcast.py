@@ -0,0 +1,202 @@
+"""Broadcast server that renders the animation once and streams it to many clients."""
+
+import asyncio
+import socket
+
+from frame_buffer import FrameBuffer, write_all
+from frame_encoders import DiffFrameEncoder, encode_keyframe
+
+# Bytes a client may have waiting in its socket buffer before it stops getting
+# frames; once it is below this again it resynchronizes with a keyframe.
+DEFAULT_MAX_PENDING_BYTES = 256 * 1024
+CLIENT_READ_SIZE = 64 * 1024
+HIDE_CURSOR = b"\033[?25l"
+SHOW_CURSOR = b"\033[?25h"
+
+
+class BroadcastClient:
+    """One connected client and its synchronization state."""
+
+    __slots__ = ("frames_sent", "frames_skipped", "needs_keyframe", "writer")
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.needs_keyframe = True  # A client starts from an unknown screen
+        self.frames_sent = 0
+        self.frames_skipped = 0
+
+
+class BroadcastServer:
+    """Runs one simulation and fans its encoded frames out to every connected client.
+
+    Each frame is rendered and diff-encoded once, into a single bytes object
+    that is written to all clients that are in sync. A client that just
+    connected, or one that fell behind, gets a keyframe instead: a full repaint
+    of the current frame, encoded at most once per frame however many clients
+    need it. Backpressure is per client: once more than `max_pending_bytes`
+    are waiting in a client's socket buffer, it gets no further frames until
+    the buffer has drained below that, and then resumes with a keyframe, since
+    the diffs it missed would be needed to make sense of the next one. Slow
+    clients therefore never slow down the simulation or the other clients.
+    """
+
+    def __init__(
+        self,
+        producer,
+        scheduler,
+        reset_code,
+        encoder=None,
+        max_pending_bytes=DEFAULT_MAX_PENDING_BYTES,
+    ):
+        self.producer = producer
+        self.scheduler = scheduler
+        self.reset_code = reset_code
+        self.encoder = encoder if encoder is not None else DiffFrameEncoder()
+        self.max_pending_bytes = max_pending_bytes
+        self.clients = []
+        self.clients_served = 0
+        self.peak_clients = 0
+        self.frames_broadcast = 0
+        self.keyframes = 0
+        self.resyncs = 0
+        self.bytes_sent = 0
+        self._keyframe = FrameBuffer()
+
+    def add_client(self, writer):
+        """Starts sending frames to a StreamWriter, beginning with a keyframe."""
+        client = BroadcastClient(writer)
+        self.clients.append(client)
+        self.clients_served += 1
+        self.peak_clients = max(self.peak_clients, len(self.clients))
+        return client
+
+    def remove_client(self, client):
+        """Stops sending frames to a client and closes its connection."""
+        if client in self.clients:
+            self.clients.remove(client)
+        client.writer.close()
+
+    def run_frame(self):
+        """Advances the simulation and, unless the scheduler drops the frame, broadcasts it."""
+        producer = self.producer
+        producer.advance()
+        if not self.scheduler.should_render() or not self.clients:
+            return
+        self.broadcast(producer.render())
+
+    def broadcast(self, frame_cells):
+        """Encodes frame_cells once and writes the result to every client that can take it."""
+        # The diff is encoded even for clients that need a keyframe, so the
+        # encoder's screen always matches what the clients in sync are showing.
+        diff = self.encoder.encode_frame(frame_cells, self.reset_code).getvalue()
+        keyframe = None
+        self.frames_broadcast += 1
+        for client in tuple(self.clients):
+            writer = client.writer
+            if writer.is_closing():
+                self.remove_client(client)
+                continue
+            if writer.transport.get_write_buffer_size() > self.max_pending_bytes:
+                if not client.needs_keyframe:
+                    client.needs_keyframe = True
+                    self.resyncs += 1
+                client.frames_skipped += 1
+                continue
+            if client.needs_keyframe:
+                if keyframe is None:
+                    # Immutable bytes: the transports may hold on to them.
+                    keyframe = encode_keyframe(
+                        frame_cells, self.reset_code, self._keyframe
+                    ).getvalue()
+                data = keyframe
+                client.needs_keyframe = False
+                self.keyframes += 1
+            else:
+                data = diff
+            if data:
+                writer.write(data)
+                self.bytes_sent += len(data)
+            client.frames_sent += 1
+
+    async def handle_client(self, reader, writer):
+        """Serves one connection until the client disconnects."""
+        client = self.add_client(writer)
+        try:
+            # Clients send nothing; reading only detects the disconnect.
+            while await reader.read(CLIENT_READ_SIZE):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.remove_client(client)
+
+    async def start(self, address):
+        """Starts listening on an address from config.parse_address and returns the asyncio server."""
+        kind, location = address
+        if kind == "unix":
+            return await asyncio.start_unix_server(self.handle_client, path=location)
+        host, port = location
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    async def serve(self, address):
+        """Listens on address and broadcasts frames until cancelled (e.g. by Ctrl-C)."""
+        server = await self.start(address)
+        scheduler = self.scheduler
+        try:
+            scheduler.start()
+            while True:
+                self.run_frame()
+                remaining = scheduler.advance_deadline()
+                await asyncio.sleep(max(remaining, 0))
+        finally:
+            for client in tuple(self.clients):
+                self.remove_client(client)
+            server.close()
+
+    def summary(self):
+        """Returns a one-line report of clients, keyframes and bytes sent."""
+        return (
+            f"Broadcast: {self.frames_broadcast} frames to {self.clients_served} clients "
+            f"(at most {self.peak_clients} at once), {self.keyframes} keyframes, "
+            f"{self.resyncs} resyncs of slow clients, {self.bytes_sent / 1024:.0f} KB sent."
+        )
+
+
+def connect(address):
+    """Returns a socket connected to an address from config.parse_address."""
+    kind, location = address
+    if kind == "unix":
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(location)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    return socket.create_connection(location)
+
+
+def copy_stream(sock, fd):
+    """Copies everything received on sock to the file descriptor fd until the peer closes.
+
+    Returns the number of bytes copied. One buffer is reused for every read.
+    """
+    buffer = bytearray(CLIENT_READ_SIZE)
+    total = 0
+    with memoryview(buffer) as view:
+        while True:
+            count = sock.recv_into(buffer)
+            if not count:
+                return total
+            write_all(fd, view[:count])
+            total += count
+
+
+def run_client(address, fd, reset_code):
+    """Shows a broadcast on the terminal at fd until the server closes or Ctrl-C is pressed."""
+    with connect(address) as sock:
+        write_all(fd, HIDE_CURSOR)
+        try:
+            copy_stream(sock, fd)
+        finally:
+            write_all(fd, SHOW_CURSOR + reset_code.encode())
@@ -0,0 +1,87 @@
+"""Reusable byte buffer for encoded frames and a raw file descriptor writer."""
+
+import os
+import select
+
+
+class FrameBuffer:
+    """Collects one frame's output and holds it as bytes in a reusable bytearray.
+
+    Encoders append text pieces with append(), which is a plain list append, and
+    flush() (after each row) or finish() joins the pieces so far, encodes them
+    to UTF-8 and copies the bytes into the bytearray, so no frame-sized string
+    is ever built. The bytearray keeps its allocation from frame to frame and
+    is written to the terminal with os.write through a memoryview instead of
+    through sys.stdout, so the encoded bytes are not copied again by its
+    TextIOWrapper and buffer.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.length = 0
+        self._parts = []
+        self.append = self._parts.append
+
+    def __len__(self):
+        """Returns the size in bytes of the finished frame."""
+        return self.length
+
+    def clear(self):
+        """Starts a new frame, keeping the allocated bytes."""
+        self._parts.clear()
+        self.length = 0
+
+    def flush(self):
+        """Encodes the pieces appended so far onto the end of the byte buffer."""
+        parts = self._parts
+        if parts:
+            encoded = "".join(parts).encode("utf-8")
+            parts.clear()
+            end = self.length + len(encoded)
+            self.data[self.length : end] = encoded
+            self.length = end
+
+    def finish(self):
+        """Encodes the remaining appended pieces, completing the frame."""
+        self.flush()
+
+    def append_text(self, text):
+        """Appends text to the finished frame, such as the HUD line."""
+        encoded = text.encode("utf-8")
+        end = self.length + len(encoded)
+        self.data[self.length : end] = encoded
+        self.length = end
+
+    def write_to(self, fd):
+        """Writes the finished frame to the file descriptor fd without copying it."""
+        # Views are released before returning; the bytearray cannot grow while exported.
+        with memoryview(self.data) as view, view[: self.length] as frame:
+            return write_all(fd, frame)
+
+    def write_to_stream(self, stream):
+        """Writes the finished frame to a binary stream, such as a buffered file."""
+        with memoryview(self.data) as view, view[: self.length] as frame:
+            stream.write(frame)
+
+    def getvalue(self):
+        """Returns a copy of the finished frame as bytes."""
+        return bytes(self.data[: self.length])
+
+
+def write_all(fd, data):
+    """Writes all of `data` (any bytes-like object) to the file descriptor fd.
+
+    os.write may accept only part of the data, e.g. on pipes and terminals with a
+    full output queue, and raises BlockingIOError (EAGAIN) when fd is in
+    non-blocking mode and cannot take any; both cases wait and resume from the
+    first unwritten byte. Returns the number of bytes written.
+    """
+    with memoryview(data) as view:
+        total = len(view)
+        written = 0
+        while written < total:
+            try:
+                written += os.write(fd, view[written:])
+            except BlockingIOError:
+                select.select([], [fd], [])
+        return total
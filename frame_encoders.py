@@ -0,0 +1,429 @@
+"""Encoders that turn rendered frame cells into terminal output."""
+
+from frame_buffer import FrameBuffer
+
+RENDER_MODES = ("full", "diff")
+
+# Longest cursor positioning escape we expect to emit; gaps costing more than this
+# are never bridged, so the diff stops collecting them.
+MAX_JUMP_COST = len("\033[9999;9999H")
+# Lit cells seen so far, split into (escape, glyph). Renderers reuse their cell
+# strings, so this holds one entry per glyph and trail position; the limit only
+# guards against unbounded growth from cells built fresh every frame.
+_cell_parts = {}
+MAX_CACHED_CELLS = 1 << 16
+# Erases from the cursor to the end of its row.
+ERASE_LINE = "\033[K"
+# Shortest output moving the cursor right over n cells already blank on screen.
+_blank_skips = {}
+
+
+def cursor_position(row, column):
+    """Returns the escape sequence that moves the cursor to a 0-based (row, column)."""
+    return f"\033[{row + 1};{column + 1}H"
+
+
+def blank_skip(columns):
+    """Returns the shorter of `columns` spaces and a cursor-forward escape.
+
+    Only valid over cells that are already blank on screen, since moving the
+    cursor leaves them untouched.
+    """
+    text = _blank_skips.get(columns)
+    if text is None:
+        forward = f"\033[{columns}C"
+        text = forward if len(forward) < columns else " " * columns
+        _blank_skips[columns] = text
+    return text
+
+
+def append_cursor_down(output, row, target):
+    """Moves the cursor from `row` to the first column of a later row `target`.
+
+    Uses newlines or a cursor jump, whichever is shorter. The terminal turns a
+    newline into a carriage return and line feed.
+    """
+    jump = cursor_position(target, 0)
+    lines = target - row
+    output.append("\n" * lines if lines <= len(jump) else jump)
+
+
+def _split_cell(cell):
+    """Splits a lit cell into (escape, glyph) and caches the parts for the next lookup."""
+    if len(_cell_parts) >= MAX_CACHED_CELLS:
+        _cell_parts.clear()
+    split = cell.index("m") + 1
+    parts = _cell_parts[cell] = (cell[:split], cell[split:])
+    return parts
+
+
+def append_coalesced(cells, output, color):
+    """Appends cells to output, dropping color escapes that repeat the active color.
+
+    `output` is anything with an append(text) method, such as a list or a
+    FrameBuffer. Lit cells are a color escape followed by a glyph; any other cell
+    (a blank, or the empty continuation to the right of a double-width glyph) is
+    written as is and leaves the terminal's color untouched, since a space looks
+    the same in every foreground color. `color` is the escape currently in effect
+    on the terminal, or None when unknown. Returns the color in effect afterwards
+    and the number of escape characters that did not have to be sent.
+
+    Lit cells are split once and the parts cached, so coalescing a cell that
+    was seen before allocates nothing.
+    """
+    saved = 0
+    append = output.append
+    cell_parts = _cell_parts
+    for cell in cells:
+        if cell[:1] != "\033":
+            append(cell)
+            continue
+        escape, glyph = cell_parts.get(cell) or _split_cell(cell)
+        if escape == color:
+            append(glyph)
+            saved += len(escape)
+        else:
+            append(cell)
+            color = escape
+    return color, saved
+
+
+def append_row(row, output, color, blank_from):
+    """Appends one row, starting at its first column, skipping blank spans where cheaper.
+
+    `blank_from` is the column from which the row is known to be blank on
+    screen. A blank span over such cells becomes a cursor-forward escape when
+    that is shorter than the spaces, and a trailing one is left out entirely.
+    Cells that may still show something are overwritten with spaces, or
+    erased to the end of the row when that costs less. `color` is as for
+    append_coalesced().
+
+    Returns the color in effect afterwards, the escape characters saved by
+    coalescing, and the column after the row's last non-blank cell, which is
+    where the row is blank on screen from now on.
+    """
+    saved = 0
+    append = output.append
+    cell_parts = _cell_parts
+    blank_start = -1
+    for x, cell in enumerate(row):
+        if cell == " ":
+            if blank_start < 0:
+                blank_start = x
+            continue
+        if blank_start >= 0:
+            blank_from = _append_blank_span(output, blank_start, x, blank_from)
+            blank_start = -1
+        if cell[:1] != "\033":
+            append(cell)
+            continue
+        escape, glyph = cell_parts.get(cell) or _split_cell(cell)
+        if escape == color:
+            append(glyph)
+            saved += len(escape)
+        else:
+            append(cell)
+            color = escape
+    if blank_start < 0:
+        return color, saved, len(row)
+    stale = blank_from - blank_start
+    if stale > 0:
+        append(" " * stale if stale <= len(ERASE_LINE) else ERASE_LINE)
+    return color, saved, blank_start
+
+
+def _append_blank_span(output, start, end, blank_from):
+    """Appends the cheapest output leaving columns [start, end) blank, with more cells after.
+
+    Returns the column from which the row is known to be blank afterwards.
+    """
+    stale = min(end, blank_from) - start  # Cells that may still show something
+    if stale <= 0:
+        output.append(blank_skip(end - start))
+        return blank_from
+    clean = end - start - stale
+    overwrite_cost = stale + (len(blank_skip(clean)) if clean else 0)
+    skip = blank_skip(end - start)
+    if len(ERASE_LINE) + len(skip) < overwrite_cost:
+        output.append(ERASE_LINE)
+        output.append(skip)
+        return start
+    output.append(" " * stale)
+    if clean:
+        output.append(blank_skip(clean))
+    return blank_from
+
+
+def append_row_range(rows, output, extents, top=0, cursor_row=None):
+    """Appends rows top, top + 1, ... of a repaint with append_row(), skipping blank rows.
+
+    extents[i] is the column from which row top + i is known to be blank on
+    screen, and is updated to what the row leaves there. A row blank both on
+    screen and in the frame adds no output. The cursor starts on `cursor_row`,
+    at its first column or after text already written there; with None, the
+    first row that has output is written wherever the cursor is, and the
+    caller moves it there. `output` is flushed after each row when it has a
+    flush() method.
+
+    Returns the color in effect afterwards, the escape characters saved, the
+    first row written (None when all were skipped) and the cursor's row.
+    """
+    color = None
+    saved = 0
+    first = None
+    flush = getattr(output, "flush", None)
+    for i, row in enumerate(rows):
+        extent = extents[i]
+        if not extent and row.count(" ") == len(row):
+            continue
+        y = top + i
+        if first is None:
+            first = y
+            if cursor_row is None:
+                cursor_row = y
+        if y != cursor_row:
+            append_cursor_down(output, cursor_row, y)
+            cursor_row = y
+        color, row_saved, extents[i] = append_row(row, output, color, extent)
+        saved += row_saved
+        if flush is not None:
+            flush()  # One row at a time keeps the pending pieces short
+    return color, saved, first, cursor_row
+
+
+class OutputStats:
+    """Counts frames and output bytes, with and without SGR coalescing."""
+
+    def __init__(self):
+        self.frames = 0
+        self.bytes_written = 0
+        self.bytes_saved = 0
+        self.last_frame_bytes = 0
+
+    def record(self, output_bytes, saved):
+        """Records one frame's output size and the escape bytes coalescing removed from it."""
+        self.frames += 1
+        self.last_frame_bytes = output_bytes
+        self.bytes_written += output_bytes
+        self.bytes_saved += saved  # Escape sequences are ASCII, so chars == bytes
+
+    def summary(self):
+        """Returns a one-line report of the average bytes per frame."""
+        if not self.frames:
+            return "No frames written."
+        after = self.bytes_written / self.frames
+        before = (self.bytes_written + self.bytes_saved) / self.frames
+        return (
+            f"Output: {after:.0f} bytes/frame with SGR coalescing, "
+            f"{before:.0f} bytes/frame without ({self.frames} frames)."
+        )
+
+
+class FrameEncoder:
+    """Base class for encoders that write each frame into a reusable FrameBuffer."""
+
+    def __init__(self):
+        self.buffer = FrameBuffer()
+        self.stats = OutputStats()
+
+    def encode_frame(self, frame_cells, reset_code, output=None):
+        """Encodes frame_cells into `output` (self.buffer by default) and returns it.
+
+        The buffer is cleared first; it is empty when there is nothing to send.
+        """
+        raise NotImplementedError
+
+    def encode(self, frame_cells, reset_code):
+        """Returns the output for frame_cells as text."""
+        return self.encode_frame(frame_cells, reset_code).getvalue().decode("utf-8")
+
+    def invalidate(self):
+        """Forgets any screen state, so the next frame is a full repaint."""
+
+
+class FullFrameEncoder(FrameEncoder):
+    """Repaints the whole screen on every frame.
+
+    Only blank cells are left out: the encoder remembers where each row of
+    the screen turns blank, so blank spans already blank on screen are
+    skipped with cursor movement and rows blank in both frames are not
+    written at all (see append_row_range()).
+
+    Besides rows of cells it accepts frames that append their own rows, such
+    as a parallel_render.BandFrame: these have a `shape` of (rows, columns) and
+    an append_rows(output, extents) method that updates the extents as
+    append_row_range() does and returns the escape characters saved.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._size = None
+        self._extents = None
+
+    def invalidate(self):
+        """Forgets where the screen is blank, so the next frame rewrites every cell."""
+        self._extents = None
+
+    def encode_frame(self, frame_cells, reset_code, output=None):
+        """Encodes a complete repaint of frame_cells into the buffer."""
+        if output is None:
+            output = self.buffer
+        output.clear()
+        append_rows = getattr(frame_cells, "append_rows", None)
+        if append_rows is not None:
+            size = frame_cells.shape
+        else:
+            size = (len(frame_cells), len(frame_cells[0]) if frame_cells else 0)
+        if self._size is not None and size != self._size:
+            # A smaller frame would leave parts of the old one on screen.
+            output.append("\033[H\033[2J")
+            self._extents = [0] * size[0]
+        else:
+            output.append("\033[H")
+            if self._extents is None:
+                # Unknown screen contents: every cell may need overwriting.
+                self._extents = [size[1]] * size[0]
+        self._size = size
+        if append_rows is not None:
+            saved = append_rows(output, self._extents)
+        else:
+            saved = _append_rows(frame_cells, output, self._extents)
+        output.append(reset_code)
+        output.finish()
+        self.stats.record(len(output), saved)
+        return output
+
+
+class DiffFrameEncoder(FrameEncoder):
+    """Sends only the cells that changed since the previously emitted frame.
+
+    The encoder keeps its own copy of the screen it last wrote. Changed cells are
+    grouped into runs per row, and each run is prefixed with a single cursor
+    positioning escape. Short stretches of unchanged cells between two changes are
+    re-sent instead of starting a new run whenever that is cheaper than another
+    cursor escape. Once the rest of a row is blank, its remaining changes are
+    erased to the end of the row when that is shorter than sending the spaces.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.previous_cells = None
+
+    def invalidate(self):
+        """Forgets the emitted screen so the next frame is a full repaint."""
+        self.previous_cells = None
+
+    def encode_frame(self, frame_cells, reset_code, output=None):
+        """Encodes the output that turns the previous frame into frame_cells."""
+        if output is None:
+            output = self.buffer
+        output.clear()
+        previous_cells = self.previous_cells
+        if (
+            previous_cells is None
+            or len(previous_cells) != len(frame_cells)
+            or (frame_cells and len(previous_cells[0]) != len(frame_cells[0]))
+        ):
+            # No usable screen state (first frame or a size change): repaint everything.
+            self.previous_cells = [list(row) for row in frame_cells]
+            output.append("\033[H\033[2J")
+            saved = _append_rows(frame_cells, output, [0] * len(frame_cells))
+        else:
+            color = None
+            saved = 0
+            changed = False
+            for y, row in enumerate(frame_cells):
+                previous_row = previous_cells[y]
+                if previous_row == row:
+                    continue
+                changed = True
+                # The terminal keeps its color across cursor moves, so the color
+                # state carries over from one run (and row) to the next.
+                color, row_saved = self._encode_row_changes(
+                    y, row, previous_row, output, color
+                )
+                saved += row_saved
+                output.flush()
+            if not changed:
+                return output
+
+        output.append(reset_code)
+        output.finish()
+        self.stats.record(len(output), saved)
+        return output
+
+    @staticmethod
+    def _encode_row_changes(y, row, previous_row, output, color):
+        """Appends runs of changed cells of one row to output, updating previous_row.
+
+        Returns the color in effect afterwards and the escape characters saved.
+        """
+        saved = 0
+        in_run = False
+        gap = []  # Unchanged cells seen since the current run's last change
+        gap_cost = 0
+        blank_from = len(row)
+        while blank_from and row[blank_from - 1] == " ":
+            blank_from -= 1
+        for x, cell in enumerate(row):
+            if cell == previous_row[x]:
+                if in_run:
+                    gap.append(cell)
+                    gap_cost += len(cell)
+                    if gap_cost > MAX_JUMP_COST:
+                        in_run = False
+                        gap.clear()
+                        gap_cost = 0
+                continue
+
+            if not in_run:
+                output.append(cursor_position(y, x))
+            elif gap:
+                jump = cursor_position(y, x)
+                if gap_cost <= len(jump):
+                    # Bridging the gap is cheaper than jumping
+                    color, gap_saved = append_coalesced(gap, output, color)
+                    saved += gap_saved
+                else:
+                    output.append(jump)
+            gap.clear()
+            gap_cost = 0
+            if x >= blank_from:
+                tail = previous_row[x:]
+                if len(tail) - tail.count(" ") > len(ERASE_LINE):
+                    # Each remaining change is a space costing at least a byte.
+                    output.append(ERASE_LINE)
+                    previous_row[x:] = row[x:]
+                    break
+                blank_from = len(row)  # Cheaper to send: stop checking
+            color, cell_saved = append_coalesced((cell,), output, color)
+            saved += cell_saved
+            previous_row[x] = cell
+            in_run = True
+        return color, saved
+
+
+def _append_rows(frame_cells, output, extents):
+    """Appends a repaint of all rows from the home position; returns the escape characters saved."""
+    return append_row_range(frame_cells, output, extents, cursor_row=0)[1]
+
+
+def encode_keyframe(frame_cells, reset_code, output):
+    """Encodes a cleared screen with all of frame_cells into output and returns it.
+
+    Keeps no screen state, so the result can bring any terminal in sync, e.g. a
+    broadcast client that just connected.
+    """
+    output.clear()
+    output.append("\033[H\033[2J")
+    _append_rows(frame_cells, output, [0] * len(frame_cells))
+    output.append(reset_code)
+    output.finish()
+    return output
+
+
+def create_frame_encoder(render_mode):
+    """Returns the encoder for the given --render-mode value."""
+    if render_mode == "diff":
+        return DiffFrameEncoder()
+    return FullFrameEncoder()
@@ -0,0 +1,110 @@
+"""Writer thread that drains encoded frames from a bounded ring of reusable buffers."""
+
+import threading
+from collections import deque
+
+from frame_buffer import FrameBuffer
+
+PIPELINE_POLICIES = ("latest", "block")
+DEFAULT_SLOT_COUNT = 3
+
+
+class FramePipeline:
+    """Decouples producing frames from writing them to a slow terminal.
+
+    A fixed ring of FrameBuffers is allocated up front. The producer takes a free
+    buffer with acquire(), encodes a frame into it and hands it over with
+    submit(); a writer thread sends submitted buffers to the file descriptor in
+    order and returns them to the free list. When every buffer is still waiting
+    to be written, the policy decides what happens:
+
+    - "block": acquire() waits until the writer has sent a buffer.
+    - "latest": the queued, unsent frames are discarded so the newest frame is
+      shown as soon as possible. acquire() then reports how many were dropped,
+      and a diff encoder must repaint the whole screen, since the frames it
+      diffed against never reached the terminal.
+    """
+
+    def __init__(self, fd, policy="latest", slot_count=DEFAULT_SLOT_COUNT):
+        if policy not in PIPELINE_POLICIES:
+            raise ValueError(f"Unknown pipeline policy: {policy}")
+        self.fd = fd
+        self.policy = policy
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self._free = deque(FrameBuffer() for _ in range(slot_count))
+        self._queued = deque()
+        self._closed = False
+        self._error = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._write_frames, name="frame-writer", daemon=True
+        )
+        self._thread.start()
+
+    def acquire(self):
+        """Returns (buffer, dropped): a free buffer and the number of queued frames discarded."""
+        with self._condition:
+            self._raise_writer_error()
+            dropped = 0
+            if not self._free and self.policy == "latest" and self._queued:
+                dropped = len(self._queued)
+                self.frames_dropped += dropped
+                self._free.extend(self._queued)
+                self._queued.clear()
+            while not self._free:
+                self._condition.wait()
+                self._raise_writer_error()
+            buffer = self._free.popleft()
+        buffer.clear()
+        return buffer, dropped
+
+    def submit(self, buffer):
+        """Queues a filled buffer for writing; empty buffers go straight back to the ring."""
+        with self._condition:
+            if buffer:
+                self._queued.append(buffer)
+            else:
+                self._free.append(buffer)
+            self._condition.notify_all()
+
+    def close(self):
+        """Writes the frames still queued, then stops the writer thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def summary(self):
+        """Returns a one-line report of frames written and discarded."""
+        return (
+            f"Pipeline: {self.frames_written} frames written, "
+            f"{self.frames_dropped} discarded ({self.policy} policy)."
+        )
+
+    def _raise_writer_error(self):
+        # The writer thread has stopped, so every later acquire() fails the same way.
+        if self._error is not None:
+            raise self._error
+
+    def _write_frames(self):
+        condition = self._condition
+        while True:
+            with condition:
+                while not self._queued and not self._closed:
+                    condition.wait()
+                if not self._queued:
+                    return
+                buffer = self._queued.popleft()
+            try:
+                buffer.write_to(self.fd)
+            except OSError as error:
+                with condition:
+                    self._error = error
+                    self._free.append(buffer)
+                    condition.notify_all()
+                return
+            with condition:
+                self.frames_written += 1
+                self._free.append(buffer)
+                condition.notify_all()
@@ -0,0 +1,121 @@
+"""Headless recording of the animation to asciicast v2 or raw ANSI files."""
+
+import gzip
+import io
+import json
+import time
+
+RECORD_FORMATS = ("asciicast", "ansi")
+# Frames are collected in a buffer this large before each write to the file.
+RECORD_BUFFER_SIZE = 1 << 20
+# zlib level for .gz files: close to the smallest output at a fraction of level 9's time.
+RECORD_COMPRESSLEVEL = 6
+# Playback starts on a cleared screen without a cursor and ends by restoring it.
+PREAMBLE = b"\033[?25l\033[H\033[2J"
+EPILOGUE = b"\033[?25h"
+
+
+def record_format_for(path):
+    """Returns the format implied by a file name: asciicast for .cast (or .cast.gz), else ansi."""
+    name = path.removesuffix(".gz")
+    return "asciicast" if name.endswith(".cast") else "ansi"
+
+
+def open_record_file(path):
+    """Opens path for buffered binary writing, gzip-compressed as it is written if it ends in .gz."""
+    if path.endswith(".gz"):
+        return io.BufferedWriter(gzip.open(path, "wb", RECORD_COMPRESSLEVEL), RECORD_BUFFER_SIZE)
+    return open(path, "wb", buffering=RECORD_BUFFER_SIZE)
+
+
+class FrameRecorder:
+    """Writes encoded frames to a file, timestamped at a fixed frame period.
+
+    Frame n is stamped n * frame_period seconds, whatever the time it took to
+    produce, so a recording replays at the intended speed and the same seed
+    always gives the same file. In the asciicast format (v2, as played by
+    asciinema) every frame becomes one output event line after a header with the
+    screen size; in the ansi format the frames are written back to back, to be
+    replayed with e.g. `cat`. Writes go through a large buffer (and gzip for a
+    .gz name), so the file sees a few big writes rather than one per frame.
+    """
+
+    def __init__(
+        self,
+        path,
+        width,
+        height,
+        frame_period,
+        record_format=None,
+        clock=time.perf_counter,
+    ):
+        self.path = path
+        self.format = record_format or record_format_for(path)
+        if self.format not in RECORD_FORMATS:
+            raise ValueError(f"Unknown record format: {self.format}")
+        self.frame_period = frame_period
+        self.frames = 0
+        self.bytes_recorded = 0
+        self.elapsed = 0.0
+        self._clock = clock
+        self._started = clock()
+        self._stream = open_record_file(path)
+        if self.format == "asciicast":
+            header = {"version": 2, "width": width, "height": height}
+            self._stream.write(json.dumps(header).encode() + b"\n")
+        self._write(0.0, PREAMBLE)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write_frame(self, output):
+        """Writes a finished FrameBuffer as the next frame; an empty one only advances the time."""
+        timestamp = self.frames * self.frame_period
+        self.frames += 1
+        if output:
+            if self.format == "asciicast":
+                self._write(timestamp, output.getvalue())
+            else:
+                output.write_to_stream(self._stream)
+                self.bytes_recorded += len(output)
+
+    def close(self):
+        """Writes the epilogue and flushes and closes the file."""
+        if self._stream.closed:
+            return
+        self._write(self.frames * self.frame_period, EPILOGUE)
+        self._stream.close()
+        self.elapsed = self._clock() - self._started
+
+    def _write(self, timestamp, data):
+        if self.format == "asciicast":
+            event = [round(timestamp, 6), "o", data.decode("utf-8")]
+            line = json.dumps(event, ensure_ascii=False) + "\n"
+            self._stream.write(line.encode("utf-8"))
+        else:
+            self._stream.write(data)
+        self.bytes_recorded += len(data)
+
+    def summary(self):
+        """Returns a one-line report of what was recorded and how fast."""
+        rate = self.frames / self.elapsed if self.elapsed > 0 else 0.0
+        return (
+            f"Recorded {self.frames} frames ({self.frames * self.frame_period:.1f} s of "
+            f"animation, {self.bytes_recorded / 1024:.0f} KB of terminal output) to "
+            f"{self.path} as {self.format} in {self.elapsed:.2f} s ({rate:.0f} frames/s)."
+        )
+
+
+def record_animation(producer, encoder, recorder, frames):
+    """Produces, encodes and records `frames` frames as fast as possible.
+
+    Nothing sleeps and every frame is rendered, so with a fixed seed the
+    recording is the same on every run.
+    """
+    reset_code = producer.palette.reset
+    for _ in range(frames):
+        producer.advance()
+        recorder.write_frame(encoder.encode_frame(producer.render(), reset_code))
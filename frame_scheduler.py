@@ -0,0 +1,82 @@
+"""Fixed-timestep frame pacing on a monotonic clock."""
+
+import time
+
+# Never render less than once every this many frames, however late we are.
+MAX_CONSECUTIVE_DROPS = 5
+
+
+class FrameScheduler:
+    """Holds a constant frame period regardless of how long each frame takes.
+
+    Frame deadlines are computed from the start time (start + n * period) rather
+    than by sleeping a fixed delay after each frame, so render time does not add
+    to the period and timing errors do not accumulate. When a frame overruns its
+    deadline, the caller is told to skip rendering the next frame while still
+    advancing the simulation, which keeps the rain moving at the same speed on
+    slow machines and large screens. If the loop falls far behind (e.g. after the
+    process was suspended) the schedule is restarted instead of catching up.
+    """
+
+    def __init__(self, frame_period, clock=time.monotonic, sleep=time.sleep):
+        self.frame_period = frame_period
+        self._clock = clock
+        self._sleep = sleep
+        self._next_deadline = None
+        self._consecutive_drops = 0
+        self.frames = 0
+        self.late_frames = 0
+        self.dropped_frames = 0
+
+    def start(self):
+        """Starts the schedule; the first frame is due one period from now."""
+        self._next_deadline = self._clock() + self.frame_period
+
+    def should_render(self):
+        """Returns False if this frame should be dropped to catch up with the schedule.
+
+        Call once per frame after advancing the simulation.
+        """
+        if self._next_deadline is None:
+            self.start()
+        self.frames += 1
+        if (
+            self._clock() >= self._next_deadline
+            and self._consecutive_drops < MAX_CONSECUTIVE_DROPS
+        ):
+            self._consecutive_drops += 1
+            self.dropped_frames += 1
+            return False
+        self._consecutive_drops = 0
+        return True
+
+    def wait_for_next_frame(self):
+        """Sleeps until the current frame's deadline and schedules the next one."""
+        remaining = self.advance_deadline()
+        if remaining > 0:
+            self._sleep(remaining)
+
+    def advance_deadline(self):
+        """Schedules the next frame and returns the seconds left until the current deadline.
+
+        For loops that do their own waiting (e.g. with asyncio.sleep); a result of
+        zero or less means the frame is late and there is nothing to wait for.
+        """
+        if self._next_deadline is None:
+            self.start()
+        now = self._clock()
+        remaining = self._next_deadline - now
+        if remaining <= 0:
+            self.late_frames += 1
+            if -remaining > MAX_CONSECUTIVE_DROPS * self.frame_period:
+                # Too far behind to catch up by dropping frames: restart the schedule.
+                self._next_deadline = now
+        self._next_deadline += self.frame_period
+        return remaining
+
+    def summary(self):
+        """Returns a one-line report of late and dropped frames."""
+        return (
+            f"Frames: {self.frames} simulated at {1 / self.frame_period:.1f} FPS target, "
+            f"{self.late_frames} late, {self.dropped_frames} dropped."
+        )
@@ -0,0 +1,149 @@
+"""Character sets compiled into width-checked glyph tables for the render loop."""
+
+from dataclasses import dataclass
+
+import wcwidth
+
+from config import CHARS_KATAKANA, CHARS_LATIN, CHARS_SYMBOLS
+
+CHAR_SET_NAMES = {
+    CHARS_LATIN: "latin",
+    CHARS_KATAKANA: "katakana",
+    CHARS_SYMBOLS: "symbols",
+}
+
+
+# Display widths a table can hold: one cell, or two (e.g. Katakana).
+GLYPH_WIDTHS = (1, 2)
+WIDTH_NAMES = {1: "single", 2: "double"}
+
+
+@dataclass(frozen=True)
+class GlyphTable:
+    """A character set with every glyph validated once for one display width.
+
+    All glyphs of a table share its `width`, 1 or 2 cells, so the render loop
+    lays out a whole trail from the table's width without calling wcwidth.
+    compile_glyph_tables() splits a set that mixes both widths into one table
+    of each; glyphs of neither width (e.g. combining marks) are filtered out. A
+    set with no usable glyphs keeps a single space and is marked `blank`.
+    Tables behave like read-only sequences, so random.choice() works on them
+    directly.
+    """
+
+    name: str
+    glyphs: tuple[str, ...]
+    source_size: int
+    blank: bool = False
+    width: int = 1
+
+    def __len__(self):
+        return len(self.glyphs)
+
+    def __getitem__(self, index):
+        return self.glyphs[index]
+
+    @property
+    def rejected(self):
+        """Number of glyphs from the source set that were dropped."""
+        return self.source_size - (0 if self.blank else len(self.glyphs))
+
+    def describe(self):
+        """Returns a one-line summary of the table for startup reporting."""
+        usable = 0 if self.blank else len(self.glyphs)
+        summary = f"{self.name}: {usable}/{self.source_size} glyphs usable"
+        if self.width != 1:
+            summary += f" ({WIDTH_NAMES[self.width]}-width)"
+        if self.rejected:
+            summary += f", {self.rejected} not {WIDTH_NAMES[self.width]}-width"
+        if self.blank:
+            summary += " (renders as blank)"
+        return summary
+
+
+def _set_name(chars, name):
+    if name is not None:
+        return name
+    return CHAR_SET_NAMES.get(chars, "custom") if isinstance(chars, str) else "custom"
+
+
+def _glyphs_by_width(source):
+    """Returns the glyphs of source grouped by display width, for the widths in GLYPH_WIDTHS."""
+    by_width = {width: [] for width in GLYPH_WIDTHS}
+    for glyph in source:
+        glyph_width = wcwidth.wcwidth(glyph)
+        if glyph_width in by_width:
+            by_width[glyph_width].append(glyph)
+    return by_width
+
+
+def compile_glyph_table(chars, name=None):
+    """Builds a single GlyphTable from a string or list of characters.
+
+    The table takes whichever width most glyphs have (single on a tie) and
+    drops the others; compile_glyph_tables() keeps them in a second table.
+    """
+    name = _set_name(chars, name)
+    source = list(chars)
+    by_width = _glyphs_by_width(source)
+    width = max(GLYPH_WIDTHS, key=lambda w: len(by_width[w]))  # First (single) on a tie
+    glyphs = tuple(by_width[width])
+    if not glyphs:
+        return GlyphTable(name, (" ",), len(source), blank=True)
+    return GlyphTable(name, glyphs, len(source), width=width)
+
+
+def compile_glyph_tables(chars, name=None):
+    """Builds one GlyphTable per display width found in a character set, narrow first.
+
+    A set mixing single- and double-width glyphs keeps all of them: the wide
+    ones go to their own table, which columns with room for them draw from.
+    Glyphs of neither width are counted as rejected by the first table.
+    """
+    name = _set_name(chars, name)
+    source = list(chars)
+    by_width = _glyphs_by_width(source)
+    widths = [width for width in GLYPH_WIDTHS if by_width[width]]
+    if len(widths) < 2:
+        return [compile_glyph_table(source, name)]
+    unusable = len(source) - sum(len(by_width[width]) for width in widths)
+    return [
+        GlyphTable(
+            name,
+            tuple(by_width[width]),
+            len(by_width[width]) + (unusable if index == 0 else 0),
+            width=width,
+        )
+        for index, width in enumerate(widths)
+    ]
+
+
+def narrow_table_count(glyph_tables):
+    """Returns how many tables at the start of glyph_tables are single-width.
+
+    Tables are ordered narrow first (see initialize_animation_parameters), so
+    indices below this count are the ones a column without room for a wide
+    glyph may use. Plain sequences of characters count as single-width.
+    """
+    count = 0
+    for table in glyph_tables:
+        if getattr(table, "width", 1) != 1:
+            break
+        count += 1
+    return count
+
+
+def allows_wide_glyphs(x, width):
+    """Returns whether column x of a screen `width` columns wide may hold double-width glyphs.
+
+    Wide trails start on even columns with a column to their right, which the
+    glyph's second half covers, so two wide trails never overlap and every row
+    keeps its width.
+    """
+    return x % 2 == 0 and x + 1 < width
+
+
+def report_glyph_tables(glyph_tables, file):
+    """Prints per-table statistics, one line per character set."""
+    for table in glyph_tables:
+        print(f"Character set {table.describe()}", file=file)
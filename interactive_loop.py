@@ -0,0 +1,165 @@
+"""asyncio animation loop with keyboard controls and terminal resize handling."""
+
+import asyncio
+import os
+import signal
+
+from terminal_utils import current_terminal_size
+
+# Keys (or the escape sequences of arrow keys) and what they do.
+KEY_ACTIONS = {
+    " ": "pause",
+    "p": "pause",
+    "+": "faster",
+    "=": "faster",
+    "\033[A": "faster",
+    "-": "slower",
+    "_": "slower",
+    "\033[B": "slower",
+    "]": "denser",
+    "\033[C": "denser",
+    "[": "sparser",
+    "\033[D": "sparser",
+    "q": "quit",
+    "Q": "quit",
+}
+# Factor applied to the frame rate or density per key press.
+SPEED_STEP = 1.25
+DENSITY_STEP = 1.25
+
+
+def parse_keys(text):
+    """Yields the keys in text read from a terminal, keeping escape sequences whole."""
+    i = 0
+    while i < len(text):
+        if text.startswith("\033[", i) and i + 2 < len(text):
+            yield text[i : i + 3]
+            i += 3
+        else:
+            yield text[i]
+            i += 1
+
+
+def split_keys(text):
+    """Returns the keys in text and any partial escape sequence it ends with.
+
+    A read can end in the middle of an arrow key's escape sequence; its start
+    is returned separately, to be prepended to the next read, instead of
+    being taken as separate keys ("[" alone changes the density).
+    """
+    if text.endswith("\033"):
+        held = 1
+    elif text.endswith("\033["):
+        held = 2
+    else:
+        return list(parse_keys(text)), ""
+    return list(parse_keys(text[:-held])), text[-held:]
+
+
+class AnimationController:
+    """Runs an AnimationRunner on asyncio, reacting to keys and resizes as events.
+
+    Key presses arrive through a reader callback on the input file descriptor
+    and resizes through a SIGWINCH handler, so nothing is polled. A resize only
+    marks the screen size as stale; it is applied before the next frame, so a
+    burst of signals while a window is being dragged costs one resize. Other
+    keys change settings that the next frame picks up. Between frames the loop
+    waits on an event with the time left until the frame's deadline as timeout,
+    which lets pause, resume and quit take effect at once.
+    """
+
+    def __init__(self, runner, terminal_size=current_terminal_size):
+        self.runner = runner
+        self.paused = False
+        self.stopped = False
+        self._terminal_size = terminal_size
+        self._resize_pending = False
+        self._wake = None
+        self._partial_key = ""  # Start of an escape sequence split across reads
+
+    def handle_key(self, key):
+        """Applies one key press and returns the action it triggered, or None."""
+        action = KEY_ACTIONS.get(key)
+        runner = self.runner
+        if action == "pause":
+            self.paused = not self.paused
+            if not self.paused:
+                runner.scheduler.start()  # Resume on a fresh schedule instead of catching up
+        elif action == "faster":
+            runner.adjust_frame_period(1 / SPEED_STEP)
+        elif action == "slower":
+            runner.adjust_frame_period(SPEED_STEP)
+        elif action == "denser":
+            runner.adjust_density(DENSITY_STEP)
+        elif action == "sparser":
+            runner.adjust_density(1 / DENSITY_STEP)
+        elif action == "quit":
+            self.stopped = True
+        if action in ("pause", "quit") and self._wake is not None:
+            self._wake.set()
+        return action
+
+    def request_resize(self):
+        """Marks the screen size as stale; called from the SIGWINCH handler."""
+        self._resize_pending = True
+
+    def apply_pending_resize(self):
+        """Resizes the runner to the terminal's current size if a resize was signalled."""
+        if not self._resize_pending:
+            return False
+        self._resize_pending = False
+        size = self._terminal_size(self.runner.fd)
+        if size is None or size == (self.runner.width, self.runner.height):
+            return False
+        self.runner.resize(*size)
+        return True
+
+    async def run(self, input_fd=None, watch_resize=False):
+        """Runs frames until 'q' is pressed or the task is cancelled (e.g. by Ctrl-C)."""
+        loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        if input_fd is not None:
+            loop.add_reader(input_fd, self._read_input, input_fd)
+        if watch_resize:
+            loop.add_signal_handler(signal.SIGWINCH, self.request_resize)
+        scheduler = self.runner.scheduler
+        try:
+            scheduler.start()
+            while not self.stopped:
+                if self.paused:
+                    await self._wait(None)
+                    continue
+                self.apply_pending_resize()
+                self.runner.run_frame()
+                await self._wait(scheduler.advance_deadline())
+        finally:
+            if input_fd is not None:
+                loop.remove_reader(input_fd)
+            if watch_resize:
+                loop.remove_signal_handler(signal.SIGWINCH)
+
+    async def _wait(self, timeout):
+        """Waits for the timeout (forever if None) or until pause, resume or quit."""
+        wake = self._wake
+        if timeout is not None and timeout <= 0:
+            await asyncio.sleep(0)  # Late: only let pending callbacks run
+        else:
+            try:
+                await asyncio.wait_for(wake.wait(), timeout)
+            except TimeoutError:
+                pass
+        wake.clear()
+
+    def _read_input(self, fd):
+        try:
+            data = os.read(fd, 64)
+        except BlockingIOError:
+            return
+        if not data:  # End of input: stop listening, keep animating
+            asyncio.get_running_loop().remove_reader(fd)
+            return
+        keys, self._partial_key = split_keys(
+            self._partial_key + data.decode("utf-8", errors="ignore")
+        )
+        for key in keys:
+            self.handle_key(key)
@@ -1,11 +1,26 @@
+import asyncio
+import gc
+import random
 import sys
 
 from animation_core import (  # update_column_states and render_frame_buffer are used by run_animation_loop,; and initialize_animation_parameters, not directly by main
+    AnimationRunner,
+    FrameProducer,
+    frame_period,
     initialize_animation_parameters,
-    run_animation_loop,
+    run_runner_loop,
 )
-from config import AnsiColors, parse_arguments
-from terminal_utils import get_terminal_dimensions
+from config import AnsiColors, parse_address, parse_arguments
+from frame_broadcast import BroadcastServer, run_client
+from frame_encoders import create_frame_encoder
+from frame_pipeline import FramePipeline
+from frame_recorder import FrameRecorder, record_animation
+from frame_scheduler import FrameScheduler
+from glyph_tables import report_glyph_tables
+from interactive_loop import AnimationController
+from perf_stats import FrameStats
+from quality_governor import QualityGovernor
+from terminal_utils import cbreak_mode, get_terminal_dimensions, supports_key_input
 
 # import os # os is not directly used in main.py after refactoring get_terminal_dimensions
 # No need for random, time, wcwidth, argparse if no longer directly used in main.py
@@ -13,16 +28,29 @@ from terminal_utils import get_terminal_dimensions
 
 if __name__ == "__main__":
     args = parse_arguments()
+    if args and args.connect:
+        try:
+            run_client(
+                parse_address(args.connect), sys.stdout.fileno(), AnsiColors.RESET.value
+            )
+        except KeyboardInterrupt:
+            pass
+        except OSError as e:
+            print(f"Error: Could not receive from {args.connect}: {e}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(0)
     if (
         args
     ):  # parse_arguments returns None on validation failure for some existing checks
         width, height = get_terminal_dimensions(args)
+        if args.seed is not None:
+            random.seed(args.seed)  # Initial column state is drawn from `random`
 
         # initialize_animation_parameters now uses DEFAULT_CHAR_SETS from config
         # and AnsiColors for theme definitions.
         # It returns:
         # 1. chars (which will be DEFAULT_CHAR_SETS)
-        # 2. available_char_sets (list of lists of characters, e.g., [['a','b'], ['0','1']])
+        # 2. available_char_sets (list of GlyphTables, one per character set, width-filtered once)
         # 3. final_theme_colors (a dictionary of color strings like {"WHITE": "[97m", ...})
         columns_state, available_char_sets, active_theme_colors = (
             initialize_animation_parameters(
@@ -30,29 +58,144 @@ if __name__ == "__main__":
             )  # Corrected order and return values
         )
 
-        try:
-            # Hide cursor
-            sys.stdout.write("[?25l")
-
-            run_animation_loop(
-                args,
-                width,
-                height,
-                active_theme_colors,  # This maps to 'colors' in run_animation_loop
-                columns_state,  # This maps to 'columns'
-                available_char_sets,  # This maps to 'available_char_sets'
+        report_glyph_tables(available_char_sets, file=sys.stderr)
+        # A broadcast is always diff-encoded; clients are brought in sync with keyframes.
+        encoder = create_frame_encoder("diff" if args.serve else args.render_mode)
+        scheduler = FrameScheduler(frame_period(args))
+        # Timing hooks in the loop are only active when statistics are wanted.
+        stats = FrameStats() if (args.hud or args.stats) else None
+        if args.record:
+            recorder = FrameRecorder(
+                args.record, width, height, frame_period(args), args.record_format
             )
+            try:
+                with recorder:
+                    record_animation(
+                        FrameProducer(
+                            args,
+                            width,
+                            height,
+                            active_theme_colors,
+                            columns_state,
+                            available_char_sets,
+                        ),
+                        encoder,
+                        recorder,
+                        args.frames,
+                    )
+            except KeyboardInterrupt:
+                print("Recording interrupted; the frames so far were saved.")
+            print(recorder.summary())
+            print(encoder.stats.summary())
+            sys.exit(0)
+
+        pipeline = None
+        governor = None
+        server = None
+        runner = None
+        if args.adaptive:
+            governor = QualityGovernor(
+                args.min_density if args.min_density is not None else args.density / 4,
+                args.min_fps if args.min_fps is not None else 0.5 / frame_period(args),
+            )
+
+        # Everything allocated so far lives for the whole run. Frames allocate
+        # little that outlives them, so moving it out of the collector's reach
+        # keeps the occasional full collection from walking all of it.
+        gc.collect()
+        gc.freeze()
+        try:
+            if args.serve:
+                server = BroadcastServer(
+                    FrameProducer(
+                        args,
+                        width,
+                        height,
+                        active_theme_colors,
+                        columns_state,
+                        available_char_sets,
+                    ),
+                    scheduler,
+                    AnsiColors.RESET.value,
+                    encoder,
+                )
+                print(f"Serving a {width}x{height} animation on {args.serve}.")
+                asyncio.run(server.serve(parse_address(args.serve)))
+            else:
+                # Hide cursor
+                sys.stdout.write("[?25l")
+                if args.pipeline:
+                    sys.stdout.flush()  # The writer thread writes to the fd directly
+                    pipeline = FramePipeline(sys.stdout.fileno(), args.pipeline)
+
+                try:
+                    # Built here so the column state can be reported after the loop ends.
+                    runner = AnimationRunner(
+                        args,
+                        width,
+                        height,
+                        active_theme_colors,
+                        columns_state,
+                        available_char_sets,
+                        encoder,  # Kept here so its output statistics can be reported on exit
+                        scheduler,  # Likewise for late and dropped frame counts
+                        stats,
+                        pipeline,
+                        governor,
+                    )
+                    input_fd = sys.stdin.fileno()
+                    if supports_key_input(input_fd):
+                        # Keyboard controls and resize handling run on an asyncio loop;
+                        # 'q' returns from it, Ctrl-C raises KeyboardInterrupt as before.
+                        controller = AnimationController(runner)
+                        with cbreak_mode(input_fd):
+                            # Follow the terminal's size unless it was fixed on the command line
+                            asyncio.run(
+                                controller.run(
+                                    input_fd, watch_resize=args.width is None
+                                )
+                            )
+                    else:
+                        run_runner_loop(runner)
+                finally:
+                    # Finish writing queued frames and stop the render workers before
+                    # the terminal is restored, however the animation ended.
+                    if pipeline is not None:
+                        pipeline.close()
+                    if runner is not None:
+                        close_renderer = getattr(
+                            runner.producer.renderer, "close", None
+                        )
+                        if close_renderer is not None:
+                            close_renderer()
 
         except KeyboardInterrupt:
+            pass  # Ctrl-C stops the animation like 'q'
+        except Exception as e:
+            if not args.serve:
+                # Show cursor and reset color in case of other errors
+                sys.stdout.write(f"[?25h{AnsiColors.RESET.value}")
+            print(f"\nAn unexpected error occurred: {e}", file=sys.stderr)
+            sys.exit(1)  # Exit with error status
+
+        if args.serve:
+            # The animation was only drawn on the clients' terminals.
+            print(server.summary())
+        else:
             # Show cursor and reset color
             # Use AnsiColors.RESET.value directly
             sys.stdout.write(f"[?25h{AnsiColors.RESET.value}")
             print("\nAnimation stopped.")
-        except Exception as e:
-            # Show cursor and reset color in case of other errors
-            sys.stdout.write(f"[?25h{AnsiColors.RESET.value}")
-            print(f"\nAn unexpected error occurred: {e}", file=sys.stderr)
-            sys.exit(1)  # Exit with error status
+            print(encoder.stats.summary())
+            print(scheduler.summary())
+            if pipeline is not None:
+                print(pipeline.summary())
+            if governor is not None:
+                print(governor.summary())
+            if runner is not None:
+                print(runner.producer.engine.memory_report())
+        if args.stats:
+            stats.dump(args.stats, scheduler)
     else:
         # args is None, meaning parse_arguments detected an issue and printed a message.
         # sys.exit(1) might have already been called in parse_arguments for some error types.
@@ -0,0 +1,250 @@
+"""Optional NumPy simulation engine that advances every column in one vectorized step."""
+
+import itertools
+
+from glyph_tables import allows_wide_glyphs, narrow_table_count
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; it is only needed for --engine numpy
+    np = None
+
+
+class NumpyColumnEngine:
+    """Struct-of-arrays version of update_column_states.
+
+    Head positions and character set indices live in NumPy arrays instead of one
+    ColumnState object per column, and the spawn decisions for all idle columns are
+    drawn in a single batch. The rules are the same as update_column_states: an
+    idle column (head_y == 0) starts a drop with probability `density`, an active
+    drop moves down one row, and a drop resets once its trail has left the screen.
+
+    With drops_per_column above 1, a column whose newest drop is more than
+    `spawn_cooldown` rows down starts another one with the same probability. The
+    earlier drops move into flat arrays of (column, head, set index) that are
+    advanced and culled as a whole, so the cost follows the number of drops.
+    Only the newest drop of each column is mirrored into ColumnState objects.
+
+    As in update_column_states, only columns that allow_wide_glyphs() draw from
+    the double-width sets at the end of char_sets; the bound of every column's
+    draw is kept in one array.
+    """
+
+    def __init__(
+        self,
+        head_y,
+        char_set_index,
+        char_sets,
+        columns=None,
+        seed=None,
+        drops_per_column=1,
+        spawn_cooldown=None,
+    ):
+        if np is None:
+            raise RuntimeError("NumpyColumnEngine requires the numpy package.")
+        self.head_y = np.asarray(head_y, dtype=np.int64)
+        self.char_set_index = np.asarray(char_set_index, dtype=np.int64)
+        # Shared table the char_set_index values point into; new drops pick any of them.
+        self.char_sets = char_sets
+        self._char_set_limit = np.empty(0, dtype=np.int64)
+        self._resize_char_set_limits(self.head_y.shape[0])
+        # ColumnState objects mirrored from the arrays for renderers that need them.
+        self.columns = columns
+        self._rng = np.random.default_rng(seed)
+        self.drops_per_column = drops_per_column
+        self.spawn_cooldown = spawn_cooldown
+        self.older_x = np.empty(0, dtype=np.int64)
+        self.older_head_y = np.empty(0, dtype=np.int64)
+        self.older_char_set_index = np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def from_columns(
+        cls,
+        columns,
+        available_char_sets,
+        mirror_columns=True,
+        seed=None,
+        drops_per_column=1,
+    ):
+        """Builds an engine from existing ColumnState objects, keeping their state.
+
+        With mirror_columns, every update is copied back into those objects.
+        """
+        older = [
+            (x, head_y, char_set_index)
+            for x, col in enumerate(columns)
+            for head_y, char_set_index in col.older_drops or ()
+        ]
+        engine = cls(
+            [col.head_y for col in columns],
+            [col.char_set_index for col in columns],
+            list(available_char_sets) or [[" "]],
+            columns if mirror_columns else None,
+            seed,
+            drops_per_column,
+        )
+        if older:
+            engine.older_x, engine.older_head_y, engine.older_char_set_index = (
+                np.array(values, dtype=np.int64) for values in zip(*older)
+            )
+        return engine
+
+    def update(self, height, density, trail_length):
+        """Advances all columns by one frame."""
+        head_y = self.head_y
+        previous_head_y = head_y.copy() if self.columns is not None else None
+
+        if self.older_x.size:
+            self.older_head_y += 1
+            falling = self.older_head_y - trail_length <= height
+            if not falling.all():
+                self.older_x = self.older_x[falling]
+                self.older_head_y = self.older_head_y[falling]
+                self.older_char_set_index = self.older_char_set_index[falling]
+
+        idle = head_y == 0
+        np.add(head_y, 1, out=head_y, where=~idle)
+        head_y[head_y - trail_length > height] = 0  # Trail has left the screen
+
+        chance = self._rng.random(head_y.shape[0]) < density
+        spawn = idle & chance & (self._char_set_limit > 0)
+        if spawn.any():
+            head_y[spawn] = 1
+            self.char_set_index[spawn] = self._rng.integers(
+                0, self._char_set_limit[spawn]
+            )
+        if self.drops_per_column > 1:
+            self._spawn_above(chance, trail_length)
+
+        if self.columns is not None:
+            self._sync_columns(np.flatnonzero(head_y | previous_head_y))
+        return head_y
+
+    def _spawn_above(self, chance, trail_length):
+        """Starts a drop above the newest one in columns that passed the spawn draw.
+
+        Reuses the spawn draws of update(): idle columns cannot be eligible here,
+        so no column is decided by the same draw twice.
+        """
+        head_y = self.head_y
+        cooldown = trail_length if self.spawn_cooldown is None else self.spawn_cooldown
+        older_counts = np.bincount(self.older_x, minlength=head_y.shape[0])
+        stack = chance & (head_y > cooldown) & (older_counts + 1 < self.drops_per_column)
+        columns = np.flatnonzero(stack)
+        if not columns.size:
+            return
+        self.older_x = np.concatenate((self.older_x, columns))
+        self.older_head_y = np.concatenate((self.older_head_y, head_y[columns]))
+        self.older_char_set_index = np.concatenate(
+            (self.older_char_set_index, self.char_set_index[columns])
+        )
+        head_y[columns] = 1
+        self.char_set_index[columns] = self._rng.integers(
+            0, self._char_set_limit[columns]
+        )
+
+    def resize(self, width):
+        """Changes the number of columns, keeping the drops of the columns that remain.
+
+        A smaller width keeps views of the leading columns, and a larger one
+        appends idle columns. When ColumnState objects are mirrored, the caller
+        resizes that list first (see resize_columns) and the added columns take
+        their state from it. Drops below a smaller screen height are culled by
+        the next update().
+        """
+        old_width = self.head_y.shape[0]
+        if width < old_width:
+            self.head_y = self.head_y[:width]
+            self.char_set_index = self.char_set_index[:width]
+            if self.older_x.size:
+                kept = self.older_x < width
+                self.older_x = self.older_x[kept]
+                self.older_head_y = self.older_head_y[kept]
+                self.older_char_set_index = self.older_char_set_index[kept]
+        elif width > old_width:
+            added = width - old_width
+            if self.columns is not None:
+                new_columns = self.columns[old_width:width]
+                added_head_y = [col.head_y for col in new_columns]
+                added_index = [col.char_set_index for col in new_columns]
+            else:
+                added_head_y = np.zeros(added, dtype=np.int64)
+                added_index = np.zeros(added, dtype=np.int64)  # Drawn on spawn
+            self.head_y = np.concatenate((self.head_y, added_head_y)).astype(np.int64)
+            self.char_set_index = np.concatenate(
+                (self.char_set_index, added_index)
+            ).astype(np.int64)
+        self._resize_char_set_limits(width)
+
+    def _resize_char_set_limits(self, width):
+        """Resizes the per-column bound of the char_sets a new drop may pick from.
+
+        Only the added columns and the last remaining one, which may have
+        gained or lost room for wide glyphs, are computed; the others keep
+        their entries.
+        """
+        limits = self._char_set_limit
+        kept = min(limits.shape[0], width)
+        if width > kept:
+            limits = np.concatenate((limits, np.empty(width - kept, dtype=np.int64)))
+        else:
+            limits = limits[:width]
+        start = max(kept - 1, 0)
+        total = len(self.char_sets)
+        narrow = narrow_table_count(self.char_sets)
+        limits[start:] = [
+            total if allows_wide_glyphs(x, width) else narrow for x in range(start, width)
+        ]
+        self._char_set_limit = limits
+
+    def active_drop_count(self):
+        """Returns the number of active drops in all columns."""
+        return int(np.count_nonzero(self.head_y)) + int(self.older_x.size)
+
+    def memory_report(self):
+        """Returns a one-line report of the memory held by the column arrays."""
+        arrays = (
+            self.head_y,
+            self.char_set_index,
+            self._char_set_limit,
+            self.older_x,
+            self.older_head_y,
+            self.older_char_set_index,
+        )
+        total = sum(array.nbytes for array in arrays)
+        width = self.head_y.shape[0]
+        per_column = total / width if width else 0
+        return (
+            f"Columns: {width} columns in NumPy arrays using {total} bytes "
+            f"({per_column:.0f} bytes per column)."
+        )
+
+    def active_drops(self):
+        """Returns the (x, head_y, char_set) of every active drop."""
+        active = np.flatnonzero(self.head_y)
+        char_sets = self.char_sets
+        drops = zip(
+            active.tolist(),
+            self.head_y[active].tolist(),
+            [char_sets[index] for index in self.char_set_index[active].tolist()],
+        )
+        if not self.older_x.size:
+            return drops
+        older = zip(
+            self.older_x.tolist(),
+            self.older_head_y.tolist(),
+            [char_sets[index] for index in self.older_char_set_index.tolist()],
+        )
+        return itertools.chain(drops, older)
+
+    def _sync_columns(self, changed):
+        """Copies the state of the changed columns back into their ColumnState objects."""
+        columns = self.columns
+        for x, head, index in zip(
+            changed.tolist(),
+            self.head_y[changed].tolist(),
+            self.char_set_index[changed].tolist(),
+        ):
+            col = columns[x]
+            col.head_y = head
+            col.char_set_index = index
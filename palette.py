@@ -0,0 +1,221 @@
+"""Themes compiled into immutable escape-sequence lookup tables."""
+
+import os
+from dataclasses import dataclass
+
+from config import AnsiColors
+
+COLOR_DEPTHS = ("16", "256", "truecolor", "auto")
+# The xterm RGB values of the 16-color codes, which gradients interpolate between.
+ANSI_RGB = {
+    "WHITE": (255, 255, 255),
+    "BRIGHT_GREEN": (0, 255, 0),
+    "GREEN": (0, 205, 0),
+    "BLUE": (0, 0, 238),
+    "BRIGHT_BLUE": (92, 92, 255),
+    "CYAN": (0, 205, 205),
+    "BRIGHT_CYAN": (0, 255, 255),
+    "MAGENTA": (205, 0, 205),
+    "BRIGHT_MAGENTA": (255, 0, 255),
+    "YELLOW": (205, 205, 0),
+    "BRIGHT_YELLOW": (255, 255, 0),
+}
+# Brightness of the last trail position relative to the dim color it fades from.
+GRADIENT_TAIL_LEVEL = 0.25
+# Channel values of the 6x6x6 color cube of 256-color terminals.
+CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+# Largest channel spread of a color that may be matched to the gray ramp; a
+# more saturated color always comes from the cube, however dark it is.
+GRAY_MAX_SPREAD = 16
+
+
+def resolve_color_depth(color_depth, environ=os.environ):
+    """Returns the color depth to render with, detecting it from the environment for "auto".
+
+    COLORTERM=truecolor (or 24bit) means truecolor, a TERM naming 256 colors
+    means 256, and anything else keeps the 16 basic colors.
+    """
+    if color_depth != "auto":
+        return color_depth
+    if environ.get("COLORTERM", "").lower() in ("truecolor", "24bit"):
+        return "truecolor"
+    if "256color" in environ.get("TERM", ""):
+        return "256"
+    return "16"
+
+
+def nearest_256_color(rgb):
+    """Returns the 256-color index closest to rgb, from the color cube or the gray ramp.
+
+    The gray ramp is only considered for nearly neutral colors, so a dark
+    green stays green rather than turning into a slightly closer gray.
+    """
+    cube = [min(range(6), key=lambda i: abs(CUBE_LEVELS[i] - value)) for value in rgb]
+    cube_index = 16 + 36 * cube[0] + 6 * cube[1] + cube[2]
+    if max(rgb) - min(rgb) > GRAY_MAX_SPREAD:
+        return cube_index
+    cube_rgb = [CUBE_LEVELS[i] for i in cube]
+    gray = min(23, max(0, round((sum(rgb) / 3 - 8) / 10)))
+    gray_value = 8 + 10 * gray
+
+    def distance(other):
+        return sum((a - b) ** 2 for a, b in zip(rgb, other))
+
+    if distance((gray_value,) * 3) < distance(cube_rgb):
+        return 232 + gray
+    return cube_index
+
+
+def rgb_escape(rgb, color_depth):
+    """Returns the foreground escape for rgb at a color depth of "256" or "truecolor"."""
+    if color_depth == "256":
+        return f"\033[38;5;{nearest_256_color(rgb)}m"
+    return "\033[38;2;{};{};{}m".format(*rgb)
+
+
+def escape_rgb(escape):
+    """Returns the RGB value of one of the AnsiColors escapes, or None for other escapes."""
+    for color in AnsiColors:
+        if color.value == escape:
+            return ANSI_RGB.get(color.name)
+    return None
+
+
+def palette_base_color_names(active_colors):
+    """Returns the base color names of a theme that trails can be drawn in."""
+    # Filter for base colors (not BRIGHT, not WHITE, not RESET)
+    # that are actually defined in AnsiColors enum and present in active_colors.
+    # An empty result (e.g. user specified only WHITE) means callers fall back to GREEN.
+    return [
+        name
+        for name in active_colors
+        if "BRIGHT_" not in name
+        and name not in ["WHITE", "RESET"]
+        and name in AnsiColors.__members__  # Ensure it's a valid AnsiColor name
+    ]
+
+
+def trail_segment_colors(base_color_name, active_colors, color_intensity):
+    """Returns the (head, bright segment, dim segment) colors for a base color."""
+    # Fetch colors from active_colors, with fallbacks to direct AnsiColor enum values
+    # This ensures that even if a color is missing from active_colors (e.g. due to user filtering),
+    # we try to get a sensible default.
+    actual_base_color = active_colors.get(base_color_name, AnsiColors.GREEN.value)
+    actual_bright_color = active_colors.get(
+        f"BRIGHT_{base_color_name}", actual_base_color
+    )
+    color_white = active_colors.get("WHITE", AnsiColors.WHITE.value)
+
+    if color_intensity == "dim":
+        return actual_bright_color, actual_base_color, actual_base_color
+    if color_intensity == "bright":
+        return color_white, color_white, actual_bright_color
+    # normal (default)
+    return color_white, actual_bright_color, actual_base_color
+
+
+def gradient_colors(head, bright, dim, trail_length, bright_length):
+    """Returns one RGB color per trail position, fading smoothly along the whole trail.
+
+    The head keeps its color, the trail fades from the bright color right below
+    it to the dim color at the end of the bright segment, and from there down
+    to GRADIENT_TAIL_LEVEL of the dim color at the last position.
+    """
+    tail = tuple(round(channel * GRADIENT_TAIL_LEVEL) for channel in dim)
+    # (position, color) stops the colors are interpolated between.
+    stops = [(1, bright), (bright_length + 1, dim), (trail_length - 1, tail)]
+    colors = [head]
+    for distance in range(1, trail_length):
+        start, end = next(
+            (stops[i], stops[i + 1])
+            for i in range(len(stops) - 1)
+            if distance <= stops[i + 1][0]
+        )
+        span = end[0] - start[0]
+        t = (distance - start[0]) / span if span > 0 else 1.0
+        colors.append(
+            tuple(round(a + (b - a) * t) for a, b in zip(start[1], end[1]))
+        )
+    return colors
+
+
+@dataclass(frozen=True)
+class Palette:
+    """A theme resolved into the escape sequence for every trail position.
+
+    `trail_prefixes[base_index][distance_from_head]` is the escape that precedes a
+    glyph drawn `distance_from_head` rows above the head of a drop whose trail uses
+    base color `base_color_names[base_index]`. The render loop only indexes into
+    these tuples; all theme, intensity and color depth decisions are made when
+    compiling, so a 256-color or truecolor gradient costs the same per cell as
+    the 16-color steps.
+    """
+
+    base_color_names: tuple[str, ...]
+    trail_prefixes: tuple[tuple[str, ...], ...]
+    reset: str
+
+    @property
+    def trail_length(self):
+        return len(self.trail_prefixes[0])
+
+    def simplified(self):
+        """Returns a cheaper palette: the first base color only, with the head kept
+        and every other trail position in the trail's last (dim) color.
+
+        Long runs of one color let the encoders drop most escape sequences.
+        """
+        prefixes = self.trail_prefixes[0]
+        return Palette(
+            base_color_names=self.base_color_names[:1],
+            trail_prefixes=((prefixes[0],) + (prefixes[-1],) * (len(prefixes) - 1),),
+            reset=self.reset,
+        )
+
+
+def compile_palette(
+    active_colors,
+    theme,
+    color_intensity,
+    trail_length,
+    bright_length,
+    color_depth="16",
+):
+    """Compiles a theme's color dictionary into a Palette for one run.
+
+    With the 16-color depth a trail has three steps (head, bright segment, dim
+    rest); with "256" or "truecolor" every trail position gets its own step of
+    a gradient_colors() fade, quantized to the 256-color palette for "256".
+    """
+    base_color_names = ["GREEN"]  # Default for classic theme or fallback
+    if theme == "colorful":
+        base_color_names = palette_base_color_names(active_colors) or ["GREEN"]
+    color_depth = resolve_color_depth(color_depth)
+
+    trail_prefixes = []
+    for name in base_color_names:
+        c_head, c_seg1, c_seg2 = trail_segment_colors(
+            name, active_colors, color_intensity
+        )
+        segment_rgb = [escape_rgb(color) for color in (c_head, c_seg1, c_seg2)]
+        if color_depth in ("256", "truecolor") and None not in segment_rgb:
+            gradient = gradient_colors(*segment_rgb, trail_length, bright_length)
+            trail_prefixes.append(tuple(rgb_escape(rgb, color_depth) for rgb in gradient))
+            continue
+        # Head of the trail, then the bright segment, then the dim rest of the trail.
+        trail_prefixes.append(
+            tuple(
+                c_head
+                if distance == 0
+                else c_seg1
+                if distance <= bright_length
+                else c_seg2
+                for distance in range(trail_length)
+            )
+        )
+
+    return Palette(
+        base_color_names=tuple(base_color_names),
+        trail_prefixes=tuple(trail_prefixes),
+        reset=active_colors.get("RESET", AnsiColors.RESET.value),
+    )
@@ -0,0 +1,352 @@
+"""Parallel rendering of row bands in a process pool, for very large virtual canvases."""
+
+import multiprocessing
+import pickle
+import re
+import signal
+import weakref
+from array import array
+from itertools import chain
+from multiprocessing import shared_memory, util
+
+from frame_encoders import append_cursor_down, append_row_range
+
+# Each span is stored as (x, top, bottom, head_y); head_y is CONTINUATION for
+# the "" cells to the right of a double-width trail.
+SPAN_FIELDS = 4
+CONTINUATION = -1
+# Typecodes of the shared arrays: glyph code points, base color indices, spans
+# and the column from which each screen row is blank.
+GLYPH_TYPECODE = "I"
+COLOR_TYPECODE = "H"
+SPAN_TYPECODE = "i"
+EXTENT_TYPECODE = "i"
+# The pickled trail prefixes are published as raw bytes.
+PREFIXES_TYPECODE = "B"
+# A color escape (SGR), as opposed to the cursor movement a band may contain.
+SGR_PATTERN = re.compile("\033\\[[0-9;]*m")
+
+
+class SharedArray:
+    """A typed array in a shared memory block, addressed by name from other processes."""
+
+    def __init__(self, typecode, length):
+        itemsize = array(typecode).itemsize
+        self.block = shared_memory.SharedMemory(create=True, size=max(length, 1) * itemsize)
+        self.name = self.block.name
+        self.length = length
+        self.view = self.block.buf.cast(typecode)
+
+    def release(self):
+        """Closes and removes the block; the view must not be used afterwards."""
+        self.view.release()
+        self.block.close()
+        self.block.unlink()
+
+
+def band_bounds(height, bands):
+    """Returns (top, bottom) row ranges splitting `height` rows into at most `bands` bands."""
+    bands = max(1, min(bands, height))
+    edges = [height * i // bands for i in range(bands + 1)]
+    return [(edges[i], edges[i + 1]) for i in range(bands) if edges[i] < edges[i + 1]]
+
+
+class BandFrame:
+    """A frame published to shared memory, encoded band by band when it is written.
+
+    FullFrameEncoder calls append_rows(), which renders and coalesces the
+    bands in the worker processes and appends them to the output in order,
+    updating the encoder's row extents.
+    """
+
+    __slots__ = ("renderer", "shape", "span_count", "trail_prefixes")
+
+    def __init__(self, renderer, trail_prefixes, span_count):
+        self.renderer = renderer
+        self.shape = (renderer.height, renderer.width)
+        self.trail_prefixes = trail_prefixes
+        self.span_count = span_count
+
+    def append_rows(self, output, extents):
+        """Appends the rows as append_row_range() does; returns the escape characters saved."""
+        return self.renderer.append_bands(
+            output, extents, self.trail_prefixes, self.span_count
+        )
+
+
+class ParallelBandRenderer:
+    """Wraps a SpanRenderer and builds the frame's rows in a pool of worker processes.
+
+    The random draws stay in this process, so updating the grids is serial:
+    the SpanRenderer updates its glyph and base color grids exactly as for a
+    serial render, and this process copies the cells it wrote into shared
+    memory, along with the list of visible spans and the encoder's row
+    extents. Only building the cell text runs in parallel. The pool starts
+    once; the palette's trail prefixes are pickled into a shared block of
+    their own, republished only when their value changes (e.g. a quality
+    governor step), and each worker unpickles them once per block, so nothing
+    but a few names and numbers is pickled per frame. Each worker turns
+    one row band into cell text and coalesces its color escapes; the bands are
+    joined in order, moving the cursor down to each band's first written row
+    and dropping its first escape when the previous band already left that
+    color in effect, so the output is byte for byte what FullFrameEncoder
+    produces from the serial renderer with the same seed.
+    """
+
+    def __init__(self, renderer, workers, bands=None):
+        self.renderer = renderer
+        self.workers = workers
+        self.bands = bands if bands is not None else workers
+        self.width = renderer.width
+        self.height = renderer.height
+        self._pool = None
+        self._prefixes = None
+        self._published_prefixes = None
+        self._glyphs = None
+        self._colors = None
+        self._extents = None
+        self._spans = SharedArray(SPAN_TYPECODE, 0)
+        # Owned resources, released by close() or when the renderer is collected.
+        self._resources = {"pool": None, "arrays": [self._spans]}
+        self._finalizer = weakref.finalize(self, _release, self._resources)
+        self._allocate_grids()
+
+    def _allocate_grids(self):
+        """Creates the shared grids for the current size and copies the renderer's grids in."""
+        arrays = self._resources["arrays"]
+        for shared in (self._glyphs, self._colors, self._extents):
+            if shared is not None:
+                arrays.remove(shared)
+                shared.release()
+        cells = self.width * self.height
+        self._glyphs = SharedArray(GLYPH_TYPECODE, cells)
+        self._colors = SharedArray(COLOR_TYPECODE, cells)
+        self._extents = SharedArray(EXTENT_TYPECODE, self.height)
+        arrays += (self._glyphs, self._colors, self._extents)
+        if cells:
+            glyph_grid = self.renderer.glyph_grid
+            self._glyphs.view[:] = array(
+                GLYPH_TYPECODE, map(ord, chain.from_iterable(glyph_grid))
+            )
+            self._colors.view[:] = array(
+                COLOR_TYPECODE, chain.from_iterable(self.renderer.base_color_grid)
+            )
+
+    def resize(self, width, height):
+        """Resizes the wrapped renderer and recreates the shared grids (a full copy)."""
+        self.renderer.resize(width, height)
+        self.width = width
+        self.height = height
+        self._allocate_grids()
+
+    def render(self, drops, palette, glitch_rate, steps=1):
+        """Updates the grids as SpanRenderer.render() would and returns a BandFrame."""
+        renderer = self.renderer
+        lit, covered, written = renderer.update_grids(drops, palette, glitch_rate, steps)
+        glyph_grid = renderer.glyph_grid
+        base_color_grid = renderer.base_color_grid
+        glyphs = self._glyphs.view
+        colors = self._colors.view
+        width = self.width
+        for x, top, bottom in written:
+            for row_index in range(top, bottom):
+                glyphs[row_index * width + x] = ord(glyph_grid[row_index][x])
+                colors[row_index * width + x] = base_color_grid[row_index][x]
+
+        span_count = len(lit) + len(covered)
+        if span_count * SPAN_FIELDS > self._spans.length:
+            arrays = self._resources["arrays"]
+            arrays.remove(self._spans)
+            self._spans.release()
+            self._spans = SharedArray(SPAN_TYPECODE, 2 * span_count * SPAN_FIELDS)
+            arrays.append(self._spans)
+        spans = self._spans.view
+        i = 0
+        for x, top, bottom, head_y, _ in lit:
+            spans[i : i + SPAN_FIELDS] = array(SPAN_TYPECODE, (x, top, bottom, head_y))
+            i += SPAN_FIELDS
+        # Continuations come last, so they win over any trail in the same cell.
+        for x, top, bottom in covered:
+            spans[i : i + SPAN_FIELDS] = array(
+                SPAN_TYPECODE, (x, top, bottom, CONTINUATION)
+            )
+            i += SPAN_FIELDS
+        return BandFrame(self, palette.trail_prefixes, span_count)
+
+    def append_bands(self, output, extents, trail_prefixes, span_count):
+        """Renders the bands in the pool and appends them in order to output."""
+        if self._pool is None:
+            self._start_pool()
+        if trail_prefixes != self._published_prefixes:
+            self._publish_prefixes(trail_prefixes)
+        if self.height:
+            self._extents.view[:] = array(EXTENT_TYPECODE, extents)
+        names = (
+            self._glyphs.name,
+            self._colors.name,
+            self._spans.name,
+            self._extents.name,
+            self._prefixes.name,
+        )
+        tasks = [
+            (names, self.width, top, bottom, span_count)
+            for top, bottom in band_bounds(self.height, self.bands)
+        ]
+        color = None
+        saved = 0
+        cursor_row = 0
+        results = self._pool.map(render_band, tasks, chunksize=1)
+        extents[:] = self._extents.view.tolist()  # The workers updated their bands
+        for first_row, last_row, head, first_color, rest, last_color, band_saved in results:
+            if first_row is None:
+                continue  # Nothing to write in this band
+            if first_row != cursor_row:
+                append_cursor_down(output, cursor_row, first_row)
+            cursor_row = last_row
+            output.append(head)
+            if first_color is not None:
+                if first_color == color:
+                    saved += len(first_color)  # Already in effect from the band above
+                else:
+                    output.append(first_color)
+                color = last_color
+            output.append(rest)
+            output.flush()
+            saved += band_saved
+        return saved
+
+    def _start_pool(self):
+        """Starts the worker processes."""
+        # Spawned rather than forked: the parent may be running a writer thread.
+        self._pool = multiprocessing.get_context("spawn").Pool(
+            self.workers, initializer=_init_worker
+        )
+        self._resources["pool"] = self._pool
+
+    def _publish_prefixes(self, trail_prefixes):
+        """Pickles the trail prefixes into a new shared block, replacing the previous one."""
+        data = pickle.dumps(trail_prefixes)
+        arrays = self._resources["arrays"]
+        if self._prefixes is not None:
+            arrays.remove(self._prefixes)
+            self._prefixes.release()
+        self._prefixes = SharedArray(PREFIXES_TYPECODE, len(data))
+        self._prefixes.view[:] = data
+        arrays.append(self._prefixes)
+        self._published_prefixes = trail_prefixes
+
+    def close(self):
+        """Stops the worker processes and frees the shared memory."""
+        self._finalizer()
+
+
+def _release(resources):
+    pool = resources["pool"]
+    if pool is not None:
+        pool.terminate()
+        pool.join()
+    for shared in resources["arrays"]:
+        shared.release()
+    resources["arrays"].clear()
+
+
+# Worker side: shared blocks attached by this process, by name, and the
+# trail prefixes unpickled from the block named _trail_prefixes_name.
+_attached = {}
+_trail_prefixes = None
+_trail_prefixes_name = None
+
+
+def _init_worker():
+    """Leaves Ctrl-C to the parent, which stops the pool, and detaches the blocks at exit."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    util.Finalize(None, _detach_except, args=((),), exitpriority=0)
+
+
+def _load_trail_prefixes(name):
+    """Returns the trail prefixes published in the block `name`, unpickling them once."""
+    global _trail_prefixes, _trail_prefixes_name
+    if name != _trail_prefixes_name:
+        _trail_prefixes = pickle.loads(_attach(name, PREFIXES_TYPECODE))
+        _trail_prefixes_name = name
+    return _trail_prefixes
+
+
+def _attach(name, typecode):
+    """Returns a typed view of the shared block `name`, attaching to it once."""
+    entry = _attached.get(name)
+    if entry is None:
+        try:
+            # Only the creating process may unlink the block.
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:  # Python before 3.13
+            block = shared_memory.SharedMemory(name=name)
+        entry = _attached[name] = (block, block.buf.cast(typecode))
+    return entry[1]
+
+
+def _detach_except(names):
+    """Closes the blocks replaced since the last task (e.g. after a resize)."""
+    for name in [name for name in _attached if name not in names]:
+        block, view = _attached.pop(name)
+        view.release()
+        block.close()
+
+
+def render_band(task):
+    """Renders and coalesces rows [top, bottom) of the published frame.
+
+    Updates the band's row extents in shared memory and returns (first_row,
+    last_row, head, first_color, rest, last_color, saved): the first and last
+    rows written (None when the band has no output), the text before the
+    band's first color escape, that escape, the text after it, the color in
+    effect at the end of the band, and the escape characters saved. The text
+    starts at first_row, where the caller moves the cursor. The band is
+    coalesced as if no color were in effect at its start; the caller drops
+    first_color when the band above ends in it.
+    """
+    names, width, top, bottom, span_count = task
+    _detach_except(names)
+    glyphs = _attach(names[0], GLYPH_TYPECODE)
+    colors = _attach(names[1], COLOR_TYPECODE)
+    spans = _attach(names[2], SPAN_TYPECODE)
+    shared_extents = _attach(names[3], EXTENT_TYPECODE)
+    trail_prefixes = _load_trail_prefixes(names[4])
+
+    rows = [[" "] * width for _ in range(bottom - top)]
+    colorful = len(trail_prefixes) > 1
+    prefixes = trail_prefixes[0]
+    for i in range(0, span_count * SPAN_FIELDS, SPAN_FIELDS):
+        x, span_top, span_bottom, head_y = spans[i : i + SPAN_FIELDS]
+        first = max(span_top, top)
+        last = min(span_bottom, bottom)
+        if first >= last:
+            continue
+        if head_y == CONTINUATION:
+            for row_index in range(first, last):
+                rows[row_index - top][x] = ""
+            continue
+        head_row = head_y - 1
+        for row_index in range(first, last):
+            cell = row_index * width + x
+            if colorful:
+                prefixes = trail_prefixes[colors[cell]]
+            rows[row_index - top][x] = prefixes[head_row - row_index] + chr(glyphs[cell])
+
+    parts = []
+    extents = shared_extents[top:bottom].tolist()
+    color, saved, first_row, last_row = append_row_range(rows, parts, extents, top)
+    shared_extents[top:bottom] = array(EXTENT_TYPECODE, extents)
+    if first_row is None:
+        last_row = None
+    if color is None:
+        return first_row, last_row, "".join(parts), None, "", None, saved
+    first, match = next(
+        (i, match)
+        for i, match in enumerate(map(SGR_PATTERN.match, parts))
+        if match is not None
+    )
+    escape = match.group()
+    head = "".join(parts[:first])
+    parts[first] = parts[first][len(escape) :]
+    return first_row, last_row, head, escape, "".join(parts[first:]), color, saved
@@ -0,0 +1,149 @@
+"""Per-frame timing statistics for the animation loop, with a one-line HUD."""
+
+import json
+import time
+from collections import deque
+
+PHASES = ("update", "render", "encode", "write")
+
+# Frame times kept for the percentiles; older frames only count toward the totals.
+PERCENTILE_WINDOW = 4096
+HUD_REFRESH_FRAMES = 15
+
+
+def percentile(sorted_values, fraction):
+    """Returns the value at `fraction` (0..1) of already sorted values (nearest rank)."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class FrameStats:
+    """Collects how long each frame spends updating, rendering, encoding and writing.
+
+    The animation loop only calls into this object when statistics were requested
+    (--hud or --stats), so an animation without them pays nothing beyond a None
+    check per frame. Times are in nanoseconds from time.perf_counter_ns.
+    """
+
+    def __init__(self, clock=time.perf_counter_ns):
+        self._clock = clock
+        self.started_ns = clock()
+        self.frames_rendered = 0
+        self.frames_dropped = 0
+        self.phase_totals_ns = dict.fromkeys(PHASES, 0)
+        self.bytes_written = 0
+        self.active_drops = 0
+        self._active_drops_total = 0
+        self._frame_times_ns = deque(maxlen=PERCENTILE_WINDOW)
+        self._hud_text = ""
+        self._hud_window = dict.fromkeys(PHASES, 0)
+        self._hud_window_frames = 0
+        self._hud_window_started_ns = self.started_ns
+
+    def record_frame(
+        self, update_ns, render_ns, encode_ns, write_ns, output_bytes, active_drops
+    ):
+        """Records a rendered frame's phase durations, output size and drop count."""
+        self.frames_rendered += 1
+        totals = self.phase_totals_ns
+        totals["update"] += update_ns
+        totals["render"] += render_ns
+        totals["encode"] += encode_ns
+        totals["write"] += write_ns
+        self._frame_times_ns.append(update_ns + render_ns + encode_ns + write_ns)
+        self.bytes_written += output_bytes
+        self.active_drops = active_drops
+        self._active_drops_total += active_drops
+
+        window = self._hud_window
+        window["update"] += update_ns
+        window["render"] += render_ns
+        window["encode"] += encode_ns
+        window["write"] += write_ns
+        self._hud_window_frames += 1
+
+    def record_dropped_frame(self, update_ns):
+        """Records a frame whose rendering was skipped by the scheduler."""
+        self.frames_dropped += 1
+        self.phase_totals_ns["update"] += update_ns
+
+    def frame_time_percentiles_ms(self):
+        """Returns (p50, p99) of recent frame times in milliseconds."""
+        times = sorted(self._frame_times_ns)
+        return percentile(times, 0.50) / 1e6, percentile(times, 0.99) / 1e6
+
+    def hud_line(self, scheduler=None):
+        """Returns the overlay text, refreshed every HUD_REFRESH_FRAMES rendered frames.
+
+        Phase times and FPS are averaged over the frames since the last refresh.
+        """
+        frames = self._hud_window_frames
+        if frames < HUD_REFRESH_FRAMES and self._hud_text:
+            return self._hud_text
+
+        now = self._clock()
+        elapsed = (now - self._hud_window_started_ns) / 1e9
+        phases = " ".join(
+            f"{phase} {self._hud_window[phase] / max(frames, 1) / 1e6:.2f}"
+            for phase in PHASES
+        )
+        p50, p99 = self.frame_time_percentiles_ms()
+        fps = frames / elapsed if elapsed > 0 else 0.0
+        kb_per_frame = self.bytes_written / max(self.frames_rendered, 1) / 1024
+        text = (
+            f" ms: {phases} | {fps:.1f} fps | p50 {p50:.2f} p99 {p99:.2f} ms"
+            f" | {kb_per_frame:.1f} KB/frame | {self.active_drops} drops"
+        )
+        if scheduler is not None:
+            text += f" | {scheduler.late_frames} late {scheduler.dropped_frames} dropped"
+
+        self._hud_text = text
+        self._hud_window = dict.fromkeys(PHASES, 0)
+        self._hud_window_frames = 0
+        self._hud_window_started_ns = now
+        return text
+
+    def hud_output(self, width, height, scheduler=None):
+        """Returns the escape sequence that draws the HUD on the screen's last row."""
+        # One column short of the full width, so the terminal never wraps or scrolls.
+        text = self.hud_line(scheduler)[: max(width - 1, 0)].ljust(max(width - 1, 0))
+        return f"\033[{height};1H\033[7m{text}\033[0m"
+
+    def to_dict(self, scheduler=None):
+        """Returns the collected statistics as a JSON-serializable dict."""
+        elapsed = (self._clock() - self.started_ns) / 1e9
+        rendered = max(self.frames_rendered, 1)
+        # Dropped frames still run the update, so it is averaged over all frames.
+        frames_per_phase = dict.fromkeys(PHASES, rendered)
+        frames_per_phase["update"] = max(self.frames_rendered + self.frames_dropped, 1)
+        p50, p99 = self.frame_time_percentiles_ms()
+        stats = {
+            "elapsed_s": elapsed,
+            "frames_rendered": self.frames_rendered,
+            "frames_dropped": self.frames_dropped,
+            "effective_fps": self.frames_rendered / elapsed if elapsed > 0 else 0.0,
+            "phase_us_per_frame": {
+                phase: total / frames_per_phase[phase] / 1000
+                for phase, total in self.phase_totals_ns.items()
+            },
+            "frame_ms_p50": p50,
+            "frame_ms_p99": p99,
+            "bytes_written": self.bytes_written,
+            "bytes_per_frame": self.bytes_written / rendered,
+            "active_drops_last": self.active_drops,
+            "active_drops_mean": self._active_drops_total / rendered,
+        }
+        if scheduler is not None:
+            stats["frames_late"] = scheduler.late_frames
+        return stats
+
+    def dump(self, path, scheduler=None):
+        """Writes the statistics as JSON to path, or to stdout when path is '-'."""
+        data = json.dumps(self.to_dict(scheduler), indent=2)
+        if path == "-":
+            print(data)
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(data + "\n")
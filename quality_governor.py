@@ -0,0 +1,178 @@
+"""Adaptive quality governor that sheds rendering load when the terminal falls behind."""
+
+import time
+
+# Frames per measurement window; the governor changes at most one step per window.
+WINDOW_FRAMES = 30
+# Fraction of the frame period spent waiting on output that counts as falling behind,
+# and the fraction below which there is headroom to restore quality.
+DEGRADE_STALL_FRACTION = 0.5
+RESTORE_STALL_FRACTION = 0.15
+# Consecutive windows with headroom needed before one step is restored, so the
+# governor does not oscillate between two levels.
+RESTORE_WINDOWS = 3
+
+
+class QualityGovernor:
+    """Trades visual quality for throughput when output cannot keep up.
+
+    The animation loop reports, for every rendered frame, how long it waited on
+    output (the write itself, or a free pipeline buffer) and how many bytes it
+    produced. Every WINDOW_FRAMES frames the governor compares the waiting time
+    with the frame period, together with the scheduler's late frames and any
+    frames the pipeline discarded. When output is falling behind it moves one
+    step down a ladder of cheaper settings; after RESTORE_WINDOWS calm windows it
+    moves one step back up. The ladder, from the first step to the last:
+
+    - glitch: glitch rendering is switched off
+    - density: the spawn density drops halfway to min_density
+    - colors: the palette is simplified to one color after the head
+    - fps: the frame rate drops halfway to min_fps
+    - min-density: the spawn density drops to min_density
+    - min-fps: the frame rate drops to min_fps
+
+    Steps that would change nothing with the given settings are left out.
+    """
+
+    def __init__(self, min_density, min_fps, clock=time.perf_counter_ns):
+        self.min_density = min_density
+        self.min_fps = min_fps
+        self._clock = clock
+        self.level = 0
+        self.steps = ()
+        self.degrades = 0
+        self.restores = 0
+        self.bytes_per_second = 0.0
+        self._producer = None
+        self._scheduler = None
+
+    def attach(self, producer, scheduler):
+        """Starts governing a FrameProducer and FrameScheduler at full quality."""
+        self._producer = producer
+        self._scheduler = scheduler
+        self._base_density = producer.density
+        self._base_glitch_rate = producer.glitch_rate
+        self._base_palette = producer.palette
+        # Built once: a new palette object makes the renderer rebuild its cell
+        # tables (and restart parallel render workers).
+        self._simplified_palette = producer.palette.simplified()
+        self._base_period = scheduler.frame_period
+        self._build_steps()
+        self.level = 0
+        self._start_window()
+        self._calm_windows = 0
+
+    def set_base(self, density=None, frame_period=None):
+        """Changes the full-quality density or frame period, keeping the current level."""
+        if density is not None:
+            self._base_density = density
+        if frame_period is not None:
+            self._base_period = frame_period
+        self._build_steps()
+        self._apply(min(self.level, len(self.steps)))
+
+    def base_settings(self):
+        """Returns the full-quality (density, frame_period)."""
+        return self._base_density, self._base_period
+
+    def _build_steps(self):
+        base_fps = 1 / self._base_period
+        min_density = min(self.min_density, self._base_density)
+        min_fps = min(self.min_fps, base_fps)
+
+        steps = []
+        if self._base_glitch_rate > 0:
+            steps.append(("glitch", None))
+        if min_density < self._base_density:
+            steps.append(("density", (self._base_density + min_density) / 2))
+        if len(self._base_palette.trail_prefixes) > 1 or (
+            len(set(self._base_palette.trail_prefixes[0][1:])) > 1
+        ):
+            steps.append(("colors", None))
+        if min_fps < base_fps:
+            steps.append(("fps", (base_fps + min_fps) / 2))
+        if min_density < self._base_density:
+            steps.append(("min-density", min_density))
+        if min_fps < base_fps:
+            steps.append(("min-fps", min_fps))
+        self.steps = tuple(steps)
+
+    def record_frame(self, stall_ns, output_bytes, frames_discarded=0):
+        """Records one rendered frame's output wait and size."""
+        self._window_frames += 1
+        self._window_stall_ns += stall_ns
+        self._window_bytes += output_bytes
+        self._window_discarded += frames_discarded
+        if self._window_frames >= WINDOW_FRAMES:
+            self._evaluate()
+
+    def _start_window(self):
+        self._window_frames = 0
+        self._window_stall_ns = 0
+        self._window_bytes = 0
+        self._window_discarded = 0
+        self._window_started_ns = self._clock()
+        self._window_late_frames = self._scheduler.late_frames
+
+    def _evaluate(self):
+        elapsed_ns = self._clock() - self._window_started_ns
+        if elapsed_ns > 0:
+            self.bytes_per_second = self._window_bytes * 1e9 / elapsed_ns
+        budget_ns = self._window_frames * self._scheduler.frame_period * 1e9
+        stall_fraction = self._window_stall_ns / budget_ns
+        late = self._scheduler.late_frames - self._window_late_frames
+
+        if (
+            stall_fraction > DEGRADE_STALL_FRACTION
+            or late > self._window_frames // 4
+            or self._window_discarded
+        ):
+            self._calm_windows = 0
+            if self.level < len(self.steps):
+                self.degrades += 1
+                self._apply(self.level + 1)
+        elif stall_fraction < RESTORE_STALL_FRACTION and not late:
+            self._calm_windows += 1
+            if self._calm_windows >= RESTORE_WINDOWS and self.level > 0:
+                self._calm_windows = 0
+                self.restores += 1
+                self._apply(self.level - 1)
+        else:
+            self._calm_windows = 0
+        self._start_window()
+
+    def _apply(self, level):
+        """Sets the producer and scheduler to the settings of the given ladder level."""
+        self.level = level
+        density = self._base_density
+        glitch_rate = self._base_glitch_rate
+        palette = self._base_palette
+        period = self._base_period
+        for name, value in self.steps[:level]:
+            if name == "glitch":
+                glitch_rate = 0.0
+            elif name in ("density", "min-density"):
+                density = value
+            elif name == "colors":
+                palette = self._simplified_palette
+            else:  # fps, min-fps
+                period = 1 / value
+        producer = self._producer
+        producer.density = density
+        producer.glitch_rate = glitch_rate
+        producer.palette = palette
+        self._scheduler.frame_period = period
+
+    def describe(self):
+        """Returns the active degradation steps, or 'full quality'."""
+        if not self.level:
+            return "full quality"
+        return ", ".join(name for name, _ in self.steps[: self.level]) + " reduced"
+
+    def summary(self):
+        """Returns a one-line report of the governor's state and activity."""
+        return (
+            f"Governor: level {self.level}/{len(self.steps)} ({self.describe()}), "
+            f"{self.degrades} reductions, {self.restores} restores, "
+            f"{self.bytes_per_second / 1024:.1f} KB/s output."
+        )
@@ -0,0 +1,71 @@
+"""Batched, seedable source of random draws for the simulation and renderer."""
+
+import random
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; without it buffers are filled in Python
+    np = None
+
+DEFAULT_BATCH_SIZE = 1 << 16
+
+
+class RandomPool:
+    """Hands out uniform floats in [0, 1) from a large pre-filled buffer.
+
+    Draws are generated a whole batch at a time (by NumPy when it is installed)
+    and consumers either take one value with random() or a slice of many with
+    floats(), which avoids a call into the random module for every cell. The
+    batches are written into the same array of doubles every time, so a refill
+    allocates nothing. With a seed, every draw of a run is reproducible on the
+    same installation. The random() and choice() methods mirror the random
+    module, so the pool can be passed wherever `random` is accepted.
+    """
+
+    def __init__(self, seed=None, batch_size=DEFAULT_BATCH_SIZE):
+        self.seed = seed
+        self.batch_size = batch_size
+        self._buffer = buffer = array("d", bytes(8 * batch_size))
+        if np is not None:
+            generator = np.random.default_rng(seed)
+            out = np.frombuffer(buffer, dtype=np.float64)
+            self._fill = lambda: generator.random(out=out)
+        else:
+            generator = random.Random(seed)
+
+            def fill():
+                for i in range(batch_size):
+                    buffer[i] = generator.random()
+
+            self._fill = fill
+        self._fill()
+        self._index = 0
+
+    def random(self):
+        """Returns the next float in [0, 1)."""
+        index = self._index
+        if index == self.batch_size:
+            self._fill()
+            index = 0
+        self._index = index + 1
+        return self._buffer[index]
+
+    def floats(self, count):
+        """Returns a list of the next `count` floats in [0, 1)."""
+        start = self._index
+        end = start + count
+        if end <= self.batch_size:
+            self._index = end
+            return self._buffer[start:end].tolist()
+        draws = self._buffer[start:].tolist()
+        while len(draws) < count:
+            self._fill()
+            needed = min(count - len(draws), self.batch_size)
+            draws += self._buffer[:needed].tolist()
+            self._index = needed
+        return draws
+
+    def choice(self, seq):
+        """Returns a random element of a non-empty sequence."""
+        return seq[int(self.random() * len(seq))]
@@ -1,5 +1,12 @@
+import contextlib
 import os
 
+try:
+    import termios
+    import tty
+except ImportError:  # Not available on Windows; key controls are disabled there
+    termios = None
+
 
 def get_terminal_dimensions(args):
     """Gets terminal dimensions or returns fallback values."""
@@ -17,3 +24,32 @@ def get_terminal_dimensions(args):
     except OSError:
         print("Warning: Could not detect terminal size. Falling back to default 80x24.")
         return 80, 24
+
+
+def current_terminal_size(fd):
+    """Returns the (width, height) of the terminal on fd, or None if it has none."""
+    try:
+        width, height = os.get_terminal_size(fd)
+    except OSError:
+        return None
+    return width, height
+
+
+def supports_key_input(fd):
+    """Returns True if keys can be read one at a time from fd (a Unix terminal)."""
+    return termios is not None and os.isatty(fd)
+
+
+@contextlib.contextmanager
+def cbreak_mode(fd):
+    """Puts the terminal on fd into cbreak mode for the duration of the block.
+
+    Keys are delivered one at a time without echo, while Ctrl-C still raises
+    KeyboardInterrupt. The previous settings are restored on exit.
+    """
+    saved = termios.tcgetattr(fd)
+    try:
+        tty.setcbreak(fd)
+        yield
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
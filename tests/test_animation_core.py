@@ -1,23 +1,48 @@
 import unittest
-import random # Added for random.choice mocking
-from unittest.mock import MagicMock, patch # Added patch
+from collections import deque
+from unittest.mock import MagicMock, patch  # Added patch
 
 from animation_core import (
     ColumnState,
+    PythonColumnEngine,
+    SpanRenderer,
+    column_memory_report,
+    column_state_bytes,
     initialize_animation_parameters,
-    update_column_states, # Added update_column_states
+    iter_active_drops,
     render_frame_buffer,  # Added render_frame_buffer
+    resize_columns,
+    update_column_states,  # Added update_column_states
 )
-from config import CHARS_LATIN, DEFAULT_CHAR_SETS, AnsiColors # Added AnsiColors
+from config import CHARS_KATAKANA, DEFAULT_CHAR_SETS, AnsiColors  # Added AnsiColors
+from glyph_tables import compile_glyph_table
+from palette import compile_palette
 
 
 class TestAnimationCore(unittest.TestCase):
     def test_column_state_initialization(self):
         """Test that ColumnState dataclass is initialized correctly."""
-        cs = ColumnState(head_y=0, current_char_set=list(CHARS_LATIN), trail=[])
+        cs = ColumnState(head_y=0, char_set_index=2)
         self.assertEqual(cs.head_y, 0)
-        self.assertEqual(cs.current_char_set, list(CHARS_LATIN))
-        self.assertEqual(cs.trail, [])
+        self.assertEqual(cs.char_set_index, 2)
+        self.assertIsNone(cs.older_drops)
+
+    def test_column_state_has_no_instance_dict(self):
+        """Test that ColumnState uses slots instead of a per-instance __dict__."""
+        cs = ColumnState(head_y=0)
+        self.assertFalse(hasattr(cs, "__dict__"))
+        with self.assertRaises(AttributeError):
+            cs.trail = []
+
+    def test_column_memory_report_counts_column_states(self):
+        """Test that the memory report covers every column and its extra drops."""
+        cols = [ColumnState(0, 0) for _ in range(4)]
+        single_drop_bytes = column_state_bytes(cols)
+        self.assertIn(f"4 column states using {single_drop_bytes} bytes", column_memory_report(cols))
+
+        cols[0].head_y = 9
+        cols[0].older_drops = deque([[15, 0]])
+        self.assertGreater(column_state_bytes(cols), single_drop_bytes)
 
     def test_initialize_animation_parameters_creates_column_states(self):
         """Test that initialize_animation_parameters creates ColumnState objects."""
@@ -29,21 +54,22 @@ class TestAnimationCore(unittest.TestCase):
         width = 10
         height = 5
 
-        columns, _, _ = initialize_animation_parameters(args, width, height)
+        columns, available_char_sets, _ = initialize_animation_parameters(args, width, height)
 
         self.assertEqual(len(columns), width)
+        self.assertEqual(len(available_char_sets), len([cs for cs in DEFAULT_CHAR_SETS if cs]))
         for col in columns:
             self.assertIsInstance(col, ColumnState)
             self.assertEqual(col.head_y, 0)
-            self.assertIn(col.current_char_set, [list(cs) for cs in DEFAULT_CHAR_SETS if cs] or [list(CHARS_LATIN)])
-            self.assertEqual(col.trail, [])
+            self.assertIn(col.char_set_index, range(len(available_char_sets)))
+            self.assertIsNone(col.older_drops)
 
     def test_update_column_states_updates_head_y(self):
         """Test that update_column_states correctly updates head_y."""
         cols = [
-            ColumnState(0, ["a"], []),
-            ColumnState(1, ["b"], []),
-            ColumnState(5, ["c"], []),
+            ColumnState(0, 0),
+            ColumnState(1, 1),
+            ColumnState(5, 2),
         ]
         width = len(cols)
         height = 10
@@ -61,7 +87,7 @@ class TestAnimationCore(unittest.TestCase):
 
     def test_update_column_states_resets_head_y_past_height(self):
         """Test that update_column_states resets head_y when trail is past height."""
-        cols = [ColumnState(15, ["a"], [])]  # head_y is far down
+        cols = [ColumnState(15, 0)]  # head_y is far down
         width = len(cols)
         height = 10
         density = 0.0
@@ -75,7 +101,7 @@ class TestAnimationCore(unittest.TestCase):
 
     def test_update_column_states_starts_new_drop(self):
         """Test that update_column_states can start a new drop."""
-        cols = [ColumnState(0, ["a"], [])]
+        cols = [ColumnState(0, 0)]
         width = len(cols)
         height = 10
         density = 1.0  # Always start a new drop
@@ -88,7 +114,32 @@ class TestAnimationCore(unittest.TestCase):
             cols, width, height, density, trail_length, available_char_sets
         )
         self.assertEqual(updated_cols[0].head_y, 1)
-        self.assertEqual(updated_cols[0].current_char_set, ["x"])
+        self.assertEqual(updated_cols[0].char_set_index, 0)
+
+    def test_update_column_states_stacks_drops_after_cooldown(self):
+        """Test that a column starts another drop once its newest trail has entered."""
+        char_sets = [["a"], ["x"]]
+        cols = [ColumnState(3, 0)]
+
+        update_column_states(cols, 1, 20, 1.0, 3, char_sets, drops_per_column=2)
+        self.assertEqual(cols[0].head_y, 1)
+        self.assertEqual(list(cols[0].older_drops), [[4, 0]])
+
+        # The column is full, so the next frames only move both drops down.
+        update_column_states(cols, 1, 20, 1.0, 3, char_sets, drops_per_column=2)
+        update_column_states(cols, 1, 20, 1.0, 3, char_sets, drops_per_column=2)
+        drops = list(iter_active_drops(cols, char_sets))
+        self.assertEqual([(x, head_y) for x, head_y, _ in drops], [(0, 3), (0, 6)])
+        self.assertEqual(drops[1][2], ["a"])
+
+    def test_update_column_states_retires_older_drops(self):
+        """Test that older drops are removed once their trail leaves the screen."""
+        col = ColumnState(5, 0, deque([[13, 0]]))
+
+        update_column_states([col], 1, 10, 0.0, 3, [["x"]], drops_per_column=2)
+
+        self.assertEqual(col.head_y, 6)
+        self.assertEqual(len(col.older_drops), 0)
 
     def test_render_frame_buffer_accesses_column_state_attributes(self):
         """Test that render_frame_buffer correctly accesses ColumnState attributes."""
@@ -111,7 +162,7 @@ class TestAnimationCore(unittest.TestCase):
         # Setup a single column with a known state
         char_set = ["T"]
         # Column where the head is at y=1, so 'T' should be rendered.
-        cols = [ColumnState(head_y=1, current_char_set=char_set, trail=[])]
+        cols = [ColumnState(head_y=1, char_set_index=0)]
         width = 1
         height = 1
         available_char_sets = [char_set]
@@ -125,12 +176,12 @@ class TestAnimationCore(unittest.TestCase):
             # and color_intensity 'normal' uses WHITE for the head.
             expected_char_output = f"{AnsiColors.WHITE.value}T"
             self.assertEqual(frame_buffer[0], expected_char_output)
-            # Verify random.choice was called (it's used to pick a char from current_char_set)
+            # Verify random.choice was called (it's used to pick a char from the column's char set)
             mock_random_choice.assert_called_with(char_set)
 
         # Test a column where the trail should be rendered
         # Head at y=2, trail_length=3. Character at y=1 is part of bright segment.
-        cols_trail = [ColumnState(head_y=2, current_char_set=char_set, trail=[])]
+        cols_trail = [ColumnState(head_y=2, char_set_index=0)]
         with patch("random.choice", return_value="T") as mock_random_choice:
             frame_buffer_trail = render_frame_buffer(
                 cols_trail, width, height, active_colors, args, available_char_sets, args.glitch_rate
@@ -139,6 +190,165 @@ class TestAnimationCore(unittest.TestCase):
             expected_char_output_trail = f"{AnsiColors.BRIGHT_GREEN.value}T"
             self.assertEqual(frame_buffer_trail[0], expected_char_output_trail)
 
+    def _span_test_args(self):
+        args = MagicMock()
+        args.trail_length = 4
+        args.bright_length = 1
+        args.theme = "classic"
+        args.color_intensity = "normal"
+        return args
+
+    def test_span_renderer_matches_full_scan_renderer(self):
+        """Test that SpanRenderer produces the same rows as render_frame_buffer."""
+        args = self._span_test_args()
+        active_colors = {
+            "WHITE": AnsiColors.WHITE.value,
+            "BRIGHT_GREEN": AnsiColors.BRIGHT_GREEN.value,
+            "GREEN": AnsiColors.GREEN.value,
+            "RESET": AnsiColors.RESET.value,
+        }
+        # Idle, partially visible, fully visible and leaving-the-screen drops.
+        cols = [ColumnState(h, 0) for h in (0, 1, 3, 6, 8, 9, 11)]
+        width, height = len(cols), 8
+
+        with patch("random.choice", return_value="T"):
+            expected = render_frame_buffer(
+                cols, width, height, active_colors, args, [["T"]], 0.0
+            )
+            palette = compile_palette(active_colors, "classic", "normal", 4, 1)
+            renderer = SpanRenderer(width, height)
+            rows = renderer.render(iter_active_drops(cols, [["T"]]), palette, 0.0)
+
+        self.assertEqual(["".join(row) for row in rows], expected)
+
+    def test_span_renderer_clears_previous_trails(self):
+        """Test that cells lit on the previous frame are blanked when no longer in a trail."""
+        active_colors = {"WHITE": AnsiColors.WHITE.value, "GREEN": AnsiColors.GREEN.value}
+        palette = compile_palette(active_colors, "classic", "normal", 4, 1)
+        renderer = SpanRenderer(2, 6)
+
+        renderer.render([(0, 3, ["T"])], palette, 0.0)
+        rows = renderer.render([(1, 2, ["T"])], palette, 0.0)
+
+        self.assertEqual([row[0] for row in rows], [" "] * 6)
+        self.assertEqual(rows[1][1], f"{AnsiColors.WHITE.value}T")
+        self.assertEqual(rows[2][1], " ")
+
+    def test_span_renderer_keeps_trail_glyphs_between_frames(self):
+        """Test that trail glyphs stay put and only the new head row gets a glyph."""
+        active_colors = {"WHITE": AnsiColors.WHITE.value, "GREEN": AnsiColors.GREEN.value}
+        palette = compile_palette(active_colors, "classic", "normal", 4, 1)
+        renderer = SpanRenderer(1, 8)
+        glyphs = [chr(ord("A") + i) for i in range(26)]
+
+        renderer.render([(0, 3, glyphs)], palette, 0.0)
+        before = [renderer.glyph_grid[row][0] for row in range(3)]
+        renderer.render([(0, 4, glyphs)], palette, 0.0)
+        after = [renderer.glyph_grid[row][0] for row in range(3)]
+
+        self.assertEqual(after, before)
+        self.assertIn(renderer.glyph_grid[3][0], glyphs)
+
+    def test_span_renderer_fills_rows_passed_while_skipping_renders(self):
+        """Test that rows a head entered during skipped renders get fresh glyphs."""
+        active_colors = {"WHITE": AnsiColors.WHITE.value, "GREEN": AnsiColors.GREEN.value}
+        palette = compile_palette(active_colors, "classic", "normal", 4, 1)
+        renderer = SpanRenderer(1, 8)
+
+        renderer.render([(0, 2, ["A"])], palette, 0.0)
+        rows = renderer.render([(0, 5, ["B"])], palette, 0.0, steps=3)
+
+        self.assertEqual([row[0][-1] for row in rows[1:5]], ["A", "B", "B", "B"])
+
+    def test_span_renderer_glitch_mutates_sampled_cells(self):
+        """Test that a full glitch rate re-draws trail glyphs and a zero rate keeps them."""
+        active_colors = {"WHITE": AnsiColors.WHITE.value, "GREEN": AnsiColors.GREEN.value}
+        palette = compile_palette(active_colors, "classic", "normal", 4, 1)
+        renderer = SpanRenderer(2, 8)
+
+        renderer.render([(0, 4, ["A"]), (1, 4, ["A"])], palette, 0.0)
+        rows = renderer.render([(0, 4, ["B"]), (1, 4, ["B"])], palette, 0.0, steps=0)
+        self.assertEqual({cell[-1] for row in rows[:4] for cell in row}, {"A"})
+
+        rows = renderer.render([(0, 4, ["B"]), (1, 4, ["B"])], palette, 1.0, steps=0)
+        self.assertIn("B", {cell[-1] for row in rows[:4] for cell in row})
+
+    def test_update_column_states_spawns_wide_sets_on_even_columns(self):
+        """Test that odd columns and the last column only pick single-width sets."""
+        char_sets = [compile_glyph_table("ab"), compile_glyph_table(CHARS_KATAKANA)]
+        rng = MagicMock()
+        rng.random.side_effect = [0.0, 0.99] * 5  # Spawn, then pick the last allowed set
+        cols = [ColumnState(0, 0) for _ in range(5)]
+
+        update_column_states(
+            cols, 5, 10, 1.0, 3, char_sets, rng, narrow_char_set_count=1
+        )
+        self.assertEqual([col.char_set_index for col in cols], [1, 0, 1, 0, 0])
+
+    def test_span_renderer_lays_out_double_width_glyphs(self):
+        """Test that a wide trail covers the cell to its right with continuation cells."""
+        active_colors = {"WHITE": AnsiColors.WHITE.value, "GREEN": AnsiColors.GREEN.value}
+        palette = compile_palette(active_colors, "classic", "normal", 4, 1)
+        wide = compile_glyph_table("ア")
+        renderer = SpanRenderer(3, 3)
+
+        rows = renderer.render([(0, 2, wide), (1, 3, ["b"]), (2, 3, wide)], palette, 0.0)
+        # The wide trail wins over the narrow one at x=1; x=2 has no room for one.
+        self.assertEqual([row[0][-1:] for row in rows], ["ア", "ア", " "])
+        self.assertEqual([row[1] for row in rows], ["", "", f"{AnsiColors.WHITE.value}b"])
+        self.assertEqual([row[2] for row in rows], [" "] * 3)
+
+        rows = renderer.render([], palette, 0.0)
+        self.assertEqual(rows, [[" "] * 3] * 3)
+
+    def test_resize_columns_keeps_surviving_columns(self):
+        """Test that resize_columns trims or appends idle columns in place."""
+        cols = [ColumnState(5, 0), ColumnState(3, 1), ColumnState(7, 0)]
+        first = cols[0]
+        resize_columns(cols, 2, 2)
+        self.assertEqual([col.head_y for col in cols], [5, 3])
+        resize_columns(cols, 4, 2)
+        self.assertIs(cols[0], first)
+        self.assertEqual([col.head_y for col in cols], [5, 3, 0, 0])
+        self.assertTrue(all(0 <= col.char_set_index < 2 for col in cols))
+
+    def test_python_engine_reports_its_column_states(self):
+        """Test that the Python engine's memory report describes its own ColumnState list."""
+        cols = [ColumnState(0, 0) for _ in range(3)]
+        engine = PythonColumnEngine(cols, [["a"]])
+        engine.resize(5)
+        self.assertEqual(engine.memory_report(), column_memory_report(cols))
+        self.assertIn("5 column states", engine.memory_report())
+
+    def test_python_engine_resize_drops_removed_columns(self):
+        """Test that shrinking the Python engine removes the drops of the cut columns."""
+        cols = [ColumnState(4, 0, deque([[9, 0]])), ColumnState(6, 0, deque([[12, 0]]))]
+        engine = PythonColumnEngine(cols, [["a"]])
+        engine.resize(1)
+        self.assertEqual([head_y for _, head_y, _ in engine.active_drops()], [4, 9])
+        engine.resize(3)
+        self.assertEqual(engine.active_drop_count(), 2)
+
+    def test_span_renderer_resize_keeps_glyphs_and_fills_new_rows(self):
+        """Test that a resize keeps existing glyphs and fills trail rows that become visible."""
+        active_colors = {"WHITE": AnsiColors.WHITE.value, "GREEN": AnsiColors.GREEN.value}
+        palette = compile_palette(active_colors, "classic", "normal", 4, 1)
+        renderer = SpanRenderer(3, 4)
+        renderer.render([(0, 4, ["A"]), (2, 6, ["A"])], palette, 0.0)
+
+        renderer.resize(2, 6)
+        self.assertEqual([len(row) for row in renderer.frame_cells], [2] * 6)
+        self.assertEqual(len(renderer.glyph_grid), 6)
+        rows = renderer.render([(0, 6, ["B"])], palette, 0.0)
+
+        # Rows 2-3 kept their glyphs; row 4 was filled because it is new, not because the head entered it.
+        self.assertEqual([row[0][-1] for row in rows], [" ", " ", "A", "A", "B", "B"])
+        self.assertEqual([row[1] for row in rows], [" "] * 6)
+
+        renderer.resize(1, 3)  # Spans outside the screen are dropped
+        rows = renderer.render([], palette, 0.0)
+        self.assertEqual(rows, [[" "]] * 3)
+
 
 if __name__ == "__main__":
     unittest.main()
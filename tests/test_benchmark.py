@@ -0,0 +1,81 @@
+import unittest
+
+from benchmark import (
+    MAX_PEAK_BYTES_PER_FRAME,
+    PHASES,
+    benchmark_configs,
+    compare_results,
+    config_key,
+    measure_allocations,
+    over_allocation_budget,
+    run_benchmark,
+)
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_full_grid_covers_every_dimension(self):
+        """Test that the grid spans sizes, themes, intensities, densities and glitch rates."""
+        configs = benchmark_configs()
+        self.assertEqual(len(configs), 4 * 2 * 3 * 3 * 2)
+        self.assertIn((80, 24), {(c["width"], c["height"]) for c in configs})
+        self.assertIn((500, 150), {(c["width"], c["height"]) for c in configs})
+        self.assertEqual({c["color_intensity"] for c in configs}, {"dim", "normal", "bright"})
+        self.assertEqual(len({config_key(c) for c in configs}), len(configs))
+
+    def test_run_benchmark_reports_phases_and_bytes(self):
+        """Test that a headless run reports fps, per-phase timings and bytes per frame."""
+        config = benchmark_configs(quick=True)[0]
+        entry = run_benchmark(config, frames=3)
+        self.assertEqual(entry["key"], config_key(config))
+        self.assertEqual(set(entry["us_per_phase"]), set(PHASES))
+        self.assertGreater(entry["fps"], 0)
+        self.assertGreater(entry["bytes_per_frame"], 0)
+
+    def test_steady_state_frames_stay_within_allocation_budget(self):
+        """Test that warmed-up frames allocate within budget and cause no full collection."""
+        for theme, render_mode in (("classic", "full"), ("colorful", "diff")):
+            config = dict(benchmark_configs(quick=True)[0], theme=theme, glitch_rate=0.01)
+            entry = measure_allocations(
+                config, frames=50, render_mode=render_mode, warmup_frames=300
+            )
+            self.assertFalse(over_allocation_budget(entry), entry)
+            self.assertEqual(entry["gc_collections"][-1], 0)
+
+    def test_allocation_budget_flags_heavy_frames(self):
+        """Test that growing memory, a large peak or a full collection is over budget."""
+        entry = {
+            "retained_bytes_per_frame": 0.0,
+            "peak_bytes_per_frame": 1024,
+            "gc_collections": [3, 0, 0],
+        }
+        self.assertFalse(over_allocation_budget(entry))
+        self.assertTrue(
+            over_allocation_budget(dict(entry, retained_bytes_per_frame=4096.0))
+        )
+        self.assertTrue(
+            over_allocation_budget(dict(entry, peak_bytes_per_frame=MAX_PEAK_BYTES_PER_FRAME + 1))
+        )
+        self.assertTrue(over_allocation_budget(dict(entry, gc_collections=[3, 1, 1])))
+
+    def test_compare_results_flags_only_slowdowns_over_threshold(self):
+        """Test that regressions are reported relative to the baseline's us/frame."""
+        baseline = {
+            "results": [
+                {"key": "a", "us_per_frame": 100.0},
+                {"key": "b", "us_per_frame": 100.0},
+                {"key": "c", "us_per_frame": 100.0},
+            ]
+        }
+        results = [
+            {"key": "a", "us_per_frame": 105.0},  # Within threshold
+            {"key": "b", "us_per_frame": 150.0},  # Regression
+            {"key": "c", "us_per_frame": 50.0},  # Faster
+            {"key": "d", "us_per_frame": 999.0},  # Not in baseline
+        ]
+        regressions = compare_results(results, baseline, threshold=0.10)
+        self.assertEqual([r[0] for r in regressions], ["b"])
+        self.assertAlmostEqual(regressions[0][3], 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import asyncio
+import os
+import socket
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from config import DEFAULT_HOST, parse_address
+from frame_broadcast import BroadcastServer, copy_stream
+
+RESET = "\033[0m"
+
+
+class FakeProducer:
+    """Produces 1x3 frames whose middle cell counts the frames rendered."""
+
+    def __init__(self):
+        self.frame = 0
+
+    def advance(self):
+        pass
+
+    def render(self):
+        self.frame += 1
+        return [["a", str(self.frame % 10), "b"]]
+
+
+def make_server(max_pending_bytes=1000):
+    scheduler = MagicMock()
+    scheduler.should_render.return_value = True
+    return BroadcastServer(
+        FakeProducer(), scheduler, RESET, max_pending_bytes=max_pending_bytes
+    )
+
+
+def fake_writer():
+    writer = MagicMock()
+    writer.is_closing.return_value = False
+    writer.transport.get_write_buffer_size.return_value = 0
+    return writer
+
+
+class TestParseAddress(unittest.TestCase):
+    def test_unix_and_tcp_addresses(self):
+        """Test that Unix paths, host:port and :port addresses are recognized."""
+        self.assertEqual(
+            parse_address("unix:/tmp/rain.sock"), ("unix", "/tmp/rain.sock")
+        )
+        self.assertEqual(parse_address("0.0.0.0:7000"), ("tcp", ("0.0.0.0", 7000)))
+        self.assertEqual(parse_address(":7000"), ("tcp", (DEFAULT_HOST, 7000)))
+        self.assertEqual(parse_address("[::1]:7000"), ("tcp", ("::1", 7000)))
+
+    def test_invalid_addresses_are_rejected(self):
+        """Test that addresses without a path or a valid port raise ValueError."""
+        for text in ("unix:", "localhost", "host:port", ":70000"):
+            with self.assertRaises(ValueError):
+                parse_address(text)
+
+
+class TestBroadcastServer(unittest.TestCase):
+    def test_clients_on_localhost_get_keyframe_then_diffs(self):
+        """Test that every client starts with a keyframe and then receives the shared diffs."""
+
+        async def scenario(path):
+            server = make_server()
+            listener = await server.start(("unix", path))
+            try:
+                _, first = await asyncio.open_unix_connection(path)
+                reader, second = await asyncio.open_unix_connection(path)
+                while len(server.clients) < 2:
+                    await asyncio.sleep(0.001)
+                server.run_frame()
+                server.run_frame()
+                await asyncio.sleep(0.01)
+                first.close()  # The server notices and drops the client
+                while len(server.clients) > 1:
+                    await asyncio.sleep(0.001)
+                server.run_frame()
+                await asyncio.sleep(0.01)
+                second.close()
+                return server, await reader.read(1000)
+            finally:
+                for client in tuple(server.clients):
+                    server.remove_client(client)
+                listener.close()
+                await listener.wait_closed()
+
+        with tempfile.TemporaryDirectory() as directory:
+            server, received = asyncio.run(scenario(os.path.join(directory, "rain.sock")))
+
+        self.assertEqual(
+            received.decode(),
+            "\033[H\033[2Ja1b" + RESET + "\033[1;2H2" + RESET + "\033[1;2H3" + RESET,
+        )
+        self.assertEqual(server.keyframes, 2)
+        self.assertEqual((server.clients_served, server.peak_clients), (2, 2))
+        self.assertEqual(server.frames_broadcast, 3)
+
+    def test_slow_client_is_skipped_and_resynced(self):
+        """Test that a client over its pending limit skips frames and resumes with a keyframe."""
+        server = make_server(max_pending_bytes=100)
+        fast, slow = fake_writer(), fake_writer()
+        server.add_client(fast)
+        slow_client = server.add_client(slow)
+        server.run_frame()
+
+        slow.transport.get_write_buffer_size.return_value = 500
+        server.run_frame()
+        server.run_frame()
+        self.assertEqual(slow.write.call_count, 1)
+        self.assertEqual(fast.write.call_count, 3)
+        self.assertEqual((slow_client.frames_skipped, server.resyncs), (2, 1))
+
+        slow.transport.get_write_buffer_size.return_value = 0
+        server.run_frame()
+        self.assertTrue(slow.write.call_args[0][0].startswith(b"\033[H\033[2J"))
+        self.assertTrue(fast.write.call_args[0][0].startswith(b"\033[1;2H"))
+        self.assertEqual(server.keyframes, 3)
+
+    def test_closing_clients_are_removed(self):
+        """Test that a client whose connection is closing is dropped at the next frame."""
+        server = make_server()
+        writer = fake_writer()
+        server.add_client(writer)
+        writer.is_closing.return_value = True
+        server.run_frame()
+        self.assertEqual(server.clients, [])
+        writer.write.assert_not_called()
+
+    def test_frames_are_not_rendered_without_clients(self):
+        """Test that the simulation advances but nothing is rendered while no one watches."""
+        server = make_server()
+        server.run_frame()
+        self.assertEqual(server.producer.frame, 0)
+        self.assertIn("0 frames", server.summary())
+
+
+class TestBroadcastClient(unittest.TestCase):
+    def test_copy_stream_copies_until_the_server_closes(self):
+        """Test that everything received is written to the output descriptor."""
+        server_sock, client_sock = socket.socketpair()
+        read_fd, write_fd = os.pipe()
+        try:
+            server_sock.sendall(b"\033[H\033[2Jrain")
+            server_sock.close()
+            with client_sock:
+                self.assertEqual(copy_stream(client_sock, write_fd), 11)
+            self.assertEqual(os.read(read_fd, 100), b"\033[H\033[2Jrain")
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from frame_buffer import FrameBuffer, write_all
+
+
+class TestFrameBuffer(unittest.TestCase):
+    def test_append_encodes_text_as_utf8(self):
+        """Test that appended text is stored as its UTF-8 bytes."""
+        buffer = FrameBuffer()
+        buffer.append("\033[32m")
+        buffer.append("ア")
+        buffer.finish()
+        buffer.append_text(" hud")
+        self.assertEqual(buffer.getvalue(), b"\033[32m\xe3\x82\xa2 hud")  # ア in UTF-8
+        self.assertEqual(len(buffer), len(buffer.getvalue()))
+
+    def test_clear_reuses_the_allocation(self):
+        """Test that a cleared buffer keeps its bytearray and overwrites it."""
+        buffer = FrameBuffer()
+        buffer.append("abcdef")
+        buffer.finish()
+        data = buffer.data
+        buffer.clear()
+        buffer.append("xy")
+        buffer.finish()
+        self.assertIs(buffer.data, data)
+        self.assertEqual(buffer.getvalue(), b"xy")
+
+    def test_flush_encodes_pieces_in_order_without_emptying_the_frame(self):
+        """Test that flushed rows are kept and later pieces are encoded after them."""
+        buffer = FrameBuffer()
+        buffer.append("row 1")
+        buffer.flush()
+        self.assertEqual(buffer.getvalue(), b"row 1")
+        buffer.append("\n")
+        buffer.append("ア")
+        buffer.flush()
+        buffer.flush()
+        buffer.finish()
+        self.assertEqual(buffer.getvalue(), b"row 1\n\xe3\x82\xa2")  # ア in UTF-8
+
+    def test_write_to_sends_only_the_current_frame(self):
+        """Test that write_to writes the frame's bytes and leaves the buffer growable."""
+        buffer = FrameBuffer()
+        buffer.append("long first frame")
+        buffer.finish()
+        buffer.clear()
+        buffer.append("short")
+        buffer.finish()
+        read_fd, write_fd = os.pipe()
+        try:
+            self.assertEqual(buffer.write_to(write_fd), 5)
+            self.assertEqual(os.read(read_fd, 100), b"short")
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+        buffer.append_text(" and more")  # Fails if a view were still exported
+        self.assertEqual(buffer.getvalue(), b"short and more")
+
+
+class TestWriteAll(unittest.TestCase):
+    def test_write_all_resumes_after_partial_writes(self):
+        """Test that write_all keeps writing from the first unwritten byte."""
+        chunks = []
+
+        def partial_write(fd, data):
+            chunks.append(bytes(data[:3]))
+            return min(3, len(data))
+
+        with patch("frame_buffer.os.write", side_effect=partial_write):
+            self.assertEqual(write_all(1, b"abcdefgh"), 8)
+        self.assertEqual(chunks, [b"abc", b"def", b"gh"])
+
+    def test_write_all_waits_when_the_descriptor_would_block(self):
+        """Test that EAGAIN waits for the descriptor to become writable and retries."""
+        with (
+            patch(
+                "frame_buffer.os.write", side_effect=[BlockingIOError(), 4]
+            ) as mock_write,
+            patch("frame_buffer.select.select") as mock_select,
+        ):
+            self.assertEqual(write_all(7, b"data"), 4)
+        mock_select.assert_called_once_with([], [7], [])
+        self.assertEqual(mock_write.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+import unittest
+
+from config import AnsiColors
+from frame_buffer import FrameBuffer
+from frame_encoders import (
+    ERASE_LINE,
+    DiffFrameEncoder,
+    FullFrameEncoder,
+    blank_skip,
+    create_frame_encoder,
+    cursor_position,
+    encode_keyframe,
+)
+
+RESET = AnsiColors.RESET.value
+GREEN = AnsiColors.GREEN.value
+
+
+def blank_frame(width, height):
+    return [[" "] * width for _ in range(height)]
+
+
+class TestFrameEncoders(unittest.TestCase):
+    def test_full_encoder_repaints_every_row(self):
+        """Test that the full encoder homes the cursor and joins all rows."""
+        frame = [["a", "b"], ["c", "d"]]
+        output = FullFrameEncoder().encode(frame, RESET)
+        self.assertEqual(output, "\033[Hab\ncd" + RESET)
+
+    def test_full_encoder_clears_screen_when_frame_size_changes(self):
+        """Test that the full encoder clears leftovers when the frame size changes."""
+        encoder = FullFrameEncoder()
+        encoder.encode([["a", "b"], ["c", "d"]], RESET)
+        self.assertEqual(encoder.encode([["e"]], RESET), "\033[H\033[2Je" + RESET)
+        self.assertEqual(encoder.encode([["f"]], RESET), "\033[Hf" + RESET)
+
+    def test_full_encoder_skips_blanks_already_blank_on_screen(self):
+        """Test that blank spans and rows are erased once and then skipped."""
+        encoder = FullFrameEncoder()
+        frame = blank_frame(12, 3)
+        frame[0][0] = "a"
+        frame[0][11] = "b"
+        frame[2][0] = "c"
+        # Unknown screen: ten stale cells cost less to erase and jump over.
+        self.assertEqual(
+            encoder.encode(frame, RESET),
+            f"\033[Ha{ERASE_LINE}\033[10Cb\n{ERASE_LINE}\nc{ERASE_LINE}{RESET}",
+        )
+        self.assertEqual(
+            encoder.encode(frame, RESET), f"\033[Ha{ERASE_LINE}\033[10Cb\n\nc{RESET}"
+        )
+        # A single stale cell is cheaper to overwrite than to erase.
+        self.assertEqual(
+            encoder.encode(blank_frame(12, 3), RESET), f"\033[H{ERASE_LINE}\n\n {RESET}"
+        )
+        self.assertEqual(encoder.encode(blank_frame(12, 3), RESET), f"\033[H{RESET}")
+
+    def test_full_encoder_rewrites_blanks_after_invalidate(self):
+        """Test that invalidate() makes the next frame erase every blank row again."""
+        encoder = FullFrameEncoder()
+        encoder.encode(blank_frame(8, 2), RESET)
+        self.assertEqual(encoder.encode(blank_frame(8, 2), RESET), f"\033[H{RESET}")
+        encoder.invalidate()
+        self.assertEqual(
+            encoder.encode(blank_frame(8, 2), RESET),
+            f"\033[H{ERASE_LINE}\n{ERASE_LINE}{RESET}",
+        )
+
+    def test_keyframe_jumps_over_blank_rows_when_shorter(self):
+        """Test that a cleared screen skips blank rows with a cursor jump instead of newlines."""
+        frame = blank_frame(6, 12)
+        frame[2][5] = "x"
+        frame[11][0] = "y"  # Nine newlines would be longer than the jump
+        output = encode_keyframe(frame, RESET, FrameBuffer()).getvalue().decode("utf-8")
+        self.assertEqual(
+            output, f"\033[H\033[2J\n\n\033[5Cx{cursor_position(11, 0)}y{RESET}"
+        )
+
+    def test_blank_skip_uses_the_shorter_encoding(self):
+        """Test that short blank runs stay spaces and long ones become cursor-forward escapes."""
+        self.assertEqual(blank_skip(4), "    ")
+        self.assertEqual(blank_skip(5), "\033[5C")
+        self.assertEqual(blank_skip(120), "\033[120C")
+
+    def test_diff_encoder_first_frame_is_full_repaint(self):
+        """Test that the diff encoder repaints everything when it has no screen state."""
+        frame = [["a", "b"], ["c", "d"]]
+        output = DiffFrameEncoder().encode(frame, RESET)
+        self.assertEqual(output, "\033[H\033[2Jab\ncd" + RESET)
+
+    def test_diff_encoder_unchanged_frame_emits_nothing(self):
+        """Test that an identical frame produces no output at all."""
+        encoder = DiffFrameEncoder()
+        encoder.encode(blank_frame(5, 3), RESET)
+        self.assertEqual(encoder.encode(blank_frame(5, 3), RESET), "")
+
+    def test_diff_encoder_groups_adjacent_changes_into_one_run(self):
+        """Test that adjacent changed cells share a single cursor escape."""
+        encoder = DiffFrameEncoder()
+        encoder.encode(blank_frame(10, 3), RESET)
+        frame = blank_frame(10, 3)
+        frame[1][3] = f"{GREEN}x"
+        frame[1][4] = f"{GREEN}y"
+        output = encoder.encode(frame, RESET)
+        self.assertEqual(output, f"{cursor_position(1, 3)}{GREEN}xy{RESET}")
+
+    def test_diff_encoder_bridges_short_gaps_and_jumps_long_ones(self):
+        """Test that short unchanged gaps are re-sent while long ones use a cursor jump."""
+        encoder = DiffFrameEncoder()
+        encoder.encode(blank_frame(40, 1), RESET)
+        frame = blank_frame(40, 1)
+        frame[0][0] = "a"
+        frame[0][2] = "b"  # One blank cell in between: cheaper to re-send it
+        frame[0][30] = "c"  # Far away: cheaper to move the cursor
+        output = encoder.encode(frame, RESET)
+        self.assertEqual(
+            output, f"{cursor_position(0, 0)}a b{cursor_position(0, 30)}c{RESET}"
+        )
+
+    def test_diff_encoder_tracks_emitted_screen(self):
+        """Test that a change is sent once and then considered part of the screen."""
+        encoder = DiffFrameEncoder()
+        encoder.encode(blank_frame(4, 2), RESET)
+        frame = blank_frame(4, 2)
+        frame[0][1] = "z"
+        self.assertNotEqual(encoder.encode(frame, RESET), "")
+        self.assertEqual(encoder.encode(frame, RESET), "")
+        self.assertEqual(
+            encoder.encode(blank_frame(4, 2), RESET),
+            f"{cursor_position(0, 1)} {RESET}",
+        )
+
+    def test_diff_encoder_writes_nothing_for_continuation_cells(self):
+        """Test that the empty cell right of a double-width glyph adds no output."""
+        encoder = DiffFrameEncoder()
+        encoder.encode(blank_frame(4, 1), RESET)
+        frame = blank_frame(4, 1)
+        frame[0][1:3] = [f"{GREEN}ア", ""]
+        frame[0][3] = f"{GREEN}x"
+        self.assertEqual(
+            encoder.encode(frame, RESET), f"{cursor_position(0, 1)}{GREEN}アx{RESET}"
+        )
+        self.assertEqual(
+            encoder.encode(blank_frame(4, 1), RESET), f"{cursor_position(0, 1)}   {RESET}"
+        )
+
+    def test_diff_encoder_erases_cleared_row_ends(self):
+        """Test that a row end that turned blank is erased when that beats sending spaces."""
+        encoder = DiffFrameEncoder()
+        encoder.encode(blank_frame(10, 1), RESET)
+        frame = blank_frame(10, 1)
+        frame[0][2:7] = list("abcde")
+        encoder.encode(frame, RESET)
+        self.assertEqual(
+            encoder.encode(blank_frame(10, 1), RESET),
+            f"{cursor_position(0, 2)}{ERASE_LINE}{RESET}",
+        )
+        self.assertEqual(encoder.encode(blank_frame(10, 1), RESET), "")
+
+    def test_diff_encoder_repaints_after_size_change_or_invalidate(self):
+        """Test that a new frame size or invalidate() forces a full repaint."""
+        encoder = DiffFrameEncoder()
+        encoder.encode(blank_frame(4, 2), RESET)
+        self.assertTrue(encoder.encode(blank_frame(5, 2), RESET).startswith("\033[H"))
+        encoder.invalidate()
+        self.assertTrue(encoder.encode(blank_frame(5, 2), RESET).startswith("\033[H"))
+
+    def test_full_encoder_emits_color_only_when_it_changes(self):
+        """Test that consecutive same-colored cells share one escape, even across blanks and rows."""
+        white = AnsiColors.WHITE.value
+        frame = [
+            [f"{GREEN}a", f"{GREEN}b", " ", f"{GREEN}c"],
+            [f"{GREEN}d", f"{white}e", f"{white}f", f"{GREEN}g"],
+        ]
+        output = FullFrameEncoder().encode(frame, RESET)
+        self.assertEqual(output, f"\033[H{GREEN}ab c\nd{white}ef{GREEN}g{RESET}")
+
+    def test_diff_encoder_carries_color_across_runs(self):
+        """Test that the color set by one run is reused by the next run in the same frame."""
+        encoder = DiffFrameEncoder()
+        encoder.encode(blank_frame(40, 2), RESET)
+        frame = blank_frame(40, 2)
+        frame[0][0] = f"{GREEN}a"
+        frame[1][30] = f"{GREEN}b"
+        output = encoder.encode(frame, RESET)
+        self.assertEqual(
+            output, f"{cursor_position(0, 0)}{GREEN}a{cursor_position(1, 30)}b{RESET}"
+        )
+
+    def test_output_stats_report_bytes_before_and_after(self):
+        """Test that the stats count bytes written and escape bytes saved."""
+        encoder = FullFrameEncoder()
+        frame = [[f"{GREEN}a", f"{GREEN}b", f"{GREEN}c"]]
+        output = encoder.encode(frame, RESET)
+        self.assertEqual(encoder.stats.frames, 1)
+        self.assertEqual(encoder.stats.bytes_written, len(output))
+        self.assertEqual(encoder.stats.bytes_saved, 2 * len(GREEN))
+        self.assertIn("bytes/frame", encoder.stats.summary())
+
+    def test_create_frame_encoder(self):
+        """Test that render modes map to the matching encoder."""
+        self.assertIsInstance(create_frame_encoder("full"), FullFrameEncoder)
+        self.assertIsInstance(create_frame_encoder("diff"), DiffFrameEncoder)
+
+
+if __name__ == "__main__":
+    unittest.main()
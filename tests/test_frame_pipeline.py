@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from frame_pipeline import FramePipeline
+
+
+def fill(buffer, text):
+    buffer.append(text)
+    buffer.finish()
+    return buffer
+
+
+class TestFramePipeline(unittest.TestCase):
+    def test_frames_are_written_in_order(self):
+        """Test that submitted frames reach the file descriptor in submission order."""
+        read_fd, write_fd = os.pipe()
+        try:
+            pipeline = FramePipeline(write_fd, policy="block")
+            for text in ("one ", "two ", "three"):
+                buffer, dropped = pipeline.acquire()
+                self.assertFalse(dropped)
+                pipeline.submit(fill(buffer, text))
+            pipeline.close()
+            self.assertEqual(os.read(read_fd, 100), b"one two three")
+            self.assertEqual(pipeline.frames_written, 3)
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+    def test_empty_frames_are_not_written(self):
+        """Test that an empty buffer is returned to the ring instead of being queued."""
+        with patch("frame_buffer.os.write") as mock_write:
+            pipeline = FramePipeline(1, policy="block", slot_count=1)
+            buffer, _ = pipeline.acquire()
+            pipeline.submit(buffer)
+            buffer, _ = pipeline.acquire()  # Would wait forever if it had been queued
+            pipeline.submit(buffer)
+            pipeline.close()
+        mock_write.assert_not_called()
+
+    def test_latest_policy_discards_unsent_frames(self):
+        """Test that a full ring drops queued frames and reports it to the producer."""
+        release = threading.Event()
+        written = []
+
+        def slow_write(fd, data):
+            release.wait()
+            written.append(bytes(data))
+            return len(data)
+
+        with patch("frame_buffer.os.write", side_effect=slow_write):
+            pipeline = FramePipeline(1, policy="latest", slot_count=2)
+            for text in ("a", "b"):
+                buffer, dropped = pipeline.acquire()
+                pipeline.submit(fill(buffer, text))
+            # "a" is being written or queued, "b" is queued: the ring is full.
+            while pipeline._free:
+                time.sleep(0.001)
+            buffer, dropped = pipeline.acquire()
+            self.assertTrue(dropped)
+            pipeline.submit(fill(buffer, "c"))
+            release.set()
+            pipeline.close()
+
+        self.assertEqual(written[-1], b"c")
+        self.assertNotIn(b"b", written)
+        self.assertGreaterEqual(pipeline.frames_dropped, 1)
+
+    def test_writer_errors_surface_in_acquire(self):
+        """Test that a failed write is raised to the producer on its next acquire."""
+        with patch("frame_buffer.os.write", side_effect=BrokenPipeError()):
+            pipeline = FramePipeline(1, policy="block", slot_count=1)
+            buffer, _ = pipeline.acquire()
+            pipeline.submit(fill(buffer, "x"))
+            with self.assertRaises(BrokenPipeError):
+                pipeline.acquire()
+            pipeline.close()
+
+    def test_unknown_policy_is_rejected(self):
+        """Test that an unknown drop policy raises ValueError."""
+        with self.assertRaises(ValueError):
+            FramePipeline(1, policy="oldest")
+
+
+if __name__ == "__main__":
+    unittest.main()
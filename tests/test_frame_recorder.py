@@ -0,0 +1,107 @@
+import gzip
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from animation_core import FrameProducer, initialize_animation_parameters
+from config import build_argument_parser
+from frame_buffer import FrameBuffer
+from frame_encoders import create_frame_encoder
+from frame_recorder import (
+    EPILOGUE,
+    PREAMBLE,
+    FrameRecorder,
+    record_animation,
+    record_format_for,
+)
+
+
+def frame(text):
+    buffer = FrameBuffer()
+    buffer.append(text)
+    buffer.finish()
+    return buffer
+
+
+def record_seeded(path, frames=20, seed=7):
+    """Records a small seeded animation to path and returns the recorder."""
+    args = build_argument_parser().parse_args(
+        ["--seed", str(seed), "--theme", "colorful", "--glitch-rate", "0.02"]
+    )
+    random.seed(seed)
+    columns, char_sets, colors = initialize_animation_parameters(args, 30, 10)
+    producer = FrameProducer(args, 30, 10, colors, columns, char_sets)
+    with FrameRecorder(path, 30, 10, 0.1) as recorder:
+        record_animation(producer, create_frame_encoder("diff"), recorder, frames)
+    return recorder
+
+
+class TestFrameRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def _path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_format_follows_file_name(self):
+        """Test that .cast and .cast.gz names record asciicast and others raw ANSI."""
+        self.assertEqual(record_format_for("rain.cast"), "asciicast")
+        self.assertEqual(record_format_for("rain.cast.gz"), "asciicast")
+        self.assertEqual(record_format_for("rain.ans.gz"), "ansi")
+        self.assertEqual(record_format_for("rain"), "ansi")
+
+    def test_asciicast_events_are_timestamped_by_frame(self):
+        """Test that an asciicast file has a header and one event per non-empty frame."""
+        path = self._path("rain.cast")
+        with FrameRecorder(path, 80, 24, 0.05) as recorder:
+            recorder.write_frame(frame("\033[Hア"))
+            recorder.write_frame(FrameBuffer())  # Nothing changed
+            recorder.write_frame(frame("b"))
+
+        with open(path, encoding="utf-8") as file:
+            lines = [json.loads(line) for line in file]
+        self.assertEqual(lines[0], {"version": 2, "width": 80, "height": 24})
+        self.assertEqual(
+            lines[1:],
+            [
+                [0.0, "o", PREAMBLE.decode()],
+                [0.0, "o", "\033[Hア"],
+                [0.1, "o", "b"],
+                [0.15, "o", EPILOGUE.decode()],
+            ],
+        )
+        self.assertEqual(recorder.frames, 3)
+
+    def test_ansi_stream_is_compressed_for_gz_names(self):
+        """Test that raw ANSI frames are written back to back, gzip-compressed for .gz."""
+        path = self._path("rain.ans.gz")
+        with FrameRecorder(path, 80, 24, 0.1) as recorder:
+            recorder.write_frame(frame("one"))
+            recorder.write_frame(frame("two"))
+
+        with gzip.open(path) as file:
+            self.assertEqual(file.read(), PREAMBLE + b"onetwo" + EPILOGUE)
+        self.assertEqual(recorder.bytes_recorded, len(PREAMBLE + b"onetwo" + EPILOGUE))
+
+    def test_seeded_recordings_are_identical(self):
+        """Test that the same seed records the same file, so recordings can be compared."""
+        first = record_seeded(self._path("first.cast"))
+        record_seeded(self._path("second.cast"))
+        with open(self._path("first.cast"), "rb") as a, open(
+            self._path("second.cast"), "rb"
+        ) as b:
+            self.assertEqual(a.read(), b.read())
+        self.assertEqual(first.frames, 20)
+        self.assertIn("Recorded 20 frames", first.summary())
+
+    def test_unknown_format_is_rejected(self):
+        """Test that an unknown record format raises ValueError."""
+        with self.assertRaises(ValueError):
+            FrameRecorder(self._path("rain"), 80, 24, 0.1, record_format="gif")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+from frame_scheduler import MAX_CONSECUTIVE_DROPS, FrameScheduler
+
+
+class FakeClock:
+    """A monotonic clock that only moves when told to (or when slept on)."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestFrameScheduler(unittest.TestCase):
+    def _scheduler(self, period=0.1):
+        clock = FakeClock()
+        scheduler = FrameScheduler(period, clock=clock, sleep=clock.sleep)
+        scheduler.start()
+        return scheduler, clock
+
+    def test_sleep_absorbs_render_time(self):
+        """Test that the sleep shrinks by the time spent rendering, keeping the period fixed."""
+        scheduler, clock = self._scheduler()
+        self.assertTrue(scheduler.should_render())
+        clock.now += 0.03  # Simulate 30 ms of work
+        scheduler.wait_for_next_frame()
+        self.assertAlmostEqual(clock.sleeps[-1], 0.07)
+        self.assertAlmostEqual(clock.now, 100.1)
+
+    def test_deadlines_do_not_drift(self):
+        """Test that frame n ends at start + n * period regardless of work per frame."""
+        scheduler, clock = self._scheduler()
+        for work in (0.01, 0.05, 0.09, 0.02):
+            scheduler.should_render()
+            clock.now += work
+            scheduler.wait_for_next_frame()
+        self.assertAlmostEqual(clock.now, 100.4)
+        self.assertEqual(scheduler.late_frames, 0)
+
+    def test_overrun_marks_late_and_drops_next_render(self):
+        """Test that an overrunning frame is counted late and the next render is skipped."""
+        scheduler, clock = self._scheduler()
+        self.assertTrue(scheduler.should_render())
+        clock.now += 0.25  # Render took two and a half periods
+        scheduler.wait_for_next_frame()
+        self.assertEqual(scheduler.late_frames, 1)
+
+        self.assertFalse(scheduler.should_render())  # Still behind: skip rendering
+        scheduler.wait_for_next_frame()
+        self.assertTrue(scheduler.should_render())  # Caught up again
+        self.assertEqual(scheduler.dropped_frames, 1)
+        self.assertEqual(scheduler.frames, 3)
+
+    def test_consecutive_drops_are_limited(self):
+        """Test that a frame is still rendered after MAX_CONSECUTIVE_DROPS drops."""
+        scheduler, clock = self._scheduler()
+        clock.now += 1.0
+        decisions = [scheduler.should_render() for _ in range(MAX_CONSECUTIVE_DROPS + 1)]
+        self.assertEqual(decisions, [False] * MAX_CONSECUTIVE_DROPS + [True])
+
+    def test_far_behind_restarts_schedule(self):
+        """Test that the scheduler stops catching up after a long stall."""
+        scheduler, clock = self._scheduler()
+        scheduler.should_render()
+        clock.now += 10.0  # e.g. the process was suspended
+        scheduler.wait_for_next_frame()
+        self.assertTrue(scheduler.should_render())
+        scheduler.wait_for_next_frame()
+        self.assertAlmostEqual(clock.sleeps[-1], 0.1)
+
+    def test_advance_deadline_returns_wait_without_sleeping(self):
+        """Test that advance_deadline reports the time left and leaves the waiting to the caller."""
+        scheduler, clock = self._scheduler()
+        clock.now += 0.03
+        self.assertAlmostEqual(scheduler.advance_deadline(), 0.07)
+        self.assertEqual(clock.sleeps, [])
+        clock.now += 0.2
+        self.assertLess(scheduler.advance_deadline(), 0)
+        self.assertEqual(scheduler.late_frames, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import io
+import random
+import unittest
+from unittest.mock import patch
+
+from animation_core import FrameProducer, SpanRenderer, initialize_animation_parameters
+from config import CHARS_KATAKANA, CHARS_LATIN, build_argument_parser
+from glyph_tables import (
+    GlyphTable,
+    allows_wide_glyphs,
+    compile_glyph_table,
+    compile_glyph_tables,
+    narrow_table_count,
+    report_glyph_tables,
+)
+from palette import compile_palette
+
+
+class TestGlyphTables(unittest.TestCase):
+    def test_single_width_set_is_kept_whole(self):
+        """Test that a set of single-width glyphs compiles without losses."""
+        table = compile_glyph_table(CHARS_LATIN)
+        self.assertEqual(table.name, "latin")
+        self.assertEqual(table.glyphs, tuple(CHARS_LATIN))
+        self.assertEqual(table.rejected, 0)
+        self.assertFalse(table.blank)
+
+    def test_wide_glyphs_are_filtered_out(self):
+        """Test that glyphs that are not one cell wide are dropped from the table."""
+        table = compile_glyph_table("aア1")
+        self.assertEqual(table.name, "custom")
+        self.assertEqual(table.glyphs, ("a", "1"))
+        self.assertEqual(table.source_size, 3)
+        self.assertEqual(table.rejected, 1)
+
+    def test_double_width_set_compiles_as_wide_table(self):
+        """Test that a set of mostly double-width glyphs becomes a width-2 table."""
+        table = compile_glyph_table(CHARS_KATAKANA + "ab")
+        self.assertEqual(table.width, 2)
+        self.assertEqual(table.glyphs, tuple(CHARS_KATAKANA))
+        self.assertEqual(table.rejected, 2)
+        self.assertIn("(double-width), 2 not double-width", table.describe())
+        self.assertEqual(compile_glyph_table(CHARS_LATIN).width, 1)
+
+    def test_mixed_width_set_splits_into_one_table_per_width(self):
+        """Test that a mixed set keeps every glyph, in a narrow and a wide table."""
+        tables = compile_glyph_tables("aア1イ\u0301")
+        self.assertEqual([table.width for table in tables], [1, 2])
+        self.assertEqual([table.glyphs for table in tables], [("a", "1"), ("ア", "イ")])
+        self.assertEqual([table.rejected for table in tables], [1, 0])  # The combining mark
+        self.assertEqual(narrow_table_count(tables), 1)
+        self.assertEqual(len(compile_glyph_tables(CHARS_KATAKANA)), 1)
+
+    def test_every_glyph_of_a_mixed_char_set_is_drawn(self):
+        """Test that a --char-set mixing Latin and Katakana draws all of its glyphs."""
+        chars = "abcアイウ"
+        args = build_argument_parser().parse_args(
+            ["--char-set", chars, "--density", "1", "--seed", "4"]
+        )
+        random.seed(4)
+        columns, char_sets, colors = initialize_animation_parameters(args, 12, 8)
+        producer = FrameProducer(args, 12, 8, colors, columns, char_sets)
+        drawn = set()
+        for _ in range(60):
+            producer.advance()
+            drawn.update(cell[-1] for row in producer.render() for cell in row if cell)
+        self.assertEqual(drawn - {" "}, set(chars))
+
+    def test_set_without_usable_glyphs_is_blank(self):
+        """Test that a fully filtered set renders as spaces, like before."""
+        combining = "\u0301\u0308"  # Zero-width combining marks
+        table = compile_glyph_table(combining)
+        self.assertTrue(table.blank)
+        self.assertEqual(table.glyphs, (" ",))
+        self.assertEqual(table.rejected, len(combining))
+        self.assertIn("renders as blank", table.describe())
+
+    def test_wide_glyphs_only_on_even_columns_with_room(self):
+        """Test that wide trails start on even columns that have a right neighbour."""
+        self.assertEqual(
+            [x for x in range(7) if allows_wide_glyphs(x, 7)], [0, 2, 4]
+        )
+        self.assertEqual(
+            narrow_table_count([compile_glyph_table("ab"), compile_glyph_table(CHARS_KATAKANA)]),
+            1,
+        )
+
+    def test_table_works_with_random_choice(self):
+        """Test that the render loop can pick glyphs from a table directly."""
+        table = compile_glyph_table("xyz")
+        for _ in range(20):
+            self.assertIn(random.choice(table), "xyz")
+
+    def test_render_loop_does_not_call_wcwidth(self):
+        """Test that rendering from a compiled table never consults wcwidth."""
+        table = compile_glyph_table("ab")
+        palette = compile_palette({}, "classic", "normal", 3, 1)
+        with patch("wcwidth.wcwidth") as mock_wcwidth:
+            rows = SpanRenderer(1, 3).render([(0, 3, table)], palette, 0.5)
+            mock_wcwidth.assert_not_called()
+        self.assertTrue(all(row[0][-1] in "ab" for row in rows))
+
+    def test_report_glyph_tables_prints_one_line_per_set(self):
+        """Test that startup statistics contain one line per table."""
+        out = io.StringIO()
+        report_glyph_tables(
+            [compile_glyph_table(CHARS_LATIN), GlyphTable("x", ("x",), 2)], file=out
+        )
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn("latin: 71/71 glyphs usable", lines[0])
+        self.assertIn("1 not single-width", lines[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import MagicMock
+
+from interactive_loop import (
+    DENSITY_STEP,
+    SPEED_STEP,
+    AnimationController,
+    parse_keys,
+    split_keys,
+)
+
+
+def make_runner(width=80, height=24):
+    runner = MagicMock()
+    runner.width = width
+    runner.height = height
+    runner.scheduler.advance_deadline.return_value = 0
+    return runner
+
+
+class TestParseKeys(unittest.TestCase):
+    def test_arrow_keys_stay_whole(self):
+        """Test that arrow key escape sequences are yielded as one key."""
+        self.assertEqual(list(parse_keys("p\033[A+\033[D")), ["p", "\033[A", "+", "\033[D"])
+
+    def test_lone_escape_is_a_key(self):
+        """Test that a truncated escape sequence is yielded one character at a time."""
+        self.assertEqual(list(parse_keys("\033[")), ["\033", "["])
+
+    def test_split_keys_holds_back_a_partial_escape(self):
+        """Test that a read ending inside an escape sequence keeps its start for the next read."""
+        self.assertEqual(split_keys("p\033["), (["p"], "\033["))
+        self.assertEqual(split_keys("\033"), ([], "\033"))
+        self.assertEqual(split_keys("\033[A["), (["\033[A", "["], ""))
+
+
+class TestAnimationController(unittest.TestCase):
+    def test_pause_toggles_and_resume_restarts_schedule(self):
+        """Test that pausing twice resumes on a fresh scheduler start."""
+        runner = make_runner()
+        controller = AnimationController(runner)
+        self.assertEqual(controller.handle_key(" "), "pause")
+        self.assertTrue(controller.paused)
+        runner.scheduler.start.assert_not_called()
+        controller.handle_key("p")
+        self.assertFalse(controller.paused)
+        runner.scheduler.start.assert_called_once()
+
+    def test_speed_and_density_keys_adjust_the_runner(self):
+        """Test that speed and density keys scale the runner's settings."""
+        runner = make_runner()
+        controller = AnimationController(runner)
+        controller.handle_key("+")
+        runner.adjust_frame_period.assert_called_with(1 / SPEED_STEP)
+        controller.handle_key("\033[B")
+        runner.adjust_frame_period.assert_called_with(SPEED_STEP)
+        controller.handle_key("]")
+        runner.adjust_density.assert_called_with(DENSITY_STEP)
+        controller.handle_key("[")
+        runner.adjust_density.assert_called_with(1 / DENSITY_STEP)
+
+    def test_arrow_key_split_across_reads_is_one_key(self):
+        """Test that an arrow key read in two parts acts once and never as "[" (sparser)."""
+        runner = make_runner()
+        controller = AnimationController(runner)
+        read_fd, write_fd = os.pipe()
+        try:
+            os.write(write_fd, b"\033[")
+            controller._read_input(read_fd)
+            runner.adjust_density.assert_not_called()
+            os.write(write_fd, b"A")
+            controller._read_input(read_fd)
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+        runner.adjust_density.assert_not_called()
+        runner.adjust_frame_period.assert_called_once_with(1 / SPEED_STEP)
+
+    def test_unknown_keys_are_ignored(self):
+        """Test that keys without an action change nothing."""
+        runner = make_runner()
+        controller = AnimationController(runner)
+        self.assertIsNone(controller.handle_key("x"))
+        self.assertFalse(controller.paused)
+        self.assertFalse(controller.stopped)
+
+    def test_resize_applies_once_and_only_on_change(self):
+        """Test that a signalled resize resizes the runner once, and not to the same size."""
+        runner = make_runner()
+        sizes = iter([(100, 30), (80, 24)])
+        controller = AnimationController(runner, terminal_size=lambda fd: next(sizes))
+        self.assertFalse(controller.apply_pending_resize())
+
+        controller.request_resize()
+        controller.request_resize()
+        self.assertTrue(controller.apply_pending_resize())
+        runner.resize.assert_called_once_with(100, 30)
+        self.assertFalse(controller.apply_pending_resize())
+
+        controller.request_resize()
+        self.assertFalse(controller.apply_pending_resize())  # Same size as the runner
+        runner.resize.assert_called_once()
+
+    def test_run_draws_frames_until_quit(self):
+        """Test that the asyncio loop runs frames until 'q' is handled."""
+        runner = make_runner()
+        controller = AnimationController(runner)
+        frames = []
+
+        def run_frame():
+            frames.append(None)
+            if len(frames) == 3:
+                controller.handle_key("q")
+
+        runner.run_frame.side_effect = run_frame
+        asyncio.run(controller.run())
+        self.assertEqual(len(frames), 3)
+        runner.scheduler.start.assert_called_once()
+
+    def test_paused_loop_draws_no_frames(self):
+        """Test that no frames are drawn while paused and drawing resumes afterwards."""
+        runner = make_runner()
+        controller = AnimationController(runner)
+        controller.paused = True
+
+        async def scenario():
+            task = asyncio.create_task(controller.run())
+            await asyncio.sleep(0.01)
+            self.assertEqual(runner.run_frame.call_count, 0)
+            runner.run_frame.side_effect = lambda: controller.handle_key("q")
+            controller.handle_key(" ")
+            await task
+
+        asyncio.run(scenario())
+        self.assertEqual(runner.run_frame.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import unittest
+from collections import deque
+
+from animation_core import (
+    ColumnState,
+    FrameProducer,
+    PythonColumnEngine,
+    create_column_engine,
+    initialize_animation_parameters,
+)
+from config import CHARS_KATAKANA, build_argument_parser
+from glyph_tables import compile_glyph_table
+from numpy_engine import NumpyColumnEngine, np
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestNumpyColumnEngine(unittest.TestCase):
+    def test_update_updates_head_y(self):
+        """Test that active drops advance and idle columns stay idle at zero density."""
+        cols = [
+            ColumnState(0, 0),
+            ColumnState(1, 1),
+            ColumnState(5, 2),
+        ]
+        engine = NumpyColumnEngine.from_columns(cols, [["a"], ["b"], ["c"]])
+
+        engine.update(height=10, density=0.0, trail_length=3)
+
+        self.assertEqual(engine.head_y.tolist(), [0, 2, 6])
+        self.assertEqual([col.head_y for col in cols], [0, 2, 6])
+
+    def test_update_resets_head_y_past_height(self):
+        """Test that a drop resets once its trail is past the bottom of the screen."""
+        cols = [ColumnState(15, 0)]
+        engine = NumpyColumnEngine.from_columns(cols, [["a"]])
+
+        engine.update(height=10, density=0.0, trail_length=3)
+
+        self.assertEqual(engine.head_y.tolist(), [0])
+        self.assertEqual(cols[0].head_y, 0)
+
+    def test_update_starts_new_drop(self):
+        """Test that idle columns spawn a drop with a set from the rotation."""
+        cols = [ColumnState(0, 0) for _ in range(4)]
+        engine = NumpyColumnEngine.from_columns(cols, [["x"]])
+
+        engine.update(height=10, density=1.0, trail_length=3)
+
+        self.assertEqual(engine.head_y.tolist(), [1, 1, 1, 1])
+        for col in cols:
+            self.assertEqual(col.head_y, 1)
+            self.assertEqual(col.char_set_index, 0)
+
+    def test_matches_python_engine_without_spawning(self):
+        """Test that both engines produce the same heads when no drops can spawn."""
+        heads = [0, 1, 4, 9, 12, 13, 3]
+        python_cols = [ColumnState(h, 0) for h in heads]
+        numpy_cols = [ColumnState(h, 0) for h in heads]
+        python_engine = PythonColumnEngine(python_cols, [["a"]])
+        numpy_engine = NumpyColumnEngine.from_columns(numpy_cols, [["a"]])
+
+        for _ in range(20):
+            python_engine.update(height=10, density=0.0, trail_length=3)
+            numpy_engine.update(height=10, density=0.0, trail_length=3)
+            self.assertEqual(
+                [col.head_y for col in python_cols], numpy_engine.head_y.tolist()
+            )
+
+    def test_matches_python_engine_with_stacked_drops(self):
+        """Test that both engines stack the same drops when every draw spawns."""
+        python_cols = [ColumnState(h, 0) for h in (0, 2, 7)]
+        numpy_cols = [ColumnState(h, 0) for h in (0, 2, 7)]
+        python_engine = PythonColumnEngine(python_cols, [["a"]], drops_per_column=3)
+        numpy_engine = NumpyColumnEngine.from_columns(
+            numpy_cols, [["a"]], drops_per_column=3
+        )
+
+        for _ in range(30):
+            python_engine.update(height=12, density=1.0, trail_length=3)
+            numpy_engine.update(height=12, density=1.0, trail_length=3)
+            self.assertEqual(
+                sorted(python_engine.active_drops()),
+                sorted(numpy_engine.active_drops()),
+            )
+        self.assertEqual(python_engine.active_drop_count(), 9)
+        self.assertEqual(numpy_engine.active_drop_count(), 9)
+
+    def test_active_drops_lists_only_active_columns(self):
+        """Test that active_drops yields position, head and char set of active columns."""
+        sets = [["a"], ["b"]]
+        cols = [ColumnState(0, 0), ColumnState(4, 1)]
+        engine = NumpyColumnEngine.from_columns(cols, sets, mirror_columns=False)
+
+        self.assertEqual(list(engine.active_drops()), [(1, 4, sets[1])])
+
+    def test_resize_keeps_remaining_drops(self):
+        """Test that resizing keeps the drops of the remaining columns and adds idle ones."""
+        cols = [ColumnState(4, 0, deque([[9, 0]])), ColumnState(6, 0, deque([[12, 0]]))]
+        engine = NumpyColumnEngine.from_columns(cols, [["a"]], mirror_columns=False)
+        engine.resize(1)
+        self.assertEqual([head_y for _, head_y, _ in engine.active_drops()], [4, 9])
+        engine.resize(3)
+        self.assertEqual(engine.head_y.tolist(), [4, 0, 0])
+
+        engine.update(height=20, density=0.0, trail_length=3)
+        self.assertEqual(engine.head_y.tolist(), [5, 0, 0])
+
+    def test_wide_sets_only_spawn_where_they_fit(self):
+        """Test that odd columns and the last column never pick a double-width set."""
+        char_sets = [compile_glyph_table("ab"), compile_glyph_table(CHARS_KATAKANA)]
+        engine = NumpyColumnEngine([0] * 5, [0] * 5, char_sets, seed=3)
+        picked = set()
+        for _ in range(50):
+            engine.head_y[:] = 0
+            engine.update(height=10, density=1.0, trail_length=3)
+            picked.update(zip(range(5), engine.char_set_index.tolist()))
+        self.assertEqual({x for x, index in picked if index == 1}, {0, 2})
+
+        engine.resize(4)  # Column 2 now has the last column to its right
+        self.assertEqual(engine._char_set_limit.tolist(), [2, 1, 2, 1])
+
+    def test_resized_char_set_limits_match_a_new_engine(self):
+        """Test that growing or shrinking the limits gives the same bounds as building them anew."""
+        char_sets = [compile_glyph_table("ab"), compile_glyph_table(CHARS_KATAKANA)]
+        engine = NumpyColumnEngine([0] * 5, [0] * 5, char_sets)
+        for width in (8, 9, 3, 0, 6):
+            engine.resize(width)
+            fresh = NumpyColumnEngine([0] * width, [0] * width, char_sets)
+            self.assertEqual(
+                engine._char_set_limit.tolist(), fresh._char_set_limit.tolist(), width
+            )
+
+    def test_producer_resizes_only_the_numpy_engine(self):
+        """Test that a resize leaves the unmirrored ColumnState list alone and the report follows the engine."""
+        args = build_argument_parser().parse_args(["--engine", "numpy", "--seed", "2"])
+        columns, char_sets, colors = initialize_animation_parameters(args, 6, 5)
+        producer = FrameProducer(args, 6, 5, colors, columns, char_sets)
+        producer.resize(9, 5)
+        self.assertEqual(len(columns), 6)
+        self.assertEqual(producer.engine.head_y.shape[0], 9)
+        self.assertIn("Columns: 9 columns in NumPy arrays", producer.engine.memory_report())
+
+    def test_create_column_engine(self):
+        """Test that engine names map to the matching engine class."""
+        cols = [ColumnState(0, 0)]
+        self.assertIsInstance(
+            create_column_engine("numpy", cols, [["a"]]), NumpyColumnEngine
+        )
+        self.assertIsInstance(
+            create_column_engine("python", cols, [["a"]]), PythonColumnEngine
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+
+from config import AnsiColors
+from palette import (
+    Palette,
+    compile_palette,
+    gradient_colors,
+    nearest_256_color,
+    resolve_color_depth,
+)
+
+CLASSIC_COLORS = {
+    "WHITE": AnsiColors.WHITE.value,
+    "BRIGHT_GREEN": AnsiColors.BRIGHT_GREEN.value,
+    "GREEN": AnsiColors.GREEN.value,
+    "RESET": AnsiColors.RESET.value,
+}
+
+
+class TestPalette(unittest.TestCase):
+    def test_classic_normal_trail_prefixes(self):
+        """Test head, bright segment and dim segment escapes for the classic theme."""
+        palette = compile_palette(CLASSIC_COLORS, "classic", "normal", 5, 2)
+        self.assertIsInstance(palette, Palette)
+        self.assertEqual(palette.base_color_names, ("GREEN",))
+        self.assertEqual(
+            palette.trail_prefixes[0],
+            (
+                AnsiColors.WHITE.value,
+                AnsiColors.BRIGHT_GREEN.value,
+                AnsiColors.BRIGHT_GREEN.value,
+                AnsiColors.GREEN.value,
+                AnsiColors.GREEN.value,
+            ),
+        )
+        self.assertEqual(palette.trail_length, 5)
+        self.assertEqual(palette.reset, AnsiColors.RESET.value)
+
+    def test_intensity_levels(self):
+        """Test that dim and bright intensities shift the segment colors."""
+        dim = compile_palette(CLASSIC_COLORS, "classic", "dim", 3, 1)
+        bright = compile_palette(CLASSIC_COLORS, "classic", "bright", 3, 1)
+        self.assertEqual(
+            dim.trail_prefixes[0],
+            (AnsiColors.BRIGHT_GREEN.value, AnsiColors.GREEN.value, AnsiColors.GREEN.value),
+        )
+        self.assertEqual(
+            bright.trail_prefixes[0],
+            (AnsiColors.WHITE.value, AnsiColors.WHITE.value, AnsiColors.BRIGHT_GREEN.value),
+        )
+
+    def test_colorful_theme_has_one_row_per_base_color(self):
+        """Test that each base color of a colorful theme gets its own prefix row."""
+        colors = {
+            "RESET": AnsiColors.RESET.value,
+            "WHITE": AnsiColors.WHITE.value,
+            "BLUE": AnsiColors.BLUE.value,
+            "BRIGHT_BLUE": AnsiColors.BRIGHT_BLUE.value,
+            "CYAN": AnsiColors.CYAN.value,
+        }
+        palette = compile_palette(colors, "colorful", "normal", 4, 1)
+        self.assertEqual(palette.base_color_names, ("BLUE", "CYAN"))
+        self.assertEqual(palette.trail_prefixes[0][1], AnsiColors.BRIGHT_BLUE.value)
+        # CYAN has no bright variant in this theme, so it falls back to the base color.
+        self.assertEqual(palette.trail_prefixes[1][1], AnsiColors.CYAN.value)
+
+    def test_colorful_theme_without_base_colors_falls_back_to_green(self):
+        """Test that a colorful theme with no usable base colors draws in green."""
+        palette = compile_palette(
+            {"WHITE": AnsiColors.WHITE.value}, "colorful", "normal", 3, 1
+        )
+        self.assertEqual(palette.base_color_names, ("GREEN",))
+        self.assertEqual(palette.trail_prefixes[0][2], AnsiColors.GREEN.value)
+
+    def test_palette_is_immutable(self):
+        """Test that a compiled palette cannot be modified."""
+        palette = compile_palette(CLASSIC_COLORS, "classic", "normal", 3, 1)
+        with self.assertRaises(AttributeError):
+            palette.reset = ""
+
+    def test_truecolor_trail_fades_along_its_whole_length(self):
+        """Test that every truecolor trail position gets its own, darker escape."""
+        palette = compile_palette(CLASSIC_COLORS, "classic", "normal", 8, 2, "truecolor")
+        prefixes = palette.trail_prefixes[0]
+        self.assertEqual(prefixes[0], "\033[38;2;255;255;255m")
+        self.assertEqual(prefixes[1], "\033[38;2;0;255;0m")
+        self.assertEqual(prefixes[3], "\033[38;2;0;205;0m")  # End of the bright segment
+        greens = [int(prefix.split(";")[3]) for prefix in prefixes[1:]]
+        self.assertEqual(greens, sorted(greens, reverse=True))
+        self.assertEqual(len(set(prefixes)), 8)
+
+    def test_256_color_depth_quantizes_the_gradient(self):
+        """Test that the 256-color palette uses 38;5 escapes of the nearest colors."""
+        palette = compile_palette(CLASSIC_COLORS, "classic", "normal", 8, 2, "256")
+        self.assertTrue(all(p.startswith("\033[38;5;") for p in palette.trail_prefixes[0]))
+        self.assertEqual(nearest_256_color((255, 255, 255)), 231)
+        self.assertEqual(nearest_256_color((0, 255, 0)), 46)
+        self.assertEqual(nearest_256_color((128, 128, 128)), 244)
+
+    def test_256_color_trails_stay_in_the_color_cube(self):
+        """Test that dark saturated trail colors map to cube entries, not to grays."""
+        self.assertEqual(nearest_256_color((0, 51, 0)), 22)
+        self.assertEqual(nearest_256_color((30, 32, 31)), 234)
+        palette = compile_palette(CLASSIC_COLORS, "classic", "normal", 8, 2, "256")
+        indices = [int(prefix[len("\033[38;5;") : -1]) for prefix in palette.trail_prefixes[0]]
+        self.assertEqual(indices[-1], 22)
+        self.assertFalse(any(232 <= index <= 255 for index in indices[1:]), indices)
+
+    def test_gradient_keeps_segment_colors_at_their_positions(self):
+        """Test that the gradient passes through the head, bright and dim colors."""
+        colors = gradient_colors((9, 9, 9), (200, 0, 0), (100, 0, 0), 6, 1)
+        self.assertEqual(colors[:3], [(9, 9, 9), (200, 0, 0), (100, 0, 0)])
+        self.assertEqual(colors[-1], (25, 0, 0))
+
+    def test_auto_color_depth_follows_the_environment(self):
+        """Test that auto detects truecolor and 256 colors from COLORTERM and TERM."""
+        self.assertEqual(resolve_color_depth("auto", {"COLORTERM": "truecolor"}), "truecolor")
+        self.assertEqual(resolve_color_depth("auto", {"TERM": "xterm-256color"}), "256")
+        self.assertEqual(resolve_color_depth("auto", {"TERM": "vt100"}), "16")
+        self.assertEqual(resolve_color_depth("256", {"COLORTERM": "truecolor"}), "256")
+
+    def test_custom_escapes_keep_the_16_color_steps(self):
+        """Test that colors without a known RGB value fall back to the three trail steps."""
+        colors = dict(CLASSIC_COLORS, GREEN="\033[38;5;28m")
+        palette = compile_palette(colors, "classic", "dim", 3, 1, "truecolor")
+        self.assertEqual(palette.trail_prefixes[0][1], "\033[38;5;28m")
+
+
+if __name__ == "__main__":
+    unittest.main()
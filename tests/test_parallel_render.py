@@ -0,0 +1,88 @@
+import random
+import unittest
+
+from animation_core import FrameProducer, initialize_animation_parameters
+from config import build_argument_parser
+from frame_encoders import FullFrameEncoder
+from parallel_render import band_bounds
+
+
+def seeded_outputs(options, frames, resize_at=None, simplify_at=None):
+    """Renders frames with a seeded producer and returns every full-frame encoding."""
+    args = build_argument_parser().parse_args(["--seed", "5"] + options)
+    random.seed(5)
+    columns, char_sets, colors = initialize_animation_parameters(args, 40, 12)
+    producer = FrameProducer(args, 40, 12, colors, columns, char_sets)
+    encoder = FullFrameEncoder()
+    outputs = []
+    try:
+        for frame in range(frames):
+            if frame == resize_at:
+                producer.resize(31, 15)
+            if frame == simplify_at:
+                producer.palette = producer.palette.simplified()
+            producer.advance()
+            outputs.append(encoder.encode_frame(producer.render(), "\033[0m").getvalue())
+    finally:
+        close = getattr(producer.renderer, "close", None)
+        if close is not None:
+            close()
+    return outputs
+
+
+class TestParallelRender(unittest.TestCase):
+    def test_band_bounds_cover_every_row_once(self):
+        """Test that the bands split the rows in order without gaps or empty bands."""
+        self.assertEqual(band_bounds(10, 3), [(0, 3), (3, 6), (6, 10)])
+        self.assertEqual(band_bounds(2, 4), [(0, 1), (1, 2)])
+
+    def test_output_matches_serial_renderer(self):
+        """Test that the parallel renderer's output is identical to the serial one's."""
+        options = [
+            "--theme", "colorful", "--glitch-rate", "0.05", "--density", "0.3",
+            "--drops-per-column", "2", "--color-depth", "256",
+        ]
+        serial = seeded_outputs(options, 25, resize_at=12)
+        parallel = seeded_outputs(options + ["--render-workers", "3"], 25, resize_at=12)
+        self.assertEqual(len(parallel), 25)
+        for frame, (expected, actual) in enumerate(zip(serial, parallel)):
+            self.assertEqual(actual, expected, f"frame {frame}")
+
+    def test_output_matches_serial_renderer_with_blank_rows(self):
+        """Test that bands with skipped blank rows join exactly like the serial output."""
+        options = ["--density", "0.02", "--speed", "1"]
+        serial = seeded_outputs(options, 20)
+        parallel = seeded_outputs(options + ["--render-workers", "4"], 20)
+        for frame, (expected, actual) in enumerate(zip(serial, parallel)):
+            self.assertEqual(actual, expected, f"frame {frame}")
+
+    def test_output_matches_serial_renderer_after_palette_change(self):
+        """Test that the workers pick up new trail prefixes when the palette changes."""
+        options = ["--theme", "colorful", "--density", "0.3"]
+        serial = seeded_outputs(options, 12, simplify_at=6)
+        parallel = seeded_outputs(options + ["--render-workers", "2"], 12, simplify_at=6)
+        for frame, (expected, actual) in enumerate(zip(serial, parallel)):
+            self.assertEqual(actual, expected, f"frame {frame}")
+
+    def test_palette_changes_keep_the_worker_pool(self):
+        """Test that switching palettes back and forth never restarts the worker processes."""
+        args = build_argument_parser().parse_args(["--seed", "5", "--render-workers", "2"])
+        columns, char_sets, colors = initialize_animation_parameters(args, 40, 12)
+        producer = FrameProducer(args, 40, 12, colors, columns, char_sets)
+        base = producer.palette
+        simplified = base.simplified()
+        encoder = FullFrameEncoder()
+        try:
+            encoder.encode_frame(producer.render(), "\033[0m")
+            pool = producer.renderer._pool
+            for palette in (simplified, base, simplified.simplified(), base):
+                producer.palette = palette
+                producer.advance()
+                encoder.encode_frame(producer.render(), "\033[0m")
+                self.assertIs(producer.renderer._pool, pool)
+        finally:
+            producer.renderer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
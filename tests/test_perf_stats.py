@@ -0,0 +1,78 @@
+import io
+import json
+import unittest
+from unittest.mock import patch
+
+from perf_stats import HUD_REFRESH_FRAMES, FrameStats, percentile
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFrameStats(unittest.TestCase):
+    def test_percentile_nearest_rank(self):
+        """Test the nearest-rank percentile on sorted values."""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 51)
+        self.assertEqual(percentile(values, 0.99), 100)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_to_dict_reports_phases_percentiles_bytes_and_drops(self):
+        """Test that the exit dump averages phase times and keeps totals."""
+        clock = FakeClock()
+        stats = FrameStats(clock=clock)
+        stats.record_frame(1_000, 2_000, 3_000, 4_000, 100, 5)
+        stats.record_frame(3_000, 2_000, 3_000, 4_000, 300, 7)
+        stats.record_dropped_frame(2_000)
+        clock.now = 1_000_000_000  # One second later
+
+        data = stats.to_dict()
+
+        self.assertEqual(data["frames_rendered"], 2)
+        self.assertEqual(data["frames_dropped"], 1)
+        self.assertAlmostEqual(data["effective_fps"], 2.0)
+        self.assertAlmostEqual(data["phase_us_per_frame"]["update"], 2.0)
+        self.assertAlmostEqual(data["phase_us_per_frame"]["write"], 4.0)
+        self.assertAlmostEqual(data["frame_ms_p50"], 0.012)
+        self.assertEqual(data["bytes_written"], 400)
+        self.assertEqual(data["active_drops_last"], 7)
+        self.assertAlmostEqual(data["active_drops_mean"], 6.0)
+
+    def test_hud_refreshes_every_few_frames(self):
+        """Test that the HUD text is recomputed only every HUD_REFRESH_FRAMES frames."""
+        clock = FakeClock()
+        stats = FrameStats(clock=clock)
+        stats.record_frame(1_000_000, 0, 0, 0, 0, 1)
+        first = stats.hud_line()
+        self.assertIn("1 drops", first)
+
+        for _ in range(HUD_REFRESH_FRAMES - 1):
+            stats.record_frame(1_000_000, 0, 0, 0, 0, 9)
+        self.assertEqual(stats.hud_line(), first)
+        stats.record_frame(1_000_000, 0, 0, 0, 0, 9)
+        clock.now = 1_000_000_000
+        self.assertIn("9 drops", stats.hud_line())
+
+    def test_hud_output_fits_on_last_row(self):
+        """Test that the overlay is positioned on the last row and never wider than the screen."""
+        stats = FrameStats(clock=FakeClock())
+        stats.record_frame(0, 0, 0, 0, 0, 0)
+        output = stats.hud_output(20, 7)
+        self.assertTrue(output.startswith("\033[7;1H\033[7m"))
+        self.assertEqual(len(output), len("\033[7;1H\033[7m") + 19 + len("\033[0m"))
+
+    def test_dump_to_stdout(self):
+        """Test that '-' dumps the statistics as JSON to stdout."""
+        stats = FrameStats(clock=FakeClock())
+        with patch("sys.stdout", new_callable=io.StringIO) as out:
+            stats.dump("-")
+        self.assertEqual(json.loads(out.getvalue())["frames_rendered"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from unittest.mock import MagicMock
+
+from config import AnsiColors
+from palette import compile_palette
+from quality_governor import RESTORE_WINDOWS, WINDOW_FRAMES, QualityGovernor
+
+COLORS = {
+    "WHITE": AnsiColors.WHITE.value,
+    "BRIGHT_GREEN": AnsiColors.BRIGHT_GREEN.value,
+    "GREEN": AnsiColors.GREEN.value,
+}
+PERIOD_NS = 100_000_000  # 10 FPS
+
+
+class TestQualityGovernor(unittest.TestCase):
+    def _governor(self, glitch_rate=0.01):
+        producer = MagicMock()
+        producer.density = 0.2
+        producer.glitch_rate = glitch_rate
+        producer.palette = compile_palette(COLORS, "classic", "normal", 6, 2)
+        scheduler = MagicMock()
+        scheduler.frame_period = 0.1
+        scheduler.late_frames = 0
+        governor = QualityGovernor(min_density=0.05, min_fps=4, clock=lambda: 0)
+        governor.attach(producer, scheduler)
+        return governor, producer, scheduler
+
+    def _run_window(self, governor, stall_fraction):
+        for _ in range(WINDOW_FRAMES):
+            governor.record_frame(int(PERIOD_NS * stall_fraction), 1000)
+
+    def test_slow_output_steps_down_the_ladder(self):
+        """Test that each slow window applies the next cheaper setting in order."""
+        governor, producer, scheduler = self._governor()
+        self.assertEqual(
+            [name for name, _ in governor.steps],
+            ["glitch", "density", "colors", "fps", "min-density", "min-fps"],
+        )
+
+        self._run_window(governor, 0.9)
+        self.assertEqual(producer.glitch_rate, 0.0)
+        self.assertEqual(producer.density, 0.2)
+
+        self._run_window(governor, 0.9)
+        self.assertAlmostEqual(producer.density, 0.125)
+
+        self._run_window(governor, 0.9)
+        self.assertEqual(len(producer.palette.trail_prefixes), 1)
+        self.assertEqual(len(set(producer.palette.trail_prefixes[0][1:])), 1)
+
+        self._run_window(governor, 0.9)
+        self.assertAlmostEqual(scheduler.frame_period, 1 / 7)
+
+        for _ in range(5):
+            self._run_window(governor, 0.9)
+        self.assertEqual(governor.level, len(governor.steps))
+        self.assertAlmostEqual(producer.density, 0.05)
+        self.assertAlmostEqual(scheduler.frame_period, 0.25)
+
+    def test_headroom_restores_one_step_after_calm_windows(self):
+        """Test that quality comes back one step per RESTORE_WINDOWS calm windows."""
+        governor, producer, _ = self._governor()
+        self._run_window(governor, 0.9)
+        self._run_window(governor, 0.9)
+        self.assertEqual(governor.level, 2)
+
+        for _ in range(RESTORE_WINDOWS - 1):
+            self._run_window(governor, 0.01)
+        self.assertEqual(governor.level, 2)
+        self._run_window(governor, 0.01)
+        self.assertEqual(governor.level, 1)
+        self.assertEqual(producer.density, 0.2)
+        self.assertEqual(producer.glitch_rate, 0.0)
+
+    def test_palette_objects_are_reused_across_steps(self):
+        """Test that moving along the ladder or changing the base never builds a new palette."""
+        governor, producer, _ = self._governor()
+        base = producer.palette
+        for _ in range(4):
+            self._run_window(governor, 0.9)
+        simplified = producer.palette
+        self.assertIsNot(simplified, base)
+        governor.set_base(density=0.3)
+        self.assertIs(producer.palette, simplified)
+        governor.set_base(frame_period=0.2)
+        self._run_window(governor, 0.9)
+        self.assertIs(producer.palette, simplified)
+        for _ in range(RESTORE_WINDOWS * governor.level):
+            self._run_window(governor, 0.01)
+        self.assertEqual(governor.level, 0)
+        self.assertIs(producer.palette, base)
+
+    def test_late_frames_and_discards_count_as_falling_behind(self):
+        """Test that scheduler lateness or pipeline discards trigger a reduction."""
+        governor, _, scheduler = self._governor()
+        scheduler.late_frames = WINDOW_FRAMES
+        self._run_window(governor, 0.0)
+        self.assertEqual(governor.level, 1)
+
+        for _ in range(WINDOW_FRAMES):
+            governor.record_frame(0, 1000, frames_discarded=1)
+        self.assertEqual(governor.level, 2)
+
+    def test_steps_without_effect_are_skipped(self):
+        """Test that the ladder leaves out steps that would change nothing."""
+        governor, _, _ = self._governor(glitch_rate=0.0)
+        self.assertNotIn("glitch", [name for name, _ in governor.steps])
+        self.assertIn("level 0/", governor.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from animation_core import ColumnState, SpanRenderer, update_column_states
+from palette import compile_palette
+from random_pool import RandomPool
+
+
+class TestRandomPool(unittest.TestCase):
+    def test_same_seed_gives_same_draws(self):
+        """Test that two pools with the same seed produce identical sequences."""
+        first = RandomPool(seed=42, batch_size=16)
+        second = RandomPool(seed=42, batch_size=16)
+        self.assertEqual(
+            [first.random() for _ in range(50)], [second.random() for _ in range(50)]
+        )
+        self.assertNotEqual(
+            RandomPool(seed=1).floats(10), RandomPool(seed=2).floats(10)
+        )
+
+    def test_floats_across_batch_boundaries(self):
+        """Test that floats() returns exactly the requested count, even spanning refills."""
+        pool = RandomPool(seed=7, batch_size=8)
+        reference = RandomPool(seed=7, batch_size=8)
+        draws = pool.floats(5) + pool.floats(20) + [pool.random()]
+        self.assertEqual(draws, [reference.random() for _ in range(26)])
+        self.assertTrue(all(0.0 <= u < 1.0 for u in draws))
+
+    def test_choice_stays_in_sequence(self):
+        """Test that choice() only returns elements of the sequence."""
+        pool = RandomPool(seed=3)
+        picks = {pool.choice("abc") for _ in range(200)}
+        self.assertEqual(picks, set("abc"))
+
+    def test_pool_can_replace_random_module_in_update(self):
+        """Test that update_column_states accepts a pool as its random source."""
+        cols = [ColumnState(0, 0)]
+        update_column_states(cols, 1, 10, 1.0, 3, [["x"]], rng=RandomPool(seed=0))
+        self.assertEqual(cols[0].head_y, 1)
+        self.assertEqual(cols[0].char_set_index, 0)
+
+    def test_seeded_renders_are_reproducible(self):
+        """Test that two renderers fed by equally seeded pools draw the same frame."""
+        palette = compile_palette({}, "colorful", "normal", 5, 1)
+        drops = [(0, 3, "abcdef"), (2, 6, "xyz")]
+        first = SpanRenderer(3, 6, RandomPool(seed=9)).render(drops, palette, 0.5)
+        second = SpanRenderer(3, 6, RandomPool(seed=9)).render(drops, palette, 0.5)
+        self.assertEqual(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()